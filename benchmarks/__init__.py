@@ -0,0 +1,6 @@
+"""
+Benchmarks for Gen-D.
+
+Standalone scripts that measure engine performance. Run them from the
+repository root as modules, e.g. ``python -m benchmarks.bench_normalizer``.
+"""
@@ -0,0 +1,128 @@
+"""
+Benchmark: database size with text vs binary hash storage.
+
+Saves the same synthetic scan of --count functions (20 per file, one in
+three undocumented) several ways and reports the vacuumed database size:
+
+    legacy text   hex TEXT hashes, as written before schema version 2
+    migrated      the legacy database after Database() migrated it
+    sha256 blob   hashes stored as 32-byte BLOBs
+    blake2b-16    hashes from a 16-byte BLAKE2b digest, as BLOBs
+
+The hashes are real digests of synthetic function sources, so only their
+length matters, not how long parsing a real corpus would take.
+
+Usage:
+    python -m benchmarks.bench_db_size [--count N]
+"""
+
+import argparse
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from engine.hash import Digest
+from engine.models import CodeNode, FileScanResult
+from engine.storage import Database
+
+_FUNCTIONS_PER_FILE = 20
+
+
+def make_results(count: int, digest: Digest) -> list[FileScanResult]:
+    """Per-file scan results for count synthetic functions."""
+    results = []
+    for start in range(0, count, _FUNCTIONS_PER_FILE):
+        file_index = start // _FUNCTIONS_PER_FILE
+        file_path = f"/project/pkg{file_index // 50}/mod{file_index}.py"
+        nodes = []
+        for index in range(start, min(start + _FUNCTIONS_PER_FILE, count)):
+            source = f"def function_{index}(value):\n    return value + {index}\n"
+            documented = index % 3 != 0
+            nodes.append(
+                CodeNode(
+                    id=f"{file_path}:Service{index % 4}.function_{index}",
+                    name=f"function_{index}",
+                    file_path=file_path,
+                    start_line=index % _FUNCTIONS_PER_FILE * 10 + 1,
+                    end_line=index % _FUNCTIONS_PER_FILE * 10 + 9,
+                    semantic_hash=digest.hexdigest(b"semantic\0" + source.encode()),
+                    doc_hash=digest.hexdigest(f"Docs {index}.".encode()) if documented else None,
+                    is_method=True,
+                    class_name=f"Service{index % 4}",
+                    raw_hash=digest.hexdigest(source.encode()),
+                )
+            )
+        results.append(FileScanResult(file_path=file_path, nodes=nodes))
+    return results
+
+
+def vacuumed_size(db_path: Path) -> int:
+    """Size of the database file after VACUUM."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("VACUUM")
+    conn.close()
+    return db_path.stat().st_size
+
+
+def downgrade_to_text(db_path: Path) -> None:
+    """Rewrite BLOB hashes as hex text and mark the schema as version 1."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(
+        """
+        UPDATE nodes SET
+            semantic_hash = lower(hex(semantic_hash)),
+            doc_hash = CASE WHEN doc_hash IS NULL THEN NULL ELSE lower(hex(doc_hash)) END,
+            raw_hash = lower(hex(raw_hash));
+        UPDATE hierarchy SET rollup_hash = lower(hex(rollup_hash));
+        PRAGMA user_version = 1;
+        """
+    )
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    sha256 = Digest.from_name("sha256")
+    blake2b = Digest.from_name("blake2b-16")
+    sizes: dict[str, int] = {}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+
+        blob_path = tmp / "sha256.db"
+        Database(blob_path).save_scan("/project", make_results(args.count, sha256), sha256)
+        sizes["sha256 blob"] = vacuumed_size(blob_path)
+
+        legacy_path = tmp / "legacy.db"
+        shutil.copy(blob_path, legacy_path)
+        downgrade_to_text(legacy_path)
+        sizes["legacy text"] = vacuumed_size(legacy_path)
+
+        start = time.perf_counter()
+        migrated = Database(legacy_path)
+        migration_time = time.perf_counter() - start
+        sizes["migrated"] = legacy_path.stat().st_size
+        assert migrated.load_snapshots() == Database(blob_path).load_snapshots()
+
+        blake2b_path = tmp / "blake2b.db"
+        Database(blake2b_path).save_scan("/project", make_results(args.count, blake2b), blake2b)
+        sizes["blake2b-16"] = vacuumed_size(blake2b_path)
+
+    baseline = sizes["legacy text"]
+    print(f"Corpus: {args.count} functions in {-(-args.count // _FUNCTIONS_PER_FILE)} files")
+    for label in ("legacy text", "migrated", "sha256 blob", "blake2b-16"):
+        size = sizes[label]
+        print(
+            f"{label:12} {size / 2**20:8.2f} MiB  {size / args.count:6.0f} B/function"
+            f"  {size / baseline:6.1%} of legacy"
+        )
+    print(f"Migration:   {migration_time:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
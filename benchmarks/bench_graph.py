@@ -0,0 +1,146 @@
+"""
+Benchmark: CodeGraph memory and query time on a synthetic call graph.
+
+Builds a graph of N functions spread over files of 20, each calling a few
+others, and reports build time, the memory the graph retains (the nodes
+themselves are shared and not counted), peak traced memory during the
+build, the time of common queries and of a snapshot round trip. For
+comparison the same nodes and edges are also inserted into a NetworkX
+DiGraph with per-node attribute dicts, the layout CodeGraph used before
+its integer-indexed storage.
+
+Usage:
+    python -m benchmarks.bench_graph [--nodes N] [--calls K]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import networkx as nx
+
+from engine.graph import CodeGraph, load_graph_snapshot, save_graph_snapshot
+from engine.models import CallEdge, CodeNode, DriftStatus
+
+
+def synthetic_graph(nodes: int, calls: int) -> tuple[list[CodeNode], list[CallEdge]]:
+    """Deterministic nodes and edges; each function calls `calls` random others."""
+    rng = random.Random(0)
+    statuses = list(DriftStatus)
+    code_nodes = [
+        CodeNode(
+            id=f"pkg.mod{i // 20}:func{i}",
+            name=f"func{i}",
+            file_path=f"pkg/mod{i // 20}.py",
+            start_line=(i % 20) * 10 + 1,
+            end_line=(i % 20) * 10 + 9,
+            semantic_hash=f"{i:064x}",
+            doc_hash=f"{i:064x}",
+            drift_status=statuses[i % len(statuses)],
+        )
+        for i in range(nodes)
+    ]
+    edges = [
+        CallEdge(caller_id=node.id, callee_id=code_nodes[rng.randrange(nodes)].id, call_line=5)
+        for node in code_nodes
+        for _ in range(calls)
+    ]
+    return code_nodes, edges
+
+
+def build_code_graph(nodes: list[CodeNode], edges: list[CallEdge]) -> CodeGraph:
+    graph = CodeGraph()
+    for node in nodes:
+        graph.add_node(node)
+    for edge in edges:
+        graph.add_edge(edge)
+    graph.edge_count  # compact the staged edges
+    return graph
+
+
+def build_networkx(nodes: list[CodeNode], edges: list[CallEdge]) -> nx.DiGraph:
+    graph = nx.DiGraph()
+    for node in nodes:
+        graph.add_node(
+            node.id,
+            code_node=node,
+            file_path=node.file_path,
+            semantic_hash=node.semantic_hash,
+            doc_hash=node.doc_hash,
+            drift_status=node.drift_status.value,
+        )
+    for edge in edges:
+        graph.add_edge(edge.caller_id, edge.callee_id, call_line=edge.call_line)
+    return graph
+
+
+def measure(build: Callable[[], object]) -> tuple[object, float, float, float]:
+    """The built object, wall time in seconds, retained MiB and peak traced MiB."""
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    built = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, elapsed, retained / 2**20, peak / 2**20
+
+
+def timed(query: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    query()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=3)
+    args = parser.parse_args()
+
+    nodes, edges = synthetic_graph(args.nodes, args.calls)
+
+    graph, graph_time, graph_kept, graph_peak = measure(lambda: build_code_graph(nodes, edges))
+    _, nx_time, nx_kept, nx_peak = measure(lambda: build_networkx(nodes, edges))
+
+    print(f"Graph:            {args.nodes} nodes, {graph.edge_count} edges")
+    print(f"CodeGraph build:  {graph_time:8.3f} s  {graph_kept:8.1f} MiB  "
+          f"{graph_peak:8.1f} MiB peak")
+    print(f"NetworkX build:   {nx_time:8.3f} s  {nx_kept:8.1f} MiB  {nx_peak:8.1f} MiB peak")
+    print(f"Stale listing:    {timed(graph.get_stale_nodes):8.3f} s")
+    statuses = [(node.id, DriftStatus.STALE) for node in nodes[::10]]
+    update = timed(lambda: [graph.update_node_status(*status) for status in statuses])
+    print(f"{len(statuses)} updates:   {update:8.3f} s")
+    print(f"Drift report:     {timed(graph.drift_report):8.3f} s")
+    callers = timed(lambda: [list(graph.get_callers(node.id)) for node in nodes])
+    print(f"Callers of all:   {callers:8.3f} s")
+    changed = {node.id for node in nodes[:: max(1, len(nodes) // 2000)]}
+    affected = timed(lambda: graph.get_affected_by_change(changed))
+    print(f"Affected by {len(changed)}: {affected:8.3f} s")
+
+    file_path = nodes[0].file_path
+    file_nodes = [node for node in nodes if node.file_path == file_path]
+    file_ids = {node.id for node in file_nodes}
+    file_edges = [edge for edge in edges if edge.caller_id in file_ids]
+    replace = timed(lambda: graph.replace_file(file_path, file_nodes, file_edges))
+    requery = timed(lambda: list(graph.get_callers(nodes[0].id)))
+    print(f"Replace a file:   {replace:8.3f} s  (then {requery:.3f} s to sort in the edges)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "graph"
+        files = {node.file_path: (1, 1, 1) for node in nodes}
+        save = timed(lambda: save_graph_snapshot(graph, path, "scan", files))
+        size = path.stat().st_size / 2**20
+        load = timed(lambda: load_graph_snapshot(path, "scan"))
+        print(f"Snapshot save:    {save:8.3f} s  {size:8.1f} MiB")
+        # A fresh process (the CLI) loads faster: here the GC also walks the graphs above
+        print(f"Snapshot load:    {load:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
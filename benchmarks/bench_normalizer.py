@@ -0,0 +1,99 @@
+"""
+Benchmark: fused normalizer vs the three-pass pipeline.
+
+Measures the per-function cost of semantic normalization with the fused
+SemanticNormalizer against DocstringRemover, CommentRemover and
+WhitespaceNormalizer applied in sequence, and checks that both produce
+byte-identical output on every function in the corpus.
+
+Usage:
+    python -m benchmarks.bench_normalizer [PATH] [--repeat N]
+
+PATH defaults to the engine package of this repository; any directory of
+Python files can be used as the corpus.
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import libcst as cst
+
+from engine.hash.semantic_hash import (
+    CommentRemover,
+    DocstringRemover,
+    SemanticNormalizer,
+    WhitespaceNormalizer,
+)
+
+
+def load_function_modules(directory: Path) -> list[cst.Module]:
+    """Parse every function in the corpus into a standalone module."""
+    modules: list[cst.Module] = []
+
+    class _Collector(cst.CSTVisitor):
+        def visit_FunctionDef(self, node: cst.FunctionDef) -> bool:
+            modules.append(cst.parse_module(cst.Module(body=[node]).code))
+            return True
+
+    for path in sorted(directory.rglob("*.py")):
+        try:
+            cst.parse_module(path.read_text(encoding="utf-8")).visit(_Collector())
+        except (cst.ParserSyntaxError, UnicodeDecodeError):
+            continue
+    return modules
+
+
+def three_pass(module: cst.Module) -> str:
+    """The sequential reference pipeline."""
+    module = module.visit(DocstringRemover())
+    module = module.visit(CommentRemover())
+    module = module.visit(WhitespaceNormalizer())
+    return module.code
+
+
+def fused(module: cst.Module) -> str:
+    """The single-pass normalizer."""
+    return module.visit(SemanticNormalizer()).code
+
+
+def time_per_function(normalize, modules: list[cst.Module], repeat: int) -> float:
+    """Best-of-N wall time per function, in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for module in modules:
+            normalize(module)
+        best = min(best, time.perf_counter() - start)
+    return best / len(modules) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default=Path(__file__).resolve().parent.parent / "engine",
+        type=Path,
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    modules = load_function_modules(args.path)
+    if not modules:
+        raise SystemExit(f"No functions found under {args.path}")
+
+    mismatches = sum(1 for module in modules if fused(module) != three_pass(module))
+
+    baseline = time_per_function(three_pass, modules, args.repeat)
+    optimized = time_per_function(fused, modules, args.repeat)
+
+    print(f"Corpus:      {args.path} ({len(modules)} functions)")
+    print(f"Three-pass:  {baseline:8.1f} us/function")
+    print(f"Fused:       {optimized:8.1f} us/function")
+    print(f"Speedup:     {baseline / optimized:8.2f}x")
+    print(f"Mismatches:  {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: directory scan with and without building the CodeGraph.
+
+Measures wall time and peak traced memory of build_graph_from_directory
+with build_graph=True (nodes and edges are also inserted into a
+CodeGraph) and build_graph=False (only the ScanResult lists are built). The
+parse cache is warmed first, as for a repeated `gdg status`, so the
+measurement is not dominated by LibCST and the difference is the graph
+cost alone.
+
+Usage:
+    python -m benchmarks.bench_scan_graph [PATH] [--repeat N]
+
+PATH defaults to the engine package of this repository; any directory of
+Python files can be used as the corpus.
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from engine.graph import build_graph_from_directory
+from engine.storage import Database
+
+
+def measure(
+    path: Path, database: Database, build_graph: bool, repeat: int
+) -> tuple[float, float, int]:
+    """Best-of-N wall time in seconds, peak traced MiB and node count."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = build_graph_from_directory(path, database=database, build_graph=build_graph)
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    tracemalloc.start()
+    result = build_graph_from_directory(path, database=database, build_graph=build_graph)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak / 2**20, result.node_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default=Path(__file__).resolve().parent.parent / "engine",
+        type=Path,
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = Database(Path(tmp) / "bench.db")
+        build_graph_from_directory(args.path, database=database, build_graph=False)
+
+        with_time, with_peak, node_count = measure(args.path, database, True, args.repeat)
+        without_time, without_peak, _ = measure(args.path, database, False, args.repeat)
+
+    print(f"Corpus:         {args.path} ({node_count} functions)")
+    print(f"With graph:     {with_time:8.3f} s  {with_peak:8.1f} MiB peak")
+    print(f"Without graph:  {without_time:8.3f} s  {without_peak:8.1f} MiB peak")
+    print(f"Time saved:     {(1 - without_time / with_time) * 100:8.1f} %")
+    print(f"Memory saved:   {(1 - without_peak / with_peak) * 100:8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
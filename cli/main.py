@@ -9,6 +9,8 @@ Commands:
     gdg scan <path>     Scan a Python codebase and build the dependency graph
     gdg status          Display documentation drift summary
     gdg explain <id>    Show detailed drift information for a specific function
+    gdg dupes           List clusters of semantically identical functions
+    gdg impact <id>     List the callers a change to a function may affect
 
 Usage:
     $ gdg scan ./my-project
@@ -16,20 +18,35 @@ Usage:
     $ gdg explain my_module:MyClass.my_method
 """
 
+import time
+from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 import typer
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import Progress, SpinnerColumn, TaskID, TextColumn
 from rich import box
 
-from engine.graph import build_graph_from_directory
+from engine.graph import (
+    CodeGraph,
+    iter_scan,
+    load_graph_snapshot,
+    save_graph_snapshot,
+)
+from engine.hash import (
+    DEFAULT_DIGEST,
+    Digest,
+    SimilarityIndex,
+    changed_files,
+    compute_rollups,
+)
 from engine.drift import DriftDetector, analyze_codebase_drift
 from engine.storage import Database
-from engine.models import DriftStatus
+from engine.models import CodeNode, DriftStatus, FileScanResult, NodeSnapshot
+from engine.parser import backend_for_scheme
 
 # Initialize Typer app and Rich console
 app = typer.Typer(
@@ -44,6 +61,14 @@ console = Console()
 DEFAULT_DB_PATH = ".gen-d/gen-d.db"
 
 
+class ParserChoice(str, Enum):
+    """Parser backends selectable with --parser (see engine.parser.backends)."""
+
+    auto = "auto"
+    libcst = "libcst"
+    ast = "ast"
+
+
 @app.command()
 def scan(
     path: Path = typer.Argument(
@@ -60,6 +85,35 @@ def scan(
         "-d",
         help="Path to the database file (default: .gen-d/gen-d.db in project)",
     ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of parallel worker processes (default: CPU count)",
+    ),
+    paranoid: bool = typer.Option(
+        False,
+        "--paranoid",
+        help="Re-read every file instead of trusting unchanged size and mtime",
+    ),
+    no_gitignore: bool = typer.Option(
+        False,
+        "--no-gitignore",
+        help="Also scan files ignored by .gitignore and .gendignore",
+    ),
+    parser: ParserChoice = typer.Option(
+        ParserChoice.auto,
+        "--parser",
+        help="Parser backend: libcst, the faster stdlib ast, or auto "
+        "(libcst, falling back to ast for files it cannot parse)",
+    ),
+    digest: str = typer.Option(
+        DEFAULT_DIGEST.name,
+        "--digest",
+        help="Hash digest: sha256, blake2b or blake2b-N for an N-byte digest "
+        "(e.g. blake2b-16, half the storage of sha256)",
+    ),
 ) -> None:
     """
     Scan a Python codebase and build the dependency graph.
@@ -69,40 +123,67 @@ def scan(
     2. Extracts function and method definitions
     3. Computes semantic hashes for drift detection
     4. Stores snapshots in the database
+
+    Files unchanged since the last run are served from the parse cache.
+    The call graph is saved next to the database for `gdg impact`.
     """
     # Determine database path
     if db_path is None:
         db_path = path / DEFAULT_DB_PATH
 
+    try:
+        hash_digest = Digest.from_name(digest)
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        raise typer.Exit(1)
+
     console.print(f"\n[bold blue]📂 Scanning:[/bold blue] {path}\n")
 
+    # The database also holds the parse cache used while scanning
+    db = Database(db_path)
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
         console=console,
     ) as progress:
-        # Scanning phase
+        # Files are written to the database as they are parsed
         task = progress.add_task("Parsing Python files...", total=None)
+        result = _ScanProgress(progress, task)
+        graph = CodeGraph()
+        file_paths: list[str] = []
 
         try:
-            result = build_graph_from_directory(path)
+            record = db.save_scan(
+                str(path),
+                _add_to_graph(
+                    graph,
+                    file_paths,
+                    result.track(
+                        iter_scan(
+                            path,
+                            jobs=jobs,
+                            database=db,
+                            paranoid=paranoid,
+                            respect_gitignore=not no_gitignore,
+                            backend=parser.value,
+                            digest=hash_digest,
+                        )
+                    ),
+                ),
+                digest=hash_digest,
+            )
+            # Files missing from the manifest were too recently modified to trust
+            manifest = db.load_manifest()
+            fingerprints = {
+                file_path: manifest[file_path].fingerprint if file_path in manifest else None
+                for file_path in file_paths
+            }
+            save_graph_snapshot(graph, _snapshot_path(db_path), record.scan_id, fingerprints)
         except Exception as e:
             console.print(f"[bold red]Error:[/bold red] {e}")
             raise typer.Exit(1)
 
-        progress.update(task, description="Saving to database...")
-
-        # Save to database
-        db = Database(db_path)
-        scan_id = db.record_scan(
-            directory=str(path),
-            files_scanned=result.files_scanned,
-            nodes_found=result.node_count,
-            errors=result.error_count,
-        )
-        db.save_nodes(result.nodes, scan_id=scan_id)
-        db.save_edges(result.edges)
-
         progress.update(task, description="Done!")
 
     # Print summary
@@ -140,6 +221,30 @@ def status(
         "-a",
         help="Show all stale functions, not just top 5",
     ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of parallel worker processes (default: CPU count)",
+    ),
+    paranoid: bool = typer.Option(
+        False,
+        "--paranoid",
+        help="Re-read every file instead of trusting unchanged size and mtime",
+    ),
+    no_gitignore: bool = typer.Option(
+        False,
+        "--no-gitignore",
+        help="Also scan files ignored by .gitignore and .gendignore",
+    ),
+    parser: ParserChoice = typer.Option(
+        ParserChoice.auto,
+        "--parser",
+        help="Parser backend: libcst, the faster stdlib ast, or auto (the "
+        "one the stored hashes were computed with); a parser whose hashes "
+        "cannot be compared with the stored ones is replaced by that one",
+    ),
 ) -> None:
     """
     Display documentation drift summary.
@@ -165,15 +270,15 @@ def status(
 
     # Load data
     db = Database(db_path)
-    snapshots = db.load_snapshots()
 
-    if not snapshots:
+    if db.get_node_count() == 0:
         console.print("[yellow]No functions found in database.[/yellow]")
         raise typer.Exit(0)
 
     # For status, we need to re-scan to compare current vs stored
     # In a production system, we might cache this or use file watching
     console.print(f"\n[bold blue]📊 Documentation Status:[/bold blue] {path}\n")
+    backend = _comparable_backend(db, parser)
 
     with Progress(
         SpinnerColumn(),
@@ -181,22 +286,68 @@ def status(
         console=console,
     ) as progress:
         task = progress.add_task("Analyzing drift...", total=None)
+        result = _ScanProgress(progress, task, keep_nodes=True)
 
         try:
-            result = build_graph_from_directory(path)
+            result.consume(
+                iter_scan(
+                    path,
+                    jobs=jobs,
+                    database=db,
+                    paranoid=paranoid,
+                    respect_gitignore=not no_gitignore,
+                    backend=backend,
+                    digest=_last_scan_digest(db),
+                )
+            )
         except Exception as e:
             console.print(f"[bold red]Error:[/bold red] {e}")
             raise typer.Exit(1)
 
-        # Detect drift
-        detector = DriftDetector(snapshots)
+        # Only files whose rollup hash changed since the last scan can have
+        # drifted; nodes elsewhere match their snapshots exactly
+        hierarchy = db.load_hierarchy()
+        rollups = compute_rollups(result.nodes, path)
+        unchanged = "" in hierarchy and hierarchy[""].rollup_hash == rollups[""].rollup_hash
+        if hierarchy:
+            # Deleted files count as changed: their functions may have moved
+            changed = changed_files(hierarchy, rollups) | {
+                entry.file_path or entry.path
+                for entry in hierarchy.values()
+                if entry.kind == "file" and entry.path not in rollups
+            }
+            snapshots = db.load_snapshots(file_paths=sorted(changed)) if changed else {}
+        else:
+            snapshots = db.load_snapshots()
+
+        # Detect drift, matching moved or renamed functions to vanished ones;
+        # functions in unchanged files have snapshots too, just not loaded
+        stored_ids = db.load_node_ids()
+        detector = DriftDetector(
+            snapshots, _vanished_index(db, snapshots, result.nodes, stored_ids), stored_ids
+        )
         report = detector.generate_report(result.nodes)
 
         progress.update(task, description="Done!")
 
+    if unchanged:
+        console.print("[dim]No changes since the last scan.[/dim]")
+    if report.moved_nodes:
+        console.print(
+            f"[dim]{len(report.moved_nodes)} function(s) matched to moved or renamed "
+            f"predecessors.[/dim]"
+        )
+
     # Print status table
     _print_status_table(report)
 
+    if report.incomparable_nodes:
+        console.print(
+            f"\n[red]⚠️  {report.incomparable_count} function(s) could not be compared: "
+            f"their stored hashes use another scheme or digest.[/red] "
+            f"[dim]Use [bold]gdg explain <id>[/bold] to see which parser to rerun with.[/dim]"
+        )
+
     # Print stale functions
     if report.stale_nodes:
         limit = None if show_all else 5
@@ -230,6 +381,30 @@ def explain(
         "-d",
         help="Path to the database file",
     ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Number of parallel worker processes (default: CPU count)",
+    ),
+    paranoid: bool = typer.Option(
+        False,
+        "--paranoid",
+        help="Re-read every file instead of trusting unchanged size and mtime",
+    ),
+    no_gitignore: bool = typer.Option(
+        False,
+        "--no-gitignore",
+        help="Also scan files ignored by .gitignore and .gendignore",
+    ),
+    parser: ParserChoice = typer.Option(
+        ParserChoice.auto,
+        "--parser",
+        help="Parser backend: libcst, the faster stdlib ast, or auto (the "
+        "one the stored hashes were computed with); a parser whose hashes "
+        "cannot be compared with the stored ones is replaced by that one",
+    ),
 ) -> None:
     """
     Show detailed drift information for a specific function.
@@ -256,6 +431,7 @@ def explain(
     # Load data
     db = Database(db_path)
     snapshots = db.load_snapshots()
+    backend = _comparable_backend(db, parser)
 
     # Re-scan to get current state
     with Progress(
@@ -264,9 +440,20 @@ def explain(
         console=console,
     ) as progress:
         task = progress.add_task("Loading...", total=None)
+        result = _ScanProgress(progress, task, keep_nodes=True)
 
         try:
-            result = build_graph_from_directory(path)
+            result.consume(
+                iter_scan(
+                    path,
+                    jobs=jobs,
+                    database=db,
+                    paranoid=paranoid,
+                    respect_gitignore=not no_gitignore,
+                    backend=backend,
+                    digest=_last_scan_digest(db),
+                )
+            )
         except Exception as e:
             console.print(f"[bold red]Error:[/bold red] {e}")
             raise typer.Exit(1)
@@ -292,7 +479,10 @@ def explain(
         raise typer.Exit(1)
 
     # Generate explanation
-    detector = DriftDetector(snapshots)
+    detector = DriftDetector(
+        snapshots, _vanished_index(db, snapshots, result.nodes, snapshots.keys())
+    )
+    detector.match_successors(result.nodes)
     explanation = detector.explain(node)
 
     # Print explanation
@@ -355,6 +545,317 @@ def history(
     console.print(table)
 
 
+@app.command()
+def dupes(
+    path: Optional[Path] = typer.Argument(
+        None,
+        help="Path to the project (default: current directory)",
+    ),
+    db_path: Optional[Path] = typer.Option(
+        None,
+        "--db",
+        "-d",
+        help="Path to the database file",
+    ),
+    min_lines: int = typer.Option(
+        1,
+        "--min-lines",
+        min=1,
+        help="Ignore functions shorter than this many lines",
+    ),
+    show_all: bool = typer.Option(
+        False,
+        "--all",
+        "-a",
+        help="Show all clusters, not just the 10 largest",
+    ),
+) -> None:
+    """
+    List clusters of semantically identical functions from the last scan.
+
+    Documenting one member of a cluster and linking the others to it
+    keeps their documentation from drifting apart.
+    """
+    if path is None:
+        path = Path.cwd()
+
+    if db_path is None:
+        db_path = path / DEFAULT_DB_PATH
+
+    if not db_path.exists():
+        console.print(
+            f"[yellow]No scan data found.[/yellow] Run [bold]gdg scan {path}[/bold] first."
+        )
+        raise typer.Exit(1)
+
+    clusters = Database(db_path).find_duplicates(min_lines=min_lines)
+
+    if not clusters:
+        console.print("[green]No duplicate functions found.[/green]")
+        raise typer.Exit(0)
+
+    total = sum(len(cluster.members) for cluster in clusters)
+    console.print(
+        f"\n[bold blue]🔁 Duplicate Functions:[/bold blue] {len(clusters)} cluster(s), "
+        f"{total} functions\n"
+    )
+
+    display = clusters if show_all else clusters[:10]
+    for cluster in display:
+        console.print(
+            f"[bold]{len(cluster.members)} copies[/bold] "
+            f"[dim]({cluster.documented_count} documented, "
+            f"hash {cluster.semantic_hash[:12]}...)[/dim]"
+        )
+        for member in cluster.members:
+            icon = "[green]✓[/green]" if member.documented else "[dim]○[/dim]"
+            console.print(
+                f"   {icon} [cyan]{member.node_id.split(':')[-1]}[/cyan] "
+                f"[dim]({member.file_path}:{member.start_line})[/dim]"
+            )
+
+    if len(display) < len(clusters):
+        console.print(f"\n[dim]... and {len(clusters) - len(display)} more (use --all)[/dim]")
+
+
+@app.command()
+def impact(
+    function_id: str = typer.Argument(
+        ...,
+        help="Function ID (e.g., module:function or file.py:Class.method)",
+    ),
+    path: Optional[Path] = typer.Argument(
+        None,
+        help="Path to the project (default: current directory)",
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+    ),
+    db_path: Optional[Path] = typer.Option(
+        None,
+        "--db",
+        "-d",
+        help="Path to the database file",
+    ),
+    depth: Optional[int] = typer.Option(
+        None,
+        "--depth",
+        min=1,
+        help="Only follow callers up to this many calls away",
+    ),
+    show_all: bool = typer.Option(
+        False,
+        "--all",
+        "-a",
+        help="Show all affected functions, not just the 20 nearest",
+    ),
+) -> None:
+    """
+    List the functions whose documentation a change to a function may affect.
+
+    Every transitive caller is listed with its distance in calls. The call
+    graph saved by the last scan is used, so nothing is re-parsed.
+    """
+    if path is None:
+        path = Path.cwd()
+
+    if db_path is None:
+        db_path = path / DEFAULT_DB_PATH
+
+    if not db_path.exists():
+        console.print(
+            f"[yellow]No scan data found.[/yellow] Run [bold]gdg scan {path}[/bold] first."
+        )
+        raise typer.Exit(1)
+
+    scans = Database(db_path).get_scan_history(1)
+    snapshot = load_graph_snapshot(_snapshot_path(db_path), scans[0].scan_id) if scans else None
+    if snapshot is None:
+        console.print(
+            f"[yellow]No current call graph found.[/yellow] Run [bold]gdg scan {path}[/bold] first."
+        )
+        raise typer.Exit(1)
+
+    modified = snapshot.modified_files()
+    if modified:
+        console.print(
+            f"[dim]{len(modified)} file(s) may have changed since the last scan; "
+            f"run [bold]gdg scan[/bold] to include them.[/dim]"
+        )
+
+    graph = snapshot.graph
+
+    node_ids = list(graph.get_all_node_ids())
+    node_id = next(
+        (n for n in node_ids if n == function_id or n.endswith(f":{function_id}")), None
+    )
+    if node_id is None:
+        matches = [n for n in node_ids if function_id in n]
+        if matches:
+            console.print(f"[yellow]Function '{function_id}' not found. Did you mean:[/yellow]")
+            for m in matches[:5]:
+                console.print(f"   • {m}")
+        else:
+            console.print(f"[red]Function '{function_id}' not found.[/red]")
+        raise typer.Exit(1)
+
+    distances = graph.get_impact_distances([node_id], max_depth=depth)
+    affected = sorted((distance, caller_id) for caller_id, distance in distances.items())[1:]
+
+    console.print(f"\n[bold blue]💥 Impact:[/bold blue] {node_id}\n")
+    if not affected:
+        console.print("[green]No callers found.[/green]")
+        raise typer.Exit(0)
+
+    table = Table(box=box.ROUNDED)
+    table.add_column("Calls away", justify="right")
+    table.add_column("Function", style="cyan")
+    table.add_column("Location", style="dim")
+
+    display = affected if show_all else affected[:20]
+    for distance, caller_id in display:
+        node = graph.get_node(caller_id)
+        location = f"{node.file_path}:{node.start_line}" if node else "unresolved"
+        table.add_row(str(distance), caller_id.split(":")[-1], location)
+
+    console.print(table)
+    console.print(f"\n[dim]{len(affected)} function(s) affected.[/dim]")
+    if len(display) < len(affected):
+        console.print(f"[dim]... and {len(affected) - len(display)} more (use --all)[/dim]")
+
+
+def _last_scan_digest(db: Database) -> Digest:
+    """Digest of the most recent scan, so rescans produce comparable hashes."""
+    scans = db.get_scan_history(1)
+    return Digest.from_name(scans[0].digest) if scans else DEFAULT_DIGEST
+
+
+def _comparable_backend(db: Database, parser: ParserChoice) -> str:
+    """
+    Parser backend for read-only commands, chosen so its hashes are comparable.
+
+    Auto picks the backend of the stored hashes, so a database scanned with
+    ast gets the fast path. An explicit choice whose hashes cannot be
+    compared with the stored ones would leave drift undetected, so it is
+    replaced, with a warning.
+    """
+    schemes = db.load_hash_schemes()
+    stored = {backend_for_scheme(scheme) for scheme in schemes} - {None}
+    if not stored:
+        return parser.value
+
+    # Databases scanned with auto may hold a few ast hashes of files that
+    # LibCST could not parse; auto reproduces those
+    preferred = "ast" if stored == {"ast"} else "auto"
+    if parser == ParserChoice.auto:
+        return preferred
+    if (parser.value == "ast") != (preferred == "ast"):
+        replacement = "ast" if preferred == "ast" else "libcst"
+        console.print(
+            f"[yellow]⚠️  Stored hashes use {', '.join(sorted(schemes))}, which the "
+            f"{parser.value} parser does not compute; using {replacement} instead.[/yellow]"
+        )
+        return preferred
+    return parser.value
+
+
+def _vanished_index(
+    db: Database,
+    snapshots: dict[str, NodeSnapshot],
+    nodes: list[CodeNode],
+    stored_ids: Iterable[str],
+) -> SimilarityIndex:
+    """
+    Similarity index of the snapshotted nodes missing from the current scan.
+
+    Only those sharing an LSH bucket with a documented node without a
+    snapshot, the nodes the detector tries to match, are loaded.
+    """
+    stored_ids = set(stored_ids)
+    new_minhashes = [
+        node.minhash
+        for node in nodes
+        if node.has_docstring and node.minhash and node.id not in stored_ids
+    ]
+    if not new_minhashes:
+        return SimilarityIndex()
+
+    current_ids = {node.id for node in nodes}
+    return db.load_similar_signatures(
+        new_minhashes, [node_id for node_id in snapshots if node_id not in current_ids]
+    )
+
+
+def _snapshot_path(db_path: Path) -> Path:
+    """Where the call graph of the last scan is saved, next to the database."""
+    return db_path.with_suffix(".graph")
+
+
+def _add_to_graph(
+    graph: CodeGraph, file_paths: list[str], results: Iterable[FileScanResult]
+) -> Iterator[FileScanResult]:
+    """Pass results through, adding them to the graph and their paths to file_paths."""
+    for file_result in results:
+        file_paths.append(file_result.file_path)
+        if file_result.ok:
+            for node in file_result.nodes:
+                graph.add_node(node)
+            for edge in file_result.edges:
+                graph.add_edge(edge)
+        yield file_result
+
+
+class _ScanProgress:
+    """
+    Tallies streamed per-file scan results and shows them on a progress task.
+
+    Exposes the same summary attributes as ScanResult, so it can be passed
+    to the output helpers below. Nodes are only retained with keep_nodes.
+    """
+
+    def __init__(self, progress: Progress, task: TaskID, keep_nodes: bool = False) -> None:
+        self._progress = progress
+        self._task = task
+        self._description = progress.tasks[task].description.rstrip(".")
+        self._keep_nodes = keep_nodes
+        self._start_time = time.time()
+        self.nodes: list[CodeNode] = []
+        self.files_scanned = 0
+        self.node_count = 0
+        self.edge_count = 0
+        self.errors: list[tuple[str, str]] = []
+        self.scan_time_seconds = 0.0
+
+    @property
+    def error_count(self) -> int:
+        return len(self.errors)
+
+    def track(self, results: Iterable[FileScanResult]) -> Iterator[FileScanResult]:
+        """Pass results through, counting each one as it arrives."""
+        for file_result in results:
+            if file_result.ok:
+                self.files_scanned += 1
+                self.node_count += len(file_result.nodes)
+                self.edge_count += len(file_result.edges)
+                if self._keep_nodes:
+                    self.nodes.extend(file_result.nodes)
+            else:
+                self.errors.append((file_result.file_path, file_result.error))
+
+            done = self.files_scanned + self.error_count
+            self._progress.update(
+                self._task, description=f"{self._description} ({done} files)"
+            )
+            self.scan_time_seconds = time.time() - self._start_time
+            yield file_result
+
+    def consume(self, results: Iterable[FileScanResult]) -> None:
+        """Track results without passing them on."""
+        for _ in self.track(results):
+            pass
+
+
 # Helper functions for output formatting
 
 def _print_scan_summary(result, db_path: Path) -> None:
@@ -401,6 +902,12 @@ def _print_status_table(report) -> None:
         str(report.undocumented_count),
         f"{(report.undocumented_count / total) * 100:.1f}%",
     )
+    if report.incomparable_count:
+        table.add_row(
+            "[red]≠ Not comparable[/red]",
+            str(report.incomparable_count),
+            f"{(report.incomparable_count / total) * 100:.1f}%",
+        )
     table.add_row("", "", "")
     table.add_row("[bold]Total[/bold]", f"[bold]{total}[/bold]", "100%")
 
@@ -434,11 +941,13 @@ def _print_explanation(explanation, node) -> None:
         DriftStatus.FRESH: "green",
         DriftStatus.STALE: "yellow",
         DriftStatus.UNDOCUMENTED: "dim",
+        DriftStatus.INCOMPARABLE: "red",
     }
     status_icons = {
         DriftStatus.FRESH: "✓",
         DriftStatus.STALE: "⚠",
         DriftStatus.UNDOCUMENTED: "○",
+        DriftStatus.INCOMPARABLE: "≠",
     }
 
     color = status_colors[explanation.current_status]
@@ -451,6 +960,12 @@ def _print_explanation(explanation, node) -> None:
         f"[bold]Status:[/bold] [{color}]{icon} {explanation.current_status.value.upper()}[/{color}]"
     )
 
+    if explanation.predecessor_id:
+        console.print(f"[bold]Previously:[/bold] {explanation.predecessor_id}")
+
+    if explanation.changed_sections:
+        console.print(f"[bold]Changed:[/bold] {', '.join(explanation.changed_sections)}")
+
     console.print(f"\n[bold]Reason:[/bold]")
     console.print(f"   {explanation.reason}")
 
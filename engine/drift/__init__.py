@@ -7,12 +7,14 @@ current code semantics against stored snapshots.
 
 from engine.drift.detector import (
     DriftDetector,
+    changed_sections,
     detect_node_drift,
     analyze_codebase_drift,
 )
 
 __all__ = [
     "DriftDetector",
+    "changed_sections",
     "detect_node_drift",
     "analyze_codebase_drift",
 ]
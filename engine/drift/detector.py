@@ -17,6 +17,24 @@ Drift States:
     UNDOCUMENTED: No docstring exists for this function
            - Cannot assess freshness without documentation
 
+    INCOMPARABLE: The stored hash was computed with another hash scheme
+           or digest, so it cannot be compared with the current hash
+           - Not counted as FRESH: rerun with the stored scheme's parser;
+             only the next scan, which writes a new baseline, re-bases it
+
+Moved and Renamed Functions:
+    A node ID embeds the file path and qualified name, so moving or
+    renaming a function gives it a new ID without a snapshot. Given a
+    SimilarityIndex of the snapshots whose IDs disappeared, the detector
+    matches such nodes to their most similar predecessor and compares them
+    against its snapshot instead of treating them as new.
+
+Changed Sections:
+    Signature, body and decorator hashes (engine.hash.sections) are stored
+    with every snapshot, so explain reports which part of a STALE function
+    changed without the old source, and callers interested only in the
+    public interface can check for signature changes alone.
+
 Academic Context:
     Input: Current CodeNodes + Stored NodeSnapshots
     Transformation: Hash comparison with state classification
@@ -30,10 +48,17 @@ Design Decisions:
 """
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Optional
+from engine.hash.sections import SECTIONS
+from engine.hash.similarity import SimilarityIndex
+from engine.parser.backends import backend_for_scheme
 from engine.models import CodeNode, DriftStatus, DriftReport, NodeSnapshot
 
 
+# Minimum estimated similarity for a vanished node to count as a predecessor
+SUCCESSOR_THRESHOLD = 0.7
+
+
 @dataclass
 class DriftExplanation:
     """
@@ -50,6 +75,10 @@ class DriftExplanation:
         current_doc_hash: Current hash of docstring
         stored_doc_hash: Stored hash of docstring from last scan
         suggestions: Action items for the developer
+        predecessor_id: Vanished node whose snapshot was used, if the node
+            was matched as moved or renamed
+        changed_sections: Sections whose hashes differ from the snapshot
+            (see changed_sections), or None if they cannot be compared
     """
 
     node_id: str
@@ -60,6 +89,8 @@ class DriftExplanation:
     current_doc_hash: Optional[str]
     stored_doc_hash: Optional[str]
     suggestions: list[str]
+    predecessor_id: Optional[str] = None
+    changed_sections: Optional[list[str]] = None
 
 
 class DriftDetector:
@@ -70,7 +101,8 @@ class DriftDetector:
     them against current node states to classify drift.
 
     Usage:
-        detector = DriftDetector(stored_snapshots)
+        detector = DriftDetector(stored_snapshots, similarity_index)
+        detector.match_successors(current_nodes)  # Optional
         status = detector.detect(current_node)
         explanation = detector.explain(current_node)
     """
@@ -78,6 +110,8 @@ class DriftDetector:
     def __init__(
         self,
         stored_snapshots: Optional[dict[str, NodeSnapshot]] = None,
+        similarity_index: Optional[SimilarityIndex] = None,
+        stored_ids: Optional[Iterable[str]] = None,
     ) -> None:
         """
         Initialize the detector with stored snapshots.
@@ -85,8 +119,62 @@ class DriftDetector:
         Args:
             stored_snapshots: Dictionary mapping node IDs to their last snapshots.
                               If None, all documented nodes are considered FRESH.
+            similarity_index: Signatures of stored nodes that may have been
+                              moved or renamed; without it no successors
+                              are matched
+            stored_ids: IDs of every stored snapshot, when stored_snapshots
+                        holds only some of them (e.g. those of changed
+                        files); nodes with these IDs are never matched as
+                        successors (default: the keys of stored_snapshots)
         """
         self._snapshots = stored_snapshots or {}
+        self._similarity = similarity_index
+        self._stored_ids = self._snapshots.keys() if stored_ids is None else set(stored_ids)
+        self._predecessors: dict[str, str] = {}
+
+    def match_successors(self, nodes: list[CodeNode]) -> dict[str, str]:
+        """
+        Match moved or renamed nodes to the vanished nodes they replace.
+
+        Documented nodes without a stored snapshot are looked up in the
+        similarity index; candidates must have a snapshot and an ID absent
+        from nodes.
+        Pairs are assigned one-to-one, most similar first, and only above
+        SUCCESSOR_THRESHOLD. Later calls to detect and explain compare
+        matched nodes against their predecessor's snapshot.
+
+        Args:
+            nodes: All current CodeNodes
+
+        Returns:
+            Mapping of new node IDs to the IDs of their predecessors
+        """
+        self._predecessors = {}
+        if not self._similarity:
+            return {}
+
+        current_ids = {node.id for node in nodes}
+        pairs: list[tuple[float, str, str]] = []
+        for node in nodes:
+            if not node.has_docstring or not node.minhash or node.id in self._stored_ids:
+                continue
+            for old_id, score in self._similarity.query(node.minhash, SUCCESSOR_THRESHOLD):
+                if old_id not in current_ids and old_id in self._snapshots:
+                    pairs.append((score, node.id, old_id))
+
+        claimed: set[str] = set()
+        for _, new_id, old_id in sorted(pairs, key=lambda pair: (-pair[0], pair[1], pair[2])):
+            if new_id not in self._predecessors and old_id not in claimed:
+                self._predecessors[new_id] = old_id
+                claimed.add(old_id)
+        return dict(self._predecessors)
+
+    def _snapshot_for(self, node: CodeNode) -> Optional[NodeSnapshot]:
+        """The node's own snapshot, else that of its matched predecessor."""
+        snapshot = self._snapshots.get(node.id)
+        if snapshot is None and node.id in self._predecessors:
+            snapshot = self._snapshots[self._predecessors[node.id]]
+        return snapshot
 
     def detect(self, node: CodeNode) -> DriftStatus:
         """
@@ -94,10 +182,11 @@ class DriftDetector:
 
         Classification Rules:
             1. If no docstring → UNDOCUMENTED
-            2. If no stored snapshot → FRESH (new node)
-            3. If semantic_hash matches → FRESH (unchanged)
-            4. If doc_hash changed → FRESH (docs updated)
-            5. Otherwise → STALE (code changed, docs didn't)
+            2. If no stored snapshot (own or predecessor's) → FRESH (new node)
+            3. If hash_scheme differs → INCOMPARABLE
+            4. If semantic_hash matches → FRESH (unchanged)
+            5. If doc_hash changed → FRESH (docs updated)
+            6. Otherwise → STALE (code changed, docs didn't)
 
         Args:
             node: The current CodeNode to analyze
@@ -105,7 +194,22 @@ class DriftDetector:
         Returns:
             The detected DriftStatus
         """
-        return detect_node_drift(node, self._snapshots.get(node.id))
+        return detect_node_drift(node, self._snapshot_for(node))
+
+    def changed_sections(self, node: CodeNode) -> Optional[list[str]]:
+        """
+        Sections of a node that changed since its snapshot.
+
+        A cheap check for callers that only care about part of a function,
+        e.g. ``"signature" in detector.changed_sections(node)``.
+
+        Args:
+            node: The current CodeNode
+
+        Returns:
+            See changed_sections
+        """
+        return changed_sections(node, self._snapshot_for(node))
 
     def detect_all(self, nodes: list[CodeNode]) -> list[CodeNode]:
         """
@@ -134,11 +238,13 @@ class DriftDetector:
         Returns:
             DriftExplanation with full details and suggestions
         """
-        snapshot = self._snapshots.get(node.id)
+        snapshot = self._snapshot_for(node)
+        predecessor_id = self._predecessors.get(node.id) if node.id not in self._snapshots else None
         status = self.detect(node)
 
         stored_semantic = snapshot.semantic_hash if snapshot else None
         stored_doc = snapshot.doc_hash if snapshot else None
+        sections = changed_sections(node, snapshot)
 
         # Build explanation based on status
         if status == DriftStatus.UNDOCUMENTED:
@@ -149,16 +255,33 @@ class DriftDetector:
                 "Include usage examples if complex",
             ]
         elif status == DriftStatus.FRESH:
+            suggestions = ["No action needed."]
             if snapshot is None:
                 reason = "This is a new function with documentation."
             elif node.semantic_hash == stored_semantic:
                 reason = "Code logic is unchanged since last documentation."
             else:
                 reason = "Documentation was updated after code changes."
-            suggestions = ["No action needed."]
+        elif status == DriftStatus.INCOMPARABLE:
+            reason = (
+                f"Stored hash uses the {snapshot.hash_scheme} scheme, current hash "
+                f"uses {node.hash_scheme}; hashes cannot be compared."
+            )
+            backend = backend_for_scheme(snapshot.hash_scheme)
+            if backend is not None and backend != backend_for_scheme(node.hash_scheme):
+                suggestions = [f"Rerun with '--parser {backend}' to compare with the stored hash"]
+            else:
+                suggestions = [f"Rerun with the {snapshot.hash_scheme} scheme to compare"]
+            suggestions.append(
+                "Review the docstring before the next 'gdg scan', which replaces the stored hash"
+            )
         else:  # STALE
+            if sections:
+                changed = f"Code changed in the {_join_sections(sections)}"
+            else:
+                changed = "Code logic changed (hash differs)"
             reason = (
-                f"Code logic changed (hash differs) but docstring unchanged.\n"
+                f"{changed} but docstring unchanged.\n"
                 f"  - Old code hash: {stored_semantic[:16]}...\n"
                 f"  - New code hash: {node.semantic_hash[:16]}..."
             )
@@ -167,6 +290,13 @@ class DriftDetector:
                 "Update the docstring to reflect current behavior",
                 "Run 'gdg scan' again after updating",
             ]
+            if sections and "signature" in sections:
+                suggestions.insert(1, "Update the documented parameters and return value")
+            if sections and "decorators" in sections:
+                suggestions.insert(1, "Check whether the decorator changes alter behavior")
+
+        if predecessor_id is not None and status != DriftStatus.UNDOCUMENTED:
+            reason = f"Matched to {predecessor_id} (moved or renamed). {reason}"
 
         return DriftExplanation(
             node_id=node.id,
@@ -177,19 +307,32 @@ class DriftDetector:
             current_doc_hash=node.doc_hash,
             stored_doc_hash=stored_doc,
             suggestions=suggestions,
+            predecessor_id=predecessor_id,
+            changed_sections=sections,
         )
 
     def generate_report(self, nodes: list[CodeNode]) -> DriftReport:
         """
         Generate a summary report of drift across all nodes.
 
+        Moved and renamed nodes are matched first (see match_successors).
+
         Args:
             nodes: List of CodeNodes to analyze
 
         Returns:
             DriftReport with counts and lists of affected nodes
         """
-        return analyze_codebase_drift(nodes, self._snapshots)
+        predecessors = self.match_successors(nodes)
+        snapshots = self._snapshots
+        if predecessors:
+            snapshots = dict(snapshots)
+            for new_id, old_id in predecessors.items():
+                snapshots[new_id] = self._snapshots[old_id]
+
+        report = analyze_codebase_drift(nodes, snapshots)
+        report.moved_nodes = predecessors
+        return report
 
     def add_snapshot(self, snapshot: NodeSnapshot) -> None:
         """
@@ -230,9 +373,10 @@ def detect_node_drift(
     Rules (in order):
         1. No docstring → UNDOCUMENTED
         2. No stored snapshot → FRESH (new node)
-        3. Semantic hash unchanged → FRESH
-        4. Doc hash changed → FRESH (docs updated)
-        5. Otherwise → STALE
+        3. Hash scheme changed → INCOMPARABLE (hashes cannot be compared)
+        4. Semantic hash unchanged → FRESH
+        5. Doc hash changed → FRESH (docs updated)
+        6. Otherwise → STALE
     """
     # Rule 1: No docstring
     if not node.has_docstring:
@@ -242,18 +386,58 @@ def detect_node_drift(
     if stored is None:
         return DriftStatus.FRESH
 
-    # Rule 3: Semantic hash unchanged
+    # Rule 3: Stored hash from another scheme; never evidence either way
+    if node.hash_scheme != stored.hash_scheme:
+        return DriftStatus.INCOMPARABLE
+
+    # Rule 4: Semantic hash unchanged
     if node.semantic_hash == stored.semantic_hash:
         return DriftStatus.FRESH
 
-    # Rule 4: Doc hash changed (documentation was updated)
+    # Rule 5: Doc hash changed (documentation was updated)
     if node.doc_hash != stored.doc_hash:
         return DriftStatus.FRESH
 
-    # Rule 5: Code changed but docs didn't
+    # Rule 6: Code changed but docs didn't
     return DriftStatus.STALE
 
 
+def changed_sections(
+    node: CodeNode,
+    stored: Optional[NodeSnapshot],
+) -> Optional[list[str]]:
+    """
+    Find the sections of a node whose hashes differ from a snapshot's.
+
+    Args:
+        node: The current state of the code node
+        stored: The stored snapshot to compare against, or None
+
+    Returns:
+        Names from engine.hash.sections.SECTIONS, in that order; None if
+        there is no snapshot, the hash schemes differ, or either side has
+        no section hashes (e.g. a snapshot from an older version)
+    """
+    if stored is None or node.hash_scheme != stored.hash_scheme:
+        return None
+
+    pairs = {
+        "signature": (node.signature_hash, stored.signature_hash),
+        "body": (node.body_hash, stored.body_hash),
+        "decorators": (node.decorator_hash, stored.decorator_hash),
+    }
+    if any(current is None or previous is None for current, previous in pairs.values()):
+        return None
+    return [name for name in SECTIONS if pairs[name][0] != pairs[name][1]]
+
+
+def _join_sections(sections: list[str]) -> str:
+    """Sections as an English list: "signature, body and decorators"."""
+    if len(sections) == 1:
+        return sections[0]
+    return f"{', '.join(sections[:-1])} and {sections[-1]}"
+
+
 def analyze_codebase_drift(
     nodes: list[CodeNode],
     stored_snapshots: Optional[dict[str, NodeSnapshot]] = None,
@@ -279,8 +463,10 @@ def analyze_codebase_drift(
     fresh_count = 0
     stale_count = 0
     undocumented_count = 0
+    incomparable_count = 0
     stale_nodes: list[str] = []
     undocumented_nodes: list[str] = []
+    incomparable_nodes: list[str] = []
 
     for node in nodes:
         status = detect_node_drift(node, stored_snapshots.get(node.id))
@@ -290,6 +476,9 @@ def analyze_codebase_drift(
         elif status == DriftStatus.STALE:
             stale_count += 1
             stale_nodes.append(node.id)
+        elif status == DriftStatus.INCOMPARABLE:
+            incomparable_count += 1
+            incomparable_nodes.append(node.id)
         else:
             undocumented_count += 1
             undocumented_nodes.append(node.id)
@@ -300,4 +489,6 @@ def analyze_codebase_drift(
         undocumented_count=undocumented_count,
         stale_nodes=stale_nodes,
         undocumented_nodes=undocumented_nodes,
+        incomparable_count=incomparable_count,
+        incomparable_nodes=incomparable_nodes,
     )
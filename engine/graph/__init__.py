@@ -1,18 +1,32 @@
 """
 Graph module for Gen-D.
 
-This module provides NetworkX-based graph construction and management
+This module provides call graph construction and management
 for representing function-level dependencies in Python codebases.
 """
 
 from engine.graph.builder import (
     CodeGraph,
+    GraphArrays,
+    GraphDelta,
     build_graph_from_source,
     build_graph_from_directory,
+    file_fingerprint,
+    iter_scan,
 )
+from engine.graph.discovery import iter_python_files
+from engine.graph.snapshot import GraphSnapshot, load_graph_snapshot, save_graph_snapshot
 
 __all__ = [
     "CodeGraph",
+    "GraphArrays",
+    "GraphDelta",
+    "GraphSnapshot",
     "build_graph_from_source",
     "build_graph_from_directory",
+    "file_fingerprint",
+    "iter_python_files",
+    "iter_scan",
+    "load_graph_snapshot",
+    "save_graph_snapshot",
 ]
@@ -1,19 +1,23 @@
 """
 Graph Builder for Gen-D
 
-This module constructs and manages a NetworkX-based dependency graph
+This module constructs and manages a dependency graph
 where nodes represent functions/methods and edges represent call relationships.
 
 Design Decisions:
-    - Uses NetworkX DiGraph for directed call relationships
-    - Stores CodeNode objects as node attributes
-    - Edges are lightweight (just caller/callee relationship)
+    - Node IDs are interned to integers; CodeNodes are kept in a flat list
+    - Edges are integer arrays compacted into CSR adjacency (callees and callers)
+    - A NetworkX DiGraph is only built on demand (CodeGraph.to_networkx)
     - Graph is authoritative in memory; SQLite stores snapshots only
+    - Files are parsed in a process pool; results merge in file order
+    - Per-file parse results are cached by content digest in the database
+    - A stat manifest lets unchanged files be reused without reading them
+    - iter_scan streams per-file results; whole-tree results are built on it
 
 Academic Context:
     Input: List of CodeNodes and CallEdges from parser
     Transformation: Graph construction with attribute storage
-    Output: NetworkX DiGraph with traversal utilities
+    Output: Directed call graph with traversal utilities
     Limitation: Static analysis cannot resolve all call targets
 
 Graph Properties:
@@ -23,20 +27,114 @@ Graph Properties:
     - Node IDs are stable qualified names
 """
 
+import hashlib
+import os
+import sys
+import time
+import warnings
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from importlib.metadata import version
+from itertools import compress, islice, repeat
+from operator import is_
 from pathlib import Path
-from typing import Iterator, Optional
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
 import networkx as nx
 
-from engine.models import CodeNode, CallEdge, DriftStatus, ScanResult
-from engine.parser import extract_functions_from_file, extract_calls_from_source
-from engine.hash import compute_semantic_hash, compute_doc_hash
+from engine import __version__
+from engine.models import (
+    CodeNode,
+    CallEdge,
+    DriftReport,
+    DriftStatus,
+    FileScanResult,
+    ScanResult,
+)
+from engine.graph.discovery import iter_python_files
+from engine.parser import extract_functions_and_calls_from_source
+from engine.parser.backends import BACKEND_CHOICES, DEFAULT_BACKEND, extract_with_backend
+from engine.parser.extractor import CallInfo, FunctionInfo
+from engine.hash import (
+    AST_HASH_SCHEME,
+    CST_HASH_SCHEME,
+    DEFAULT_DIGEST,
+    HASH_SCHEMES,
+    SECTIONS,
+    SIMILARITY_SCHEME,
+    Digest,
+    FunctionHashes,
+    compute_doc_hash,
+    qualified_scheme,
+)
+from engine.storage import Database, ManifestEntry
+
+
+# Parse cache entries are only valid for the versions that produced them
+_CACHE_VERSION = (
+    f"gen-d {__version__}; libcst {version('libcst')}; "
+    f"python {sys.version_info.major}.{sys.version_info.minor}; "
+    f"hashes {','.join(HASH_SCHEMES)}; sections {','.join(SECTIONS)}; "
+    f"similarity {SIMILARITY_SCHEME}"
+)
+
+
+# Staged edges are merged into the sorted arrays one by one while they are
+# at most this fraction of them; more are sorted in with a full rebuild
+_MERGE_FRACTION = 0.01
+
+
+@dataclass
+class GraphDelta:
+    """
+    Node IDs affected by CodeGraph.replace_file.
+
+    Attributes:
+        added: Nodes the file did not define before
+        removed: Nodes the file no longer defines
+        changed: Nodes defined before and after whose code or docstring
+            hash differs
+    """
+
+    added: set[str] = field(default_factory=set)
+    removed: set[str] = field(default_factory=set)
+    changed: set[str] = field(default_factory=set)
+
+
+@dataclass
+class GraphArrays:
+    """
+    The storage of a CodeGraph as flat columns indexed by node index.
+
+    See CodeGraph.to_arrays and CodeGraph.from_arrays. The edge arrays hold
+    node indices.
+
+    Attributes:
+        ids: Node ID at each index, None for freed indices
+        statuses: DriftStatus of the node at each index, None for
+            placeholders and freed indices
+        edge_callers: Callers of the unique edges, sorted by (caller, callee)
+        edge_callees: Callees of the same edges
+        edge_lines: Call line of the same edges, 0 for no call line
+        reverse_callees: Callees of the edges, sorted by (callee, caller)
+        reverse_callers: Callers of the edges in the same order
+    """
+
+    ids: list[Optional[str]]
+    statuses: list[Optional[DriftStatus]]
+    edge_callers: array
+    edge_callees: array
+    edge_lines: array
+    reverse_callees: array
+    reverse_callers: array
 
 
 class CodeGraph:
     """
     A graph representation of a Python codebase.
 
-    Wraps a NetworkX DiGraph to provide a clean interface for:
+    Provides a clean interface for:
     - Adding and retrieving function nodes
     - Adding call edges between functions
     - Traversing dependencies
@@ -45,8 +143,31 @@ class CodeGraph:
     The graph uses qualified function names as node identifiers,
     ensuring uniqueness across the codebase.
 
+    Storage:
+        Node IDs are interned to consecutive integers on first use. Each
+        index holds the ID and the CodeNode (None for placeholders created
+        by edges to unknown callees) in plain lists, so a node costs two
+        list slots instead of a NetworkX attribute dict. Edges are kept
+        in parallel integer arrays (caller, callee, call line), sorted by
+        (caller, callee) and deduplicated, plus a copy of the caller and
+        callee arrays sorted by (callee, caller). A node's callees and
+        callers are contiguous runs found by binary search. New edges are
+        staged at the end of the arrays and sorted in the first time a
+        query needs them: merged in place when there are few, rebuilt from
+        scratch otherwise.
+
+        Drift statuses are a column of their own, indexed by a membership
+        set per DriftStatus, so listing and counting nodes of one status
+        costs the size of the result. update_node_status only moves the
+        index between sets; the CodeNode is rebuilt with its new status
+        when it is next read.
+
+        replace_file swaps one file's nodes and outgoing edges in place.
+        Removed nodes that no edge references any more are released when
+        the edges are next sorted, and their indices are reused.
+
     Attributes:
-        graph: The underlying NetworkX DiGraph
+        graph: Deprecated alias of to_networkx(), which builds a copy
         file_index: Mapping from file paths to their node IDs
 
     Usage:
@@ -59,23 +180,90 @@ class CodeGraph:
 
     def __init__(self) -> None:
         """Initialize an empty code graph."""
-        self._graph: nx.DiGraph = nx.DiGraph()
+        self._ids: list[Optional[str]] = []  # None for released indices
+        self._index: dict[str, int] = {}
+        self._nodes: list[Optional[CodeNode]] = []
+        # Set for every node and None for placeholders, so it marks presence
+        self._statuses: list[Optional[DriftStatus]] = []
+        self._status_index: dict[DriftStatus, set[int]] = {status: set() for status in DriftStatus}
         self._file_index: dict[str, set[str]] = {}
+        # Unique edges sorted by (caller, callee), followed by staged ones
+        self._edge_callers = array("I")
+        self._edge_callees = array("I")
+        self._edge_lines = array("I")  # 0 for no call line
+        self._sorted_edges = 0
+        # The sorted edges again, sorted by (callee, caller)
+        self._reverse_callees = array("I")
+        self._reverse_callers = array("I")
+        # Indices that may have become unreferenced placeholders, and freed ones
+        self._released: set[int] = set()
+        self._free: list[int] = []
+        # Reads nodes not yet in self._nodes, e.g. from a graph snapshot
+        self._load_node: Optional[Callable[[int], CodeNode]] = None
 
     @property
     def graph(self) -> nx.DiGraph:
-        """Access the underlying NetworkX graph."""
-        return self._graph
+        """
+        Deprecated: use to_networkx().
+
+        This used to be the live DiGraph backing the CodeGraph. It now
+        builds a new copy on every access, so changes made through it are
+        lost and reading it in a loop rebuilds the whole graph each time.
+        """
+        warnings.warn(
+            "CodeGraph.graph is deprecated and returns a copy; use CodeGraph.to_networkx()",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return self.to_networkx()
+
+    def to_networkx(self) -> nx.DiGraph:
+        """
+        Build a NetworkX DiGraph of the nodes and edges.
+
+        Nodes carry code_node, file_path, semantic_hash, doc_hash and
+        drift_status attributes, edges a call_line attribute. Every call
+        builds a new copy: changes to it are not reflected in this graph.
+        """
+        view = nx.DiGraph()
+        self._compact()
+        for index, node_id in enumerate(self._ids):
+            node = self._node_at(index)
+            if node_id is None:
+                continue
+            if node is None:
+                view.add_node(node_id)
+            else:
+                view.add_node(
+                    node_id,
+                    code_node=node,
+                    file_path=node.file_path,
+                    semantic_hash=node.semantic_hash,
+                    doc_hash=node.doc_hash,
+                    drift_status=node.drift_status.value,
+                )
+
+        ids = self._ids
+        view.add_edges_from(
+            (ids[caller], ids[callee], {"call_line": line or None})
+            for caller, callee, line in zip(
+                self._edge_callers, self._edge_callees, self._edge_lines
+            )
+        )
+        return view
 
     @property
     def node_count(self) -> int:
         """Return the number of nodes in the graph."""
-        return self._graph.number_of_nodes()
+        if self._released:
+            self._compact()
+        return len(self._index)
 
     @property
     def edge_count(self) -> int:
         """Return the number of edges in the graph."""
-        return self._graph.number_of_edges()
+        self._compact()
+        return len(self._edge_callers)
 
     def add_node(self, node: CodeNode) -> None:
         """
@@ -87,14 +275,12 @@ class CodeGraph:
         Args:
             node: The CodeNode to add
         """
-        self._graph.add_node(
-            node.id,
-            code_node=node,
-            file_path=node.file_path,
-            semantic_hash=node.semantic_hash,
-            doc_hash=node.doc_hash,
-            drift_status=node.drift_status.value,
-        )
+        index = self._intern(node.id)
+        old_node = self._node_at(index)
+        if old_node is not None and old_node.file_path != node.file_path:
+            self._file_index[old_node.file_path].discard(node.id)
+        self._nodes[index] = node
+        self._set_status(index, node.drift_status)
 
         # Update file index
         if node.file_path not in self._file_index:
@@ -106,16 +292,64 @@ class CodeGraph:
         Add a call edge to the graph.
 
         Creates a directed edge from caller to callee. If either node
-        doesn't exist in the graph, the edge is still added (NetworkX
-        creates placeholder nodes).
+        doesn't exist in the graph, the edge is still added (a placeholder
+        node is created). Adding an edge again replaces its call line.
 
         Args:
             edge: The CallEdge to add
         """
-        self._graph.add_edge(
-            edge.caller_id,
-            edge.callee_id,
-            call_line=edge.call_line,
+        self._edge_callers.append(self._intern(edge.caller_id))
+        self._edge_callees.append(self._intern(edge.callee_id))
+        self._edge_lines.append(edge.call_line or 0)
+
+    def replace_file(
+        self,
+        file_path: str,
+        nodes: Iterable[CodeNode],
+        edges: Iterable[CallEdge],
+    ) -> GraphDelta:
+        """
+        Replace the nodes a file defines and the calls they make.
+
+        The file's old nodes and their outgoing edges are removed and the
+        new ones added, so the graph ends up as if built from scratch: old
+        nodes still called from other files remain as placeholders. Pass
+        no nodes and edges to remove a deleted file.
+
+        Args:
+            file_path: Path of the file whose nodes are replaced
+            nodes: The file's current nodes
+            edges: The calls made from the file
+
+        Returns:
+            GraphDelta of the node IDs added, removed and changed
+        """
+        nodes = list(nodes)
+        edges = list(edges)
+        old_ids = self._file_index.pop(file_path, set())
+        old_nodes = {node_id: self._node_at(self._index[node_id]) for node_id in old_ids}
+        new_ids = {node.id for node in nodes}
+
+        callers = {self._index[node_id] for node_id in old_ids}
+        callers.update(
+            self._index[edge.caller_id] for edge in edges if edge.caller_id in self._index
+        )
+        self._remove_edges_from(callers)
+        for node_id in old_ids - new_ids:
+            self._remove_node(self._index[node_id])
+
+        for node in nodes:
+            self.add_node(node)
+        for edge in edges:
+            self.add_edge(edge)
+
+        return GraphDelta(
+            added=new_ids - old_ids,
+            removed=old_ids - new_ids,
+            changed={
+                node.id for node in nodes
+                if node.id in old_nodes and _hashes_differ(old_nodes[node.id], node)
+            },
         )
 
     def get_node(self, node_id: str) -> Optional[CodeNode]:
@@ -128,21 +362,33 @@ class CodeGraph:
         Returns:
             The CodeNode if found, None otherwise
         """
-        if node_id not in self._graph:
+        index = self._index.get(node_id)
+        if index is None:
             return None
-        return self._graph.nodes[node_id].get("code_node")
+        return self._node_at(index)
 
     def get_all_nodes(self) -> Iterator[CodeNode]:
         """
         Iterate over all CodeNodes in the graph.
 
         Yields:
-            Each CodeNode in the graph (in no particular order)
+            Each CodeNode in the graph, in index order: the order nodes were
+            added in, until replace_file reuses the indices of removed nodes
         """
-        for node_id in self._graph.nodes:
-            node = self._graph.nodes[node_id].get("code_node")
-            if node is not None:
-                yield node
+        for index, status in enumerate(self._statuses):
+            if status is not None:
+                yield self._node_at(index)
+
+    def get_all_node_ids(self) -> Iterator[str]:
+        """
+        Iterate over the IDs of all CodeNodes, without reading the nodes.
+
+        Yields:
+            Each node ID in the graph, placeholders excluded
+        """
+        for index, status in enumerate(self._statuses):
+            if status is not None:
+                yield self._ids[index]
 
     def get_nodes_by_file(self, file_path: str) -> Iterator[CodeNode]:
         """
@@ -170,8 +416,11 @@ class CodeGraph:
         Yields:
             IDs of calling functions (predecessors)
         """
-        if node_id in self._graph:
-            yield from self._graph.predecessors(node_id)
+        index = self._index.get(node_id)
+        if index is not None:
+            self._compact()
+            for caller in _row(self._reverse_callees, self._reverse_callers, index):
+                yield self._ids[caller]
 
     def get_callees(self, node_id: str) -> Iterator[str]:
         """
@@ -183,8 +432,11 @@ class CodeGraph:
         Yields:
             IDs of called functions (successors)
         """
-        if node_id in self._graph:
-            yield from self._graph.successors(node_id)
+        index = self._index.get(node_id)
+        if index is not None:
+            self._compact()
+            for callee in _row(self._edge_callers, self._edge_callees, index):
+                yield self._ids[callee]
 
     def get_nodes_by_status(self, status: DriftStatus) -> Iterator[CodeNode]:
         """
@@ -194,11 +446,49 @@ class CodeGraph:
             status: The DriftStatus to filter by
 
         Yields:
-            Each CodeNode with the given status
+            Each CodeNode with the given status, in index order (see
+            get_all_nodes)
         """
-        for node in self.get_all_nodes():
-            if node.drift_status == status:
-                yield node
+        for index in sorted(self._status_index[status]):
+            yield self._node_at(index)
+
+    def count_by_status(self, status: DriftStatus) -> int:
+        """
+        Count the nodes with a specific drift status.
+
+        Args:
+            status: The DriftStatus to count
+
+        Returns:
+            Number of nodes with the given status
+        """
+        return len(self._status_index[status])
+
+    def drift_report(self) -> DriftReport:
+        """
+        Summarize the drift statuses of the graph's nodes.
+
+        Built from the status index, so only stale, undocumented and
+        incomparable nodes are visited. Moved nodes are the detector's
+        concern and left empty.
+
+        Returns:
+            DriftReport with counts and the stale, undocumented and
+            incomparable node IDs
+        """
+        ids = self._ids
+        stale = sorted(self._status_index[DriftStatus.STALE])
+        undocumented = sorted(self._status_index[DriftStatus.UNDOCUMENTED])
+        incomparable = sorted(self._status_index[DriftStatus.INCOMPARABLE])
+        return DriftReport(
+            fresh_count=self.count_by_status(DriftStatus.FRESH),
+            stale_count=len(stale),
+            undocumented_count=len(undocumented),
+            stale_nodes=[ids[index] for index in stale],
+            undocumented_nodes=[ids[index] for index in undocumented],
+            incomparable_count=len(incomparable),
+            incomparable_nodes=[ids[index] for index in incomparable],
+        )
 
     def get_stale_nodes(self) -> list[CodeNode]:
         """
@@ -235,14 +525,13 @@ class CodeGraph:
             node_id: The node to update
             status: The new drift status
         """
-        if node_id in self._graph:
-            old_node = self._graph.nodes[node_id].get("code_node")
-            if old_node is not None:
-                new_node = old_node.with_drift_status(status)
-                self._graph.nodes[node_id]["code_node"] = new_node
-                self._graph.nodes[node_id]["drift_status"] = status.value
+        index = self._index.get(node_id)
+        if index is not None and self._statuses[index] is not None:
+            self._set_status(index, status)
 
-    def get_affected_by_change(self, node_ids: set[str]) -> set[str]:
+    def get_affected_by_change(
+        self, node_ids: set[str], max_depth: Optional[int] = None
+    ) -> set[str]:
         """
         Get all nodes affected by changes to the given nodes.
 
@@ -251,24 +540,292 @@ class CodeGraph:
 
         Args:
             node_ids: Set of changed node IDs
+            max_depth: Only follow callers up to this many calls away
 
         Returns:
             Set of all affected node IDs
         """
-        affected = set(node_ids)
+        return set(node_ids) | self.get_impact_distances(node_ids, max_depth).keys()
 
-        for node_id in node_ids:
-            if node_id in self._graph:
-                # Add all ancestors (transitive callers)
-                ancestors = nx.ancestors(self._graph, node_id)
-                affected.update(ancestors)
+    def get_impact_distances(
+        self, node_ids: Iterable[str], max_depth: Optional[int] = None
+    ) -> dict[str, int]:
+        """
+        Get the call distance from each affected node to the nearest change.
+
+        One breadth-first search over the callers of all changed nodes at
+        once, so callers shared by many changes are visited once.
+
+        Args:
+            node_ids: Changed node IDs; IDs not in the graph are ignored
+            max_depth: Only follow callers up to this many calls away
 
-        return affected
+        Returns:
+            Affected node IDs mapped to their distance (0 for changed nodes),
+            in order of distance
+        """
+        self._compact()
+        reverse_callees, reverse_callers = self._reverse_callees, self._reverse_callers
+        distances: dict[int, int] = {}
+        for node_id in node_ids:
+            index = self._index.get(node_id)
+            if index is not None:
+                distances[index] = 0
+
+        frontier = list(distances)
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for current in frontier:
+                for caller in _row(reverse_callees, reverse_callers, current):
+                    if caller not in distances:
+                        distances[caller] = depth
+                        next_frontier.append(caller)
+            frontier = next_frontier
+
+        ids = self._ids
+        return {ids[index]: distance for index, distance in distances.items()}
 
     def clear(self) -> None:
         """Remove all nodes and edges from the graph."""
-        self._graph.clear()
+        self._ids.clear()
+        self._index.clear()
+        self._released.clear()
+        self._free.clear()
+        self._nodes.clear()
+        self._statuses.clear()
+        self._load_node = None
+        for members in self._status_index.values():
+            members.clear()
         self._file_index.clear()
+        del self._edge_callers[:], self._edge_callees[:], self._edge_lines[:]
+        del self._reverse_callees[:], self._reverse_callers[:]
+        self._sorted_edges = 0
+
+    def to_arrays(self) -> GraphArrays:
+        """
+        Copy the graph's node indices, statuses and sorted edges.
+
+        Staged edges are sorted in and unreferenced placeholders released
+        first. The nodes at each index are read with get_node.
+
+        Returns:
+            The graph's storage as GraphArrays
+        """
+        self._compact()
+        return GraphArrays(
+            ids=list(self._ids),
+            statuses=list(self._statuses),
+            edge_callers=array("I", self._edge_callers),
+            edge_callees=array("I", self._edge_callees),
+            edge_lines=array("I", self._edge_lines),
+            reverse_callees=array("I", self._reverse_callees),
+            reverse_callers=array("I", self._reverse_callers),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        arrays: GraphArrays,
+        load_node: Callable[[int], CodeNode],
+        file_index: dict[str, set[str]],
+    ) -> "CodeGraph":
+        """
+        Build a graph from GraphArrays, reading nodes lazily.
+
+        The graph takes ownership of the arrays. No node is read until it
+        is queried, so the file index is passed in rather than derived.
+
+        Args:
+            arrays: Node indices, statuses and sorted edges, as returned by
+                to_arrays
+            load_node: Reads the CodeNode at a node index that has a status
+            file_index: Mapping from file paths to the IDs of their nodes
+
+        Returns:
+            The restored graph
+        """
+        graph = cls()
+        node_count = len(arrays.ids)
+        graph._ids = arrays.ids
+        graph._statuses = arrays.statuses
+        graph._nodes = [None] * node_count
+        graph._index = {node_id: index for index, node_id in enumerate(arrays.ids) if node_id}
+        graph._free = [index for index, node_id in enumerate(arrays.ids) if node_id is None]
+        for status, members in graph._status_index.items():
+            members.update(compress(range(node_count), map(is_, arrays.statuses, repeat(status))))
+        graph._file_index = file_index
+
+        graph._edge_callers = arrays.edge_callers
+        graph._edge_callees = arrays.edge_callees
+        graph._edge_lines = arrays.edge_lines
+        graph._reverse_callees = arrays.reverse_callees
+        graph._reverse_callers = arrays.reverse_callers
+        graph._sorted_edges = len(arrays.edge_callers)
+        graph._load_node = load_node
+        return graph
+
+    def _intern(self, node_id: str) -> int:
+        """Index of a node ID, adding a placeholder node if it is new."""
+        index = self._index.get(node_id)
+        if index is None:
+            if self._free:
+                index = self._free.pop()
+                self._ids[index] = node_id
+            else:
+                index = len(self._ids)
+                self._ids.append(node_id)
+                self._nodes.append(None)
+                self._statuses.append(None)
+            self._index[node_id] = index
+        return index
+
+    def _node_at(self, index: int) -> Optional[CodeNode]:
+        """The CodeNode at an index, loaded or rebuilt with an updated status first."""
+        status = self._statuses[index]
+        if status is None:
+            return None
+        node = self._nodes[index]
+        if node is None:
+            node = self._nodes[index] = self._load_node(index)
+        if node.drift_status is not status:
+            node = self._nodes[index] = node.with_drift_status(status)
+        return node
+
+    def _remove_node(self, index: int) -> None:
+        """Turn a node into a placeholder, to be released if unreferenced."""
+        old_status = self._statuses[index]
+        if old_status is not None:
+            self._status_index[old_status].discard(index)
+        self._statuses[index] = None
+        self._nodes[index] = None
+        self._released.add(index)
+
+    def _remove_edges_from(self, callers: set[int]) -> None:
+        """Delete the outgoing edges of the given node indices."""
+        if not callers:
+            return
+        self._compact()
+        for caller in callers:
+            start = bisect_left(self._edge_callers, caller)
+            end = bisect_right(self._edge_callers, caller, start)
+            for callee in self._edge_callees[start:end]:
+                position = _find(self._reverse_callees, self._reverse_callers, callee, caller)
+                del self._reverse_callees[position]
+                del self._reverse_callers[position]
+                self._released.add(callee)
+            del self._edge_callers[start:end]
+            del self._edge_callees[start:end]
+            del self._edge_lines[start:end]
+        self._sorted_edges = len(self._edge_callers)
+        self._released.update(callers)
+
+    def _release_placeholders(self) -> None:
+        """Free released indices that are placeholders without any edges."""
+        for index in self._released:
+            node_id = self._ids[index]
+            if (
+                node_id is not None
+                and self._statuses[index] is None
+                and not _row(self._edge_callers, self._edge_callees, index)
+                and not _row(self._reverse_callees, self._reverse_callers, index)
+            ):
+                del self._index[node_id]
+                self._ids[index] = None
+                self._free.append(index)
+        self._released.clear()
+
+    def _set_status(self, index: int, status: DriftStatus) -> None:
+        """Record a node's status and move it to that status's set."""
+        old_status = self._statuses[index]
+        if old_status is not None:
+            self._status_index[old_status].discard(index)
+        self._statuses[index] = status
+        self._status_index[status].add(index)
+
+    def _compact(self) -> None:
+        """Sort in the staged edges, then release unreferenced placeholders."""
+        staged = len(self._edge_callers) - self._sorted_edges
+        if staged > self._sorted_edges * _MERGE_FRACTION:
+            self._sort_edges()
+        elif staged:
+            self._merge_staged_edges()
+        if self._released:
+            self._release_placeholders()
+
+    def _sort_edges(self) -> None:
+        """
+        Rebuild the sorted edge arrays from all edges, staged ones included.
+
+        Edges are deduplicated keeping the last call line. Each edge is
+        encoded as one integer so that both orders are plain int sorts.
+        """
+        width = len(self._ids)
+        lines = dict(zip(
+            (caller * width + callee
+             for caller, callee in zip(self._edge_callers, self._edge_callees)),
+            self._edge_lines,
+        ))
+        keys = sorted(lines)
+        self._edge_callers = array("I", (key // width for key in keys))
+        self._edge_callees = array("I", (key % width for key in keys))
+        self._edge_lines = array("I", map(lines.__getitem__, keys))
+        self._sorted_edges = len(keys)
+
+        reverse = sorted(
+            callee * width + caller
+            for caller, callee in zip(self._edge_callers, self._edge_callees)
+        )
+        self._reverse_callees = array("I", (key // width for key in reverse))
+        self._reverse_callers = array("I", (key % width for key in reverse))
+
+    def _merge_staged_edges(self) -> None:
+        """Insert the few staged edges into the sorted arrays in place."""
+        start = self._sorted_edges
+        staged = dict(zip(
+            zip(self._edge_callers[start:], self._edge_callees[start:]),
+            self._edge_lines[start:],
+        ))
+        del self._edge_callers[start:], self._edge_callees[start:], self._edge_lines[start:]
+
+        callers, callees, lines = self._edge_callers, self._edge_callees, self._edge_lines
+        for (caller, callee), line in staged.items():
+            position = _find(callers, callees, caller, callee)
+            if position < len(callers) and (callers[position], callees[position]) == (
+                caller, callee
+            ):
+                lines[position] = line
+                continue
+            callers.insert(position, caller)
+            callees.insert(position, callee)
+            lines.insert(position, line)
+
+            position = _find(self._reverse_callees, self._reverse_callers, callee, caller)
+            self._reverse_callees.insert(position, callee)
+            self._reverse_callers.insert(position, caller)
+        self._sorted_edges = len(callers)
+
+
+def _hashes_differ(old: CodeNode, new: CodeNode) -> bool:
+    """Whether two versions of a node differ in code or docstring."""
+    return (
+        old.semantic_hash != new.semantic_hash
+        or old.doc_hash != new.doc_hash
+        or old.hash_scheme != new.hash_scheme
+    )
+
+
+def _row(keys: array, values: array, index: int) -> array:
+    """Values paired with one key in two arrays sorted by (key, value)."""
+    start = bisect_left(keys, index)
+    return values[start:bisect_right(keys, index, start)]
+
+
+def _find(keys: array, values: array, key: int, value: int) -> int:
+    """Position of (key, value) in two arrays sorted by (key, value), or its insertion point."""
+    start = bisect_left(keys, key)
+    return bisect_left(values, value, start, bisect_right(keys, key, start))
 
 
 def build_graph_from_source(
@@ -302,64 +859,17 @@ def build_graph_from_source(
         >>> graph.node_count
         2
     """
-    from engine.parser.extractor import (
-        extract_functions_from_source,
-        extract_calls_from_source,
-    )
-
     graph = CodeGraph()
 
-    # Extract functions
-    functions = extract_functions_from_source(source, module_name=module_name)
-
-    # Create nodes
-    for func in functions:
-        # Compute semantic hash from the complete function source
-        semantic_hash = ""
-        if func.source_code:
-            try:
-                semantic_hash = compute_semantic_hash(func.source_code)
-            except Exception:
-                pass  # Hash computation failed, leave empty
-
-        # Compute doc hash if docstring exists
-        doc_hash = None
-        if func.docstring:
-            doc_hash = compute_doc_hash(func.docstring)
-
-        # Determine initial drift status
-        if not func.docstring:
-            drift_status = DriftStatus.UNDOCUMENTED
-        else:
-            drift_status = DriftStatus.FRESH  # Will be updated by drift detector
+    # Extract functions and calls from a single parse
+    functions, calls = extract_functions_and_calls_from_source(
+        source, module_name=module_name
+    )
 
-        node = CodeNode(
-            id=f"{file_path}:{func.qualified_name}",
-            name=func.name,
-            file_path=file_path,
-            start_line=func.start_line,
-            end_line=func.end_line,
-            semantic_hash=semantic_hash,
-            doc_hash=doc_hash,
-            drift_status=drift_status,
-            is_method=func.is_method,
-            class_name=func.class_name,
-            docstring=func.docstring,
-        )
+    for node in _nodes_from_functions(functions, file_path):
         graph.add_node(node)
 
-    # Extract and add call edges
-    calls = extract_calls_from_source(source, module_name=module_name)
-    for call in calls:
-        caller_id = f"{file_path}:{call.caller_qualified_name}"
-        # For now, use simple callee name; resolution would require more context
-        callee_id = f"{file_path}:{call.callee_name}"
-
-        edge = CallEdge(
-            caller_id=caller_id,
-            callee_id=callee_id,
-            call_line=call.call_line,
-        )
+    for edge in _edges_from_calls(calls, functions, file_path):
         graph.add_edge(edge)
 
     return graph
@@ -368,31 +878,175 @@ def build_graph_from_source(
 def build_graph_from_directory(
     directory: Path | str,
     exclude_patterns: Optional[list[str]] = None,
+    jobs: Optional[int] = None,
+    database: Optional[Database] = None,
+    paranoid: bool = False,
+    respect_gitignore: bool = True,
+    build_graph: bool = True,
+    backend: str = DEFAULT_BACKEND,
+    digest: Digest = DEFAULT_DIGEST,
 ) -> ScanResult:
     """
     Build a CodeGraph from all Python files in a directory.
 
-    Recursively scans the directory for .py files, extracts functions
-    from each, and builds a unified graph.
+    Collects the per-file results of iter_scan into a single ScanResult
+    and, optionally, a unified graph. See iter_scan for how files are
+    discovered, cached and parsed.
 
     Args:
         directory: Path to the directory to scan
-        exclude_patterns: Glob patterns to exclude (e.g., ["**/test_*.py"])
+        exclude_patterns: Glob patterns to exclude (e.g., ["**/test_*.py"]);
+                          excluded directories are not descended into.
+                          Default: DEFAULT_EXCLUDE_PATTERNS
+        jobs: Number of worker processes (default: CPU count).
+              1 scans serially in the current process.
+        database: Database whose manifest and parse cache should be used
+                  and updated
+        paranoid: Ignore the stat manifest and digest every file's content
+        respect_gitignore: Skip files ignored by .gitignore, .git/info/exclude
+                           or .gendignore
+        build_graph: Build a CodeGraph and return it as result.graph. Callers
+                     that only need the node and edge lists should pass
+                     False to skip the NetworkX insertion cost.
+        backend: Parser backend, see engine.parser.backends
+        digest: Digest algorithm of the node hashes, see engine.hash.digest
 
     Returns:
-        ScanResult containing the graph, nodes, edges, and any errors
+        ScanResult containing the nodes, edges, any errors and, if
+        build_graph is set, the graph
 
     Example:
-        >>> result = build_graph_from_directory("./my_project")
+        >>> result = build_graph_from_directory("./my_project", jobs=8)
         >>> print(f"Found {result.node_count} functions in {result.files_scanned} files")
     """
-    import time
-    from engine.parser.extractor import (
-        extract_functions_from_source,
-        extract_calls_from_source,
-    )
-
     start_time = time.time()
+    directory = _check_directory(directory)
+
+    result = ScanResult()
+    graph = CodeGraph() if build_graph else None
+
+    for file_result in iter_scan(
+        directory,
+        exclude_patterns=exclude_patterns,
+        jobs=jobs,
+        database=database,
+        paranoid=paranoid,
+        respect_gitignore=respect_gitignore,
+        backend=backend,
+        digest=digest,
+    ):
+        if not file_result.ok:
+            result.errors.append((file_result.file_path, file_result.error))
+            continue
+
+        if graph is not None:
+            for node in file_result.nodes:
+                graph.add_node(node)
+            for edge in file_result.edges:
+                graph.add_edge(edge)
+
+        result.nodes.extend(file_result.nodes)
+        result.edges.extend(file_result.edges)
+        result.files_scanned += 1
+
+    result.graph = graph
+    result.scan_time_seconds = time.time() - start_time
+
+    return result
+
+
+def iter_scan(
+    directory: Path | str,
+    exclude_patterns: Optional[list[str]] = None,
+    jobs: Optional[int] = None,
+    database: Optional[Database] = None,
+    paranoid: bool = False,
+    respect_gitignore: bool = True,
+    backend: str = DEFAULT_BACKEND,
+    digest: Digest = DEFAULT_DIGEST,
+) -> Iterator[FileScanResult]:
+    """
+    Scan a directory, yielding each file's result as soon as it is ready.
+
+    Files are discovered lazily, so parsing starts before the walk ends,
+    and nothing is accumulated across files: memory stays bounded by the
+    batch size however large the repository is.
+
+    Files are independent, so parsing and hashing run in a process pool.
+    Results are yielded in file discovery order, so the output is the
+    same for any number of jobs.
+
+    When a database is given, its parse cache maps each file's content
+    digest to the extracted functions and calls, so files unchanged since
+    the last scan skip LibCST entirely. A stat manifest in the same
+    database records (size, mtime_ns, inode) per file; files whose stat
+    tuple is unchanged are not even opened. Cache and manifest entries
+    not seen by the scan are pruned once it has been fully consumed.
+
+    Args:
+        directory: Path to the directory to scan
+        exclude_patterns: Glob patterns to exclude (default:
+                          DEFAULT_EXCLUDE_PATTERNS)
+        jobs: Number of worker processes (default: CPU count)
+        database: Database whose manifest and parse cache should be used
+                  and updated
+        paranoid: Ignore the stat manifest and digest every file's content
+        respect_gitignore: Skip files ignored by .gitignore, .git/info/exclude
+                           or .gendignore
+        backend: Parser backend, see engine.parser.backends
+        digest: Digest algorithm of the node hashes, see engine.hash.digest
+
+    Yields:
+        One FileScanResult per discovered file, including failed ones
+
+    Raises:
+        FileNotFoundError: If the directory does not exist (on first use)
+        ValueError: If the path is not a directory (on first use)
+
+    Example:
+        >>> for file_result in iter_scan("./my_project"):
+        ...     print(file_result.file_path, len(file_result.nodes))
+    """
+    directory = _check_directory(directory)
+    if backend not in BACKEND_CHOICES:
+        raise ValueError(f"Unknown parser backend: {backend!r}")
+    py_files = iter_python_files(directory, exclude_patterns, respect_gitignore)
+
+    for file_path, outcome in _extract_files(
+        py_files, directory, jobs, database, paranoid, backend, digest
+    ):
+        if outcome.error is not None:
+            yield FileScanResult(
+                file_path=str(file_path),
+                error=outcome.error,
+                parse_seconds=outcome.parse_seconds,
+            )
+            continue
+
+        yield FileScanResult(
+            file_path=str(file_path),
+            nodes=_nodes_from_functions(outcome.functions, str(file_path), digest),
+            edges=_edges_from_calls(outcome.calls, outcome.functions, str(file_path)),
+            cached=outcome.cached,
+            parse_seconds=outcome.parse_seconds,
+        )
+
+
+def file_fingerprint(stat: os.stat_result) -> tuple[int, int, int]:
+    """
+    The stat tuple used to decide whether a file may have changed.
+
+    Args:
+        stat: Result of os.stat for the file
+
+    Returns:
+        (size, mtime_ns, inode) of the file
+    """
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+def _check_directory(directory: Path | str) -> Path:
+    """Validate that a scan root exists and is a directory."""
     directory = Path(directory)
 
     if not directory.exists():
@@ -401,92 +1055,463 @@ def build_graph_from_directory(
     if not directory.is_dir():
         raise ValueError(f"Not a directory: {directory}")
 
-    # Default exclusions
-    if exclude_patterns is None:
-        exclude_patterns = [
-            "**/__pycache__/**",
-            "**/.*",
-            "**/*.pyc",
-        ]
+    return directory
 
-    result = ScanResult()
-    graph = CodeGraph()
 
-    # Find all Python files
-    py_files = list(directory.rglob("*.py"))
+class _FileOutcome(NamedTuple):
+    """Extraction result for one file, before conversion to nodes and edges."""
 
-    for file_path in py_files:
-        # Check exclusion patterns
-        relative_path = file_path.relative_to(directory)
-        should_exclude = False
-        for pattern in exclude_patterns:
-            if relative_path.match(pattern):
-                should_exclude = True
-                break
+    functions: list[FunctionInfo]
+    calls: list[CallInfo]
+    error: Optional[str] = None
+    cached: bool = False
+    parse_seconds: float = 0.0
 
-        if should_exclude:
-            continue
 
-        try:
-            source = file_path.read_text(encoding="utf-8")
-            module_name = _path_to_module_name(file_path, directory)
-
-            # Extract functions
-            functions = extract_functions_from_source(source, module_name=module_name)
-
-            for func in functions:
-                # Compute hashes using the complete function source from parser
-                semantic_hash = ""
-                if func.source_code:
-                    try:
-                        semantic_hash = compute_semantic_hash(func.source_code)
-                    except Exception:
-                        pass  # Hash computation failed
-
-                doc_hash = None
-                if func.docstring:
-                    doc_hash = compute_doc_hash(func.docstring)
-
-                drift_status = DriftStatus.UNDOCUMENTED if not func.docstring else DriftStatus.FRESH
-
-                node = CodeNode(
-                    id=f"{str(file_path)}:{func.qualified_name}",
-                    name=func.name,
-                    file_path=str(file_path),
-                    start_line=func.start_line,
-                    end_line=func.end_line,
-                    semantic_hash=semantic_hash,
-                    doc_hash=doc_hash,
-                    drift_status=drift_status,
-                    is_method=func.is_method,
-                    class_name=func.class_name,
-                    docstring=func.docstring,
-                )
-                graph.add_node(node)
-                result.nodes.append(node)
-
-            # Extract calls
-            calls = extract_calls_from_source(source, module_name=module_name)
-            for call in calls:
-                caller_id = f"{str(file_path)}:{call.caller_qualified_name}"
-                callee_id = f"{str(file_path)}:{call.callee_name}"
-
-                edge = CallEdge(
-                    caller_id=caller_id,
-                    callee_id=callee_id,
-                    call_line=call.call_line,
-                )
-                graph.add_edge(edge)
-                result.edges.append(edge)
+# Files are read, looked up in the cache and dispatched in batches of this size
+_BATCH_SIZE = 256
 
-            result.files_scanned += 1
+# Files modified this close to the scan are not trusted by stat alone, since
+# a further write within the filesystem's timestamp granularity could leave
+# the stat tuple unchanged
+_RACY_WINDOW_NS = 2_000_000_000
 
+
+def _extract_files(
+    py_files: Iterable[Path],
+    directory: Path,
+    jobs: Optional[int],
+    database: Optional[Database],
+    paranoid: bool = False,
+    backend: str = DEFAULT_BACKEND,
+    digest: Digest = DEFAULT_DIGEST,
+) -> Iterator[tuple[Path, _FileOutcome]]:
+    """
+    Extract functions and calls from files, yielding results in input order.
+
+    With a database, each file is first checked against the stat manifest:
+    if its (size, mtime_ns, inode) tuple is unchanged, the content digest
+    recorded for it is trusted and the file is never opened. Other files
+    are read and digested. Digests are then looked up in the parse cache,
+    and only cache misses are parsed, serially or in a process pool.
+    Functions of a changed file whose source text is unchanged reuse the
+    semantic hash stored for them instead of being normalized again.
+
+    Fresh results are written back to the cache and the manifest, and
+    entries not used by this scan are pruned from both at the end.
+
+    Args:
+        py_files: Files to scan
+        directory: Base directory of the project
+        jobs: Number of worker processes (None for CPU count)
+        database: Database holding the manifest and parse cache, or None
+        paranoid: Ignore the stat manifest and digest every file's content
+        backend: Parser backend used for cache misses
+        digest: Digest algorithm of the extracted hashes
+
+    Yields:
+        (file_path, outcome) for each file, in the order of py_files, as
+        soon as the file is done. py_files is consumed lazily, one batch
+        at a time.
+    """
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    manifest = {}
+    if database is not None and not paranoid:
+        manifest = database.load_manifest()
+
+    scan_start_ns = time.time_ns()
+    used_keys: set[str] = set()
+    seen_paths: set[str] = set()
+    py_files = iter(py_files)
+    with _ExtractionPool(jobs, backend, digest) as pool:
+        while batch := list(islice(py_files, _BATCH_SIZE)):
+            seen_paths.update(str(file_path) for file_path in batch)
+            yield from _extract_batch(
+                batch, directory, pool, database, manifest, scan_start_ns, used_keys
+            )
+
+    if database is not None:
+        database.prune_file_cache(used_keys)
+        database.prune_manifest(seen_paths)
+
+
+def _extract_batch(
+    batch: list[Path],
+    directory: Path,
+    pool: "_ExtractionPool",
+    database: Optional[Database],
+    manifest: dict[str, ManifestEntry],
+    scan_start_ns: int,
+    used_keys: set[str],
+) -> Iterator[tuple[Path, _FileOutcome]]:
+    """Stat and read one batch of files, serve cache hits and extract the misses."""
+    failures: dict[Path, _FileOutcome] = {}
+    # file_path -> (module_name, stat entry, source or None if not read)
+    located: dict[Path, tuple[str, ManifestEntry, Optional[str]]] = {}
+
+    for file_path in batch:
+        module_name = _path_to_module_name(file_path, directory)
+        try:
+            stat = file_path.stat()
+            entry = manifest.get(str(file_path))
+            if entry is not None and entry.fingerprint == file_fingerprint(stat):
+                # Unchanged since the last scan: trust the recorded digest
+                located[file_path] = (module_name, entry, None)
+            else:
+                located[file_path] = _read_file(file_path, module_name, stat)
         except Exception as e:
-            result.errors.append((str(file_path), str(e)))
+            failures[file_path] = _FileOutcome([], [], str(e))
+
+    cache_keys = {
+        file_path: _cache_key(entry.content_digest, module_name, pool.backend, pool.digest)
+        for file_path, (module_name, entry, _) in located.items()
+    }
+    cached = {}
+    if database is not None:
+        cached = database.load_file_cache(list(cache_keys.values()))
+
+    misses = []
+    for file_path, (module_name, entry, source) in list(located.items()):
+        if cache_keys[file_path] in cached:
+            continue
+        if source is None:
+            # Trusted by stat but no longer cached: fall back to reading it
+            try:
+                module_name, entry, source = _read_file(file_path, module_name, file_path.stat())
+            except Exception as e:
+                failures[file_path] = _FileOutcome([], [], str(e))
+                del located[file_path]
+                continue
+            located[file_path] = (module_name, entry, source)
+            cache_keys[file_path] = _cache_key(
+                entry.content_digest, module_name, pool.backend, pool.digest
+            )
+        misses.append(file_path)
+
+    known_hashes = {}
+    if database is not None and misses:
+        scheme = AST_HASH_SCHEME if pool.backend == "ast" else CST_HASH_SCHEME
+        known_hashes = database.load_known_hashes(
+            [str(file_path) for file_path in misses],
+            qualified_scheme(scheme, pool.digest),
+        )
 
-    result.scan_time_seconds = time.time() - start_time
+    # Lazily yields results in the order of misses, which follows the batch
+    extracted = pool.map(
+        [located[file_path][2] for file_path in misses],
+        [located[file_path][0] for file_path in misses],
+        [known_hashes.get(str(file_path)) for file_path in misses],
+    )
+    miss_set = set(misses)
 
-    return result
+    fresh_entries = {}
+    manifest_entries = []
+    for file_path in batch:
+        if file_path in failures:
+            yield file_path, failures[file_path]
+            continue
+
+        _, entry, _ = located[file_path]
+        key = cache_keys[file_path]
+        if file_path in miss_set:
+            functions, calls, error, parse_seconds = next(extracted)
+            if error is not None:
+                yield file_path, _FileOutcome([], [], error, parse_seconds=parse_seconds)
+                continue
+            fresh_entries[key] = (functions, calls)
+            outcome = _FileOutcome(functions, calls, parse_seconds=parse_seconds)
+        else:
+            functions, calls = cached[key]
+            outcome = _FileOutcome(functions, calls, cached=True)
+
+        used_keys.add(key)
+        if entry.mtime_ns < scan_start_ns - _RACY_WINDOW_NS:
+            manifest_entries.append(entry)
+        yield file_path, outcome
+
+    if database is not None:
+        if fresh_entries:
+            database.save_file_cache(fresh_entries)
+        if manifest_entries:
+            database.save_manifest(manifest_entries)
+
+
+def _read_file(
+    file_path: Path,
+    module_name: str,
+    stat: os.stat_result,
+) -> tuple[str, ManifestEntry, str]:
+    """
+    Read and digest a file.
+
+    Returns:
+        (module_name, manifest entry for the file, decoded source)
+    """
+    data = file_path.read_bytes()
+    source = _decode_source(data)
+    size, mtime_ns, inode = file_fingerprint(stat)
+    entry = ManifestEntry(
+        file_path=str(file_path),
+        size=size,
+        mtime_ns=mtime_ns,
+        inode=inode,
+        content_digest=hashlib.sha256(data).hexdigest(),
+    )
+    return module_name, entry, source
+
+
+class _ExtractionPool:
+    """
+    Runs source extraction serially or in a lazily started process pool.
+
+    The pool is only started the first time there is more than one source
+    to extract, so a scan served entirely from the cache never pays the
+    process start-up cost.
+    """
+
+    def __init__(
+        self,
+        jobs: int,
+        backend: str = DEFAULT_BACKEND,
+        digest: Digest = DEFAULT_DIGEST,
+    ) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            jobs: Maximum number of worker processes; 1 disables the pool
+            backend: Parser backend the workers use
+            digest: Digest algorithm of the extracted hashes
+        """
+        self._jobs = max(1, jobs)
+        self.backend = backend
+        self.digest = digest
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "_ExtractionPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def map(
+        self,
+        sources: list[str],
+        module_names: list[str],
+        known_hashes: Optional[list[Optional[dict[str, FunctionHashes]]]] = None,
+    ) -> Iterator[tuple[list[FunctionInfo], list[CallInfo], Optional[str], float]]:
+        """Extract each source, yielding results in input order."""
+        if known_hashes is None:
+            known_hashes = [None] * len(sources)
+
+        if self._jobs <= 1 or len(sources) <= 1:
+            return map(
+                _extract_source,
+                sources,
+                module_names,
+                repeat(self.backend),
+                known_hashes,
+                repeat(self.digest),
+            )
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._jobs)
+
+        # Several files per task amortizes pickling and IPC overhead
+        chunksize = max(1, len(sources) // (self._jobs * 4))
+        return self._executor.map(
+            _extract_source,
+            sources,
+            module_names,
+            repeat(self.backend),
+            known_hashes,
+            repeat(self.digest),
+            chunksize=chunksize,
+        )
+
+
+def _extract_source(
+    source: str,
+    module_name: str,
+    backend: str = DEFAULT_BACKEND,
+    known_hashes: Optional[dict[str, FunctionHashes]] = None,
+    digest: Digest = DEFAULT_DIGEST,
+) -> tuple[list[FunctionInfo], list[CallInfo], Optional[str], float]:
+    """
+    Parse and hash the source of a single file.
+
+    Runs in worker processes, so it touches no shared state and reports
+    failures as a message instead of raising.
+
+    Args:
+        source: Source code of the file
+        module_name: Module name for qualified names
+        backend: Parser backend to use
+        known_hashes: Stored semantic and section hashes of the file's
+                      functions, keyed by raw hash
+        digest: Digest algorithm of the hashes
+
+    Returns:
+        (functions, calls, error, seconds) where error is None on success
+        and seconds is the time spent parsing and hashing
+    """
+    start = time.perf_counter()
+    try:
+        # Extract functions and calls from a single parse
+        functions, calls = extract_with_backend(
+            source, module_name, backend, known_hashes, digest
+        )
+        return functions, calls, None, time.perf_counter() - start
+
+    except Exception as e:
+        return [], [], str(e), time.perf_counter() - start
+
+
+def _decode_source(data: bytes) -> str:
+    """
+    Decode file bytes exactly as Path.read_text(encoding="utf-8") would.
+
+    Text mode translates all newline styles to "\n"; the same translation
+    is applied here so the bytes can be read once for both digesting and
+    parsing.
+    """
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _cache_key(
+    content_digest: str,
+    module_name: str,
+    backend: str = DEFAULT_BACKEND,
+    digest: Digest = DEFAULT_DIGEST,
+) -> str:
+    """
+    Compute the parse cache key for a file.
+
+    The key covers the file's content digest, its module name (which is
+    part of every qualified name), the parser backend, the digest of the
+    cached hashes, the gen-d, LibCST and Python versions and the hash
+    scheme identifiers, so an upgrade that changes parsing or normalization
+    invalidates old entries.
+    """
+    key_material = (
+        f"{_CACHE_VERSION}\0{backend}\0{digest.name}\0{module_name}\0{content_digest}"
+    )
+    return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+
+def _nodes_from_functions(
+    functions: list[FunctionInfo],
+    file_path: str,
+    digest: Digest = DEFAULT_DIGEST,
+) -> list[CodeNode]:
+    """
+    Create CodeNodes for extracted functions.
+
+    Args:
+        functions: Functions extracted from one file
+        file_path: Path to attribute the nodes to
+        digest: Digest algorithm of the doc hashes, matching the one the
+                functions were hashed with
+
+    Returns:
+        One CodeNode per function, in extraction order
+    """
+    nodes = []
+    for func in functions:
+        # Semantic hash was computed from the parsed node during extraction
+        semantic_hash = func.semantic_hash
+
+        # Compute doc hash if docstring exists
+        doc_hash = None
+        if func.docstring:
+            doc_hash = compute_doc_hash(func.docstring, digest)
+
+        # Determine initial drift status
+        if not func.docstring:
+            drift_status = DriftStatus.UNDOCUMENTED
+        else:
+            drift_status = DriftStatus.FRESH  # Will be updated by drift detector
+
+        nodes.append(
+            CodeNode(
+                id=f"{file_path}:{func.qualified_name}",
+                name=func.name,
+                file_path=file_path,
+                start_line=func.start_line,
+                end_line=func.end_line,
+                semantic_hash=semantic_hash,
+                doc_hash=doc_hash,
+                drift_status=drift_status,
+                is_method=func.is_method,
+                class_name=func.class_name,
+                docstring=func.docstring,
+                hash_scheme=func.hash_scheme,
+                raw_hash=func.raw_hash or None,
+                minhash=func.minhash or None,
+                signature_hash=func.signature_hash or None,
+                body_hash=func.body_hash or None,
+                decorator_hash=func.decorator_hash or None,
+            )
+        )
+    return nodes
+
+
+def _edges_from_calls(
+    calls: list[CallInfo], functions: list[FunctionInfo], file_path: str
+) -> list[CallEdge]:
+    """
+    Create CallEdges for extracted call sites.
+
+    Callees defined in the same file are resolved to their node IDs: a bare
+    name to the innermost enclosing function or module-level definition,
+    ``self.name`` and ``cls.name`` to a method of an enclosing class, and
+    other dotted names such as ``Class.name`` relative to the caller's
+    scopes. Calls to anything else keep a placeholder ID of the simple
+    callee name in this file.
+
+    Args:
+        calls: Calls extracted from one file
+        functions: Functions extracted from the same file
+        file_path: Path used to qualify caller and callee IDs
+
+    Returns:
+        One CallEdge per call site, in extraction order
+    """
+    # Qualified name -> whether it is defined directly in a class body
+    defined = {func.qualified_name: func.is_method for func in functions}
+    class_scope = {
+        name: is_method and name.rpartition(".")[0] not in defined
+        for name, is_method in defined.items()
+    }
+
+    edges = []
+    for call in calls:
+        caller_id = f"{file_path}:{call.caller_qualified_name}"
+        callee_id = f"{file_path}:{call.callee_name}"
+
+        target, *attributes = call.callee_name.split(".")
+        if target in ("self", "cls") and len(attributes) == 1:
+            names, in_class = attributes, True
+        else:
+            names, in_class = [target, *attributes], None if attributes else False
+        scopes = call.caller_qualified_name.split(".")
+        for depth in range(len(scopes), -1, -1):
+            candidate = ".".join(scopes[:depth] + names)
+            if candidate in defined and in_class in (None, class_scope[candidate]):
+                callee_id = f"{file_path}:{candidate}"
+                break
+
+        edges.append(
+            CallEdge(
+                caller_id=caller_id,
+                callee_id=callee_id,
+                call_line=call.call_line,
+            )
+        )
+    return edges
 
 
 def _extract_function_source(source: str, start_line: int, end_line: int) -> str:
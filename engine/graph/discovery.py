@@ -0,0 +1,383 @@
+"""
+File Discovery for Gen-D
+
+This module finds the Python files to scan in a project directory.
+
+Design Decisions:
+    - Walks the tree with os.scandir, one directory listing per directory
+    - Excluded directories are pruned before descending into them
+    - Exclude patterns are compiled once into a single regular expression
+    - Files are yielded lazily, so parsing can start before the walk ends
+    - Entries are visited in sorted order, so discovery is deterministic
+    - .gitignore, .git/info/exclude and .gendignore rules are compiled per
+      file and evaluated during the walk, so ignored trees are pruned too
+
+Pattern Syntax:
+    Patterns are matched against the POSIX path relative to the scanned
+    directory. `*`, `?` and `[...]` match within one path segment and `**`
+    matches zero or more segments. A pattern without a leading `/` may
+    match at any depth ("test_*.py" excludes every test_*.py file); a
+    leading `/` anchors it to the scanned directory. A directory matching
+    a pattern, or whose whole contents match it (as with
+    "**/__pycache__/**"), is skipped entirely.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+# Ignore files read in every walked directory, lowest precedence first
+_IGNORE_FILE_NAMES = (".gitignore", ".gendignore")
+
+DEFAULT_EXCLUDE_PATTERNS = [
+    "**/__pycache__/**",
+    "**/node_modules/**",
+    "**/.*",
+    "**/*.pyc",
+]
+
+
+class PathMatcher:
+    """
+    A compiled set of exclude patterns.
+
+    Example:
+        >>> matcher = PathMatcher(["**/__pycache__/**", "test_*.py"])
+        >>> matcher.excludes_dir("pkg/__pycache__")
+        True
+        >>> matcher.excludes_file("pkg/test_core.py")
+        True
+    """
+
+    def __init__(self, patterns: list[str]):
+        """
+        Compile exclude patterns.
+
+        Args:
+            patterns: Glob patterns, see the module docstring for syntax
+        """
+        self.patterns = list(patterns)
+        self._regex: Optional[re.Pattern] = None
+        if self.patterns:
+            self._regex = re.compile(
+                "|".join(f"(?:{_translate(p)})" for p in self.patterns)
+            )
+
+    def excludes_file(self, relative_path: str) -> bool:
+        """Check whether a file (POSIX path relative to the root) is excluded."""
+        if self._regex is None:
+            return False
+        return self._regex.fullmatch(relative_path) is not None
+
+    def excludes_dir(self, relative_path: str) -> bool:
+        """Check whether a directory and everything below it are excluded."""
+        if self._regex is None:
+            return False
+        return (
+            self._regex.fullmatch(relative_path) is not None
+            or self._regex.fullmatch(relative_path + "/") is not None
+        )
+
+
+class IgnoreFile:
+    """
+    The compiled rules of one .gitignore-style file.
+
+    Rules follow gitignore semantics: the last matching rule wins, `!`
+    re-includes, a trailing `/` matches directories only and a pattern
+    containing a `/` is anchored to the directory holding the file.
+
+    Attributes:
+        base: POSIX path of the directory the rules apply to, relative to
+              the walk root ("" for the root itself)
+    """
+
+    def __init__(self, lines: list[str], base: str = ""):
+        """
+        Compile ignore rules.
+
+        Args:
+            lines: Lines of the ignore file
+            base: Directory the rules are relative to, see `base`
+        """
+        self.base = base
+        self._prefix_len = len(base) + 1 if base else 0
+        # (regex, negated, dir_only) in file order
+        self._rules: list[tuple[re.Pattern, bool, bool]] = []
+        for line in lines:
+            rule = _parse_ignore_line(line)
+            if rule is not None:
+                self._rules.append(rule)
+
+        # Fast path: a single regex per entry kind tells whether any rule
+        # matches at all; the rules are only walked when one does
+        self._any_file = _combine(regex for regex, _, dir_only in self._rules if not dir_only)
+        self._any_dir = _combine(regex for regex, _, _ in self._rules)
+
+    @classmethod
+    def from_path(cls, path: Path, base: str = "") -> Optional["IgnoreFile"]:
+        """Load an ignore file, returning None if it is missing or unreadable."""
+        try:
+            lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            return None
+        return cls(lines, base)
+
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Match a path relative to the walk root against these rules.
+
+        Returns:
+            True if the path is ignored, False if it is re-included by a
+            negated rule, None if no rule matches
+        """
+        path = relative_path[self._prefix_len :]
+        any_rule = self._any_dir if is_dir else self._any_file
+        if any_rule is None or any_rule.fullmatch(path) is None:
+            return None
+
+        for regex, negated, dir_only in reversed(self._rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.fullmatch(path) is not None:
+                return not negated
+        return None
+
+
+def iter_python_files(
+    directory: Path | str,
+    exclude_patterns: Optional[list[str]] = None,
+    respect_gitignore: bool = True,
+) -> Iterator[Path]:
+    """
+    Yield the Python files in a directory tree.
+
+    With respect_gitignore, files and directories ignored by git are
+    skipped: .gitignore files in the walked directories and their parents
+    up to the repository root, and .git/info/exclude. A .gendignore file,
+    using the same syntax, may sit next to any .gitignore; its rules
+    take precedence over the .gitignore in the same directory.
+
+    Args:
+        directory: Root directory to walk
+        exclude_patterns: Glob patterns to exclude
+                          (default: DEFAULT_EXCLUDE_PATTERNS)
+        respect_gitignore: Skip paths ignored by git and .gendignore
+
+    Yields:
+        Paths of .py files below directory, in sorted depth-first order
+    """
+    if exclude_patterns is None:
+        exclude_patterns = DEFAULT_EXCLUDE_PATTERNS
+
+    directory = Path(directory)
+    matcher = PathMatcher(exclude_patterns)
+    if not respect_gitignore:
+        yield from _walk(directory, "", matcher, None, "")
+        return
+
+    # Ignore rules are matched against paths relative to the repository
+    # root, so rules from .gitignore files above the walk root still apply
+    repo_root = _repository_root(directory)
+    ignore_prefix = ""
+    if repo_root != directory.resolve():
+        ignore_prefix = directory.resolve().relative_to(repo_root).as_posix() + "/"
+    ignore_files = _parent_ignore_files(repo_root, ignore_prefix)
+    yield from _walk(directory, "", matcher, ignore_files, ignore_prefix)
+
+
+def _walk(
+    directory: Path,
+    relative_dir: str,
+    matcher: PathMatcher,
+    ignore_files: Optional[tuple[IgnoreFile, ...]],
+    ignore_prefix: str,
+) -> Iterator[Path]:
+    """Walk one directory, descending into subdirectories that are not excluded."""
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        # Unreadable directories are skipped, as rglob does
+        return
+
+    if ignore_files is not None:
+        ignore_files = ignore_files + _local_ignore_files(
+            directory, (ignore_prefix + relative_dir).rstrip("/"), entries
+        )
+
+    subdirs = []
+    for entry in entries:
+        relative_path = relative_dir + entry.name
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if matcher.excludes_dir(relative_path):
+                    continue
+                if ignore_files is not None and (
+                    entry.name == ".git"
+                    or _is_ignored(ignore_prefix + relative_path, True, ignore_files)
+                ):
+                    continue
+                subdirs.append((entry, relative_path))
+            elif entry.name.endswith(".py") and entry.is_file():
+                if matcher.excludes_file(relative_path):
+                    continue
+                if ignore_files is not None and _is_ignored(
+                    ignore_prefix + relative_path, False, ignore_files
+                ):
+                    continue
+                yield directory / entry.name
+        except OSError:
+            continue
+
+    for entry, relative_path in subdirs:
+        yield from _walk(
+            directory / entry.name, relative_path + "/", matcher, ignore_files, ignore_prefix
+        )
+
+
+def _is_ignored(relative_path: str, is_dir: bool, ignore_files: tuple[IgnoreFile, ...]) -> bool:
+    """Check a path against ignore files ordered from lowest to highest precedence."""
+    for ignore_file in reversed(ignore_files):
+        matched = ignore_file.match(relative_path, is_dir)
+        if matched is not None:
+            return matched
+    return False
+
+
+def _local_ignore_files(
+    directory: Path,
+    base: str,
+    entries: list[os.DirEntry],
+) -> tuple[IgnoreFile, ...]:
+    """Load the ignore files present among a directory's entries."""
+    names = {entry.name for entry in entries}
+    loaded = []
+    for name in _IGNORE_FILE_NAMES:
+        if name in names:
+            ignore_file = IgnoreFile.from_path(directory / name, base)
+            if ignore_file is not None:
+                loaded.append(ignore_file)
+    return tuple(loaded)
+
+
+def _repository_root(directory: Path) -> Path:
+    """Find the enclosing git repository root, or the directory itself if none."""
+    directory = directory.resolve()
+    for candidate in [directory, *directory.parents]:
+        if (candidate / ".git").exists():
+            return candidate
+    return directory
+
+
+def _parent_ignore_files(repo_root: Path, ignore_prefix: str) -> tuple[IgnoreFile, ...]:
+    """
+    Load the ignore rules that apply to the walk root from outside it.
+
+    These are .git/info/exclude and the ignore files of every directory
+    from the repository root down to, but not including, the walk root.
+    """
+    ignore_files = []
+    exclude = IgnoreFile.from_path(repo_root / ".git" / "info" / "exclude")
+    if exclude is not None:
+        ignore_files.append(exclude)
+
+    parts = ignore_prefix.rstrip("/").split("/") if ignore_prefix else []
+    for depth in range(len(parts)):
+        base = "/".join(parts[:depth])
+        parent = repo_root.joinpath(*parts[:depth])
+        for name in _IGNORE_FILE_NAMES:
+            ignore_file = IgnoreFile.from_path(parent / name, base)
+            if ignore_file is not None:
+                ignore_files.append(ignore_file)
+    return tuple(ignore_files)
+
+
+def _parse_ignore_line(line: str) -> Optional[tuple[re.Pattern, bool, bool]]:
+    """Parse one gitignore line into (regex, negated, dir_only), or None."""
+    if not line or line.startswith("#"):
+        return None
+
+    # Trailing spaces are dropped unless escaped with a backslash
+    stripped = line.rstrip(" ")
+    if stripped.endswith("\\") and len(stripped) < len(line):
+        stripped += " "
+    line = stripped
+
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith(("\\!", "\\#")):
+        line = line[1:]
+
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+
+    # A slash anywhere but the end anchors the pattern to its directory
+    anchored = "/" in line
+    pattern = "/" + line.lstrip("/") if anchored else line
+    return re.compile(_translate(pattern)), negated, dir_only
+
+
+def _combine(regexes: Iterable[re.Pattern]) -> Optional[re.Pattern]:
+    """Combine regexes into one alternation, or None if there are none."""
+    patterns = [regex.pattern for regex in regexes]
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+def _translate(pattern: str) -> str:
+    """Translate one glob pattern into a regular expression over relative paths."""
+    anchored = pattern.startswith("/")
+    segments = [segment for segment in pattern.strip("/").split("/") if segment]
+    if not anchored and segments[:1] != ["**"]:
+        segments.insert(0, "**")
+
+    parts = []
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+        if segment == "**":
+            parts.append(".*" if last else "(?:[^/]+/)*")
+        else:
+            parts.append(_translate_segment(segment) + ("" if last else "/"))
+    return "".join(parts)
+
+
+def _translate_segment(segment: str) -> str:
+    """Translate a glob segment; wildcards never match a path separator."""
+    parts = []
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        i += 1
+        if char == "\\" and i < len(segment):
+            parts.append(re.escape(segment[i]))
+            i += 1
+        elif char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            start = i + 1 if segment[i : i + 1] == "!" else i
+            if segment[start : start + 1] == "]":
+                start += 1
+            end = segment.find("]", start)
+            if end == -1:
+                parts.append(re.escape(char))
+                continue
+            body = segment[i:end]
+            for special in ("\\", "[", "]"):
+                body = body.replace(special, "\\" + special)
+            i = end + 1
+            if body.startswith("!"):
+                body = "^/" + body[1:]
+            elif body.startswith("^"):
+                body = "\\" + body
+            parts.append("[" + body + "]")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
@@ -0,0 +1,329 @@
+"""
+Graph Snapshots for Gen-D
+
+A scan builds the call graph, but nothing kept it: any graph query had to
+re-parse the whole project. A snapshot stores the CodeGraph's own arrays
+in one binary file next to the database:
+
+    header          magic, format version, byte order, node count,
+                    scan key, section count
+    section table   offset and length of each section below
+    ids             node IDs, UTF-8, NUL-separated ("" for freed indices)
+    strings         every other string of the nodes, deduplicated, UTF-8
+    string_offsets  start of each string in strings, plus the end (uint64)
+    fields          one int32 column per CodeNode field; string indices,
+                    -1 for None
+    statuses        one byte per node: DriftStatus index, 255 if no node
+    edges           the caller- and callee-sorted edge arrays (uint32)
+    files           paths of the scanned files, UTF-8, NUL-separated
+    fingerprints    (size, mtime_ns, inode) of each file (uint64), zeros
+                    where the scan did not trust the stat tuple
+
+Loading maps the file and decodes the IDs and statuses; the edge arrays
+are copied in one block each. Each CodeNode is built from the mapped
+columns the first time it is read, so a query only pays for the nodes it
+touches.
+
+A snapshot is tied to the scan that wrote it: the scan key digests the
+scan ID, and loading for another scan returns None. Commands that only
+read, like gdg status, record no scan and so never invalidate it.
+GraphSnapshot.modified_files lists the scanned files that may have
+changed since, which a rescan would pick up.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from itertools import groupby
+from pathlib import Path
+from typing import Optional
+
+from engine.graph.builder import CodeGraph, GraphArrays, file_fingerprint
+from engine.models import CodeNode, DriftStatus
+
+_MAGIC = b"GDGGRAPH"
+_VERSION = 2
+
+# magic, version, little endian, node count, scan key, section count
+_HEADER = struct.Struct("<8sI?3xI32sI")
+_SECTION = struct.Struct("<QQ")
+_SECTIONS = (
+    "ids",
+    "strings",
+    "string_offsets",
+    "fields",
+    "statuses",
+    "edge_callers",
+    "edge_callees",
+    "edge_lines",
+    "reverse_callees",
+    "reverse_callers",
+    "files",
+    "fingerprints",
+)
+# Named after the GraphArrays fields they hold
+_EDGE_SECTIONS = _SECTIONS[5:10]
+
+_STRING_FIELDS = (
+    "name",
+    "file_path",
+    "semantic_hash",
+    "doc_hash",
+    "class_name",
+    "docstring",
+    "hash_scheme",
+    "raw_hash",
+    "minhash",
+    "signature_hash",
+    "body_hash",
+    "decorator_hash",
+)
+_INT_FIELDS = ("start_line", "end_line", "is_method")
+_FILE_PATH_COLUMN = _STRING_FIELDS.index("file_path")
+
+_STATUSES = tuple(DriftStatus)
+_NO_STATUS = 255
+_UNTRUSTED = (0, 0, 0)
+# Lone surrogates from undecodable file names must survive the round trip
+_ERRORS = "surrogatepass"
+
+
+@dataclass
+class GraphSnapshot:
+    """
+    A call graph loaded from a snapshot.
+
+    Attributes:
+        graph: The graph as built by the scan that wrote the snapshot
+        fingerprints: (size, mtime_ns, inode) of each scanned file at that
+            scan, None where the scan did not trust the stat tuple
+    """
+
+    graph: CodeGraph
+    fingerprints: dict[str, Optional[tuple[int, int, int]]]
+
+    def modified_files(self) -> list[str]:
+        """
+        Find scanned files that may have changed since the snapshot.
+
+        Files created since the scan are not noticed.
+
+        Returns:
+            Sorted paths of the files whose stat tuple changed, that were
+            deleted, or whose stat tuple the scan did not trust
+        """
+        modified = []
+        for file_path, fingerprint in self.fingerprints.items():
+            try:
+                if fingerprint is None or file_fingerprint(os.stat(file_path)) != fingerprint:
+                    modified.append(file_path)
+            except OSError:
+                modified.append(file_path)
+        return sorted(modified)
+
+
+def scan_key(scan_id: str) -> bytes:
+    """
+    Digest the ID of the scan a snapshot belongs to.
+
+    Args:
+        scan_id: ID of the scan, see ScanRecord.scan_id
+
+    Returns:
+        SHA-256 digest of the scan ID
+    """
+    return hashlib.sha256(scan_id.encode("utf-8")).digest()
+
+
+def save_graph_snapshot(
+    graph: CodeGraph,
+    path: str | Path,
+    scan_id: str,
+    fingerprints: dict[str, Optional[tuple[int, int, int]]],
+) -> None:
+    """
+    Write a graph snapshot, replacing any previous one atomically.
+
+    Args:
+        graph: The graph to write
+        path: Snapshot file to write
+        scan_id: ID of the scan the graph was built by
+        fingerprints: (size, mtime_ns, inode) of each scanned file, None
+            where the scan did not trust the stat tuple
+    """
+    arrays = graph.to_arrays()
+    node_count = len(arrays.ids)
+
+    strings: dict[str, int] = {}
+    fields = array("i", [-1]) * ((len(_STRING_FIELDS) + len(_INT_FIELDS)) * node_count)
+    for index, node_id in enumerate(arrays.ids):
+        node = graph.get_node(node_id) if node_id is not None else None
+        if node is None:
+            continue
+        for column, name in enumerate(_STRING_FIELDS):
+            value = getattr(node, name)
+            if value is not None:
+                fields[column * node_count + index] = strings.setdefault(value, len(strings))
+        for column, name in enumerate(_INT_FIELDS, start=len(_STRING_FIELDS)):
+            fields[column * node_count + index] = int(getattr(node, name))
+
+    encoded = [value.encode("utf-8", _ERRORS) for value in strings]
+    string_offsets = array("Q", [0])
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+
+    stats = array("Q")
+    for fingerprint in fingerprints.values():
+        stats.extend(fingerprint or _UNTRUSTED)
+
+    codes = {status: code for code, status in enumerate(_STATUSES)}
+    sections = [
+        "\0".join(node_id or "" for node_id in arrays.ids).encode("utf-8", _ERRORS),
+        b"".join(encoded),
+        string_offsets.tobytes(),
+        fields.tobytes(),
+        bytes(_NO_STATUS if status is None else codes[status] for status in arrays.statuses),
+        *(getattr(arrays, name).tobytes() for name in _EDGE_SECTIONS),
+        "\0".join(fingerprints).encode("utf-8", _ERRORS),
+        stats.tobytes(),
+    ]
+
+    header = _HEADER.pack(
+        _MAGIC,
+        _VERSION,
+        sys.byteorder == "little",
+        node_count,
+        scan_key(scan_id),
+        len(sections),
+    )
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table = []
+    for section in sections:
+        offset = _align(offset)
+        table.append(_SECTION.pack(offset, len(section)))
+        offset += len(section)
+
+    path = Path(path)
+    temp_path = path.with_name(f"{path.name}.tmp")
+    with open(temp_path, "wb") as file:
+        file.write(header)
+        file.write(b"".join(table))
+        for section in sections:
+            file.write(bytes(_align(file.tell()) - file.tell()))
+            file.write(section)
+    os.replace(temp_path, path)
+
+
+def load_graph_snapshot(path: str | Path, scan_id: str) -> Optional[GraphSnapshot]:
+    """
+    Load a graph snapshot written for the given scan.
+
+    Args:
+        path: Snapshot file to read
+        scan_id: ID of the latest scan, see Database.get_scan_history
+
+    Returns:
+        The snapshot, or None if the file is missing, unreadable, written
+        by another format version or platform, or for a different scan
+    """
+    try:
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, little, node_count, key, section_count = _HEADER.unpack_from(data)
+        table = data[_HEADER.size:_HEADER.size + _SECTION.size * section_count]
+        ranges = list(_SECTION.iter_unpack(table))
+    except struct.error:
+        return None
+    if (
+        magic != _MAGIC
+        or version != _VERSION
+        or little != (sys.byteorder == "little")
+        or section_count != len(_SECTIONS)
+        or any(offset + length > len(data) for offset, length in ranges)
+        or array("I").itemsize != 4
+        or key != scan_key(scan_id)
+    ):
+        return None
+
+    view = memoryview(data)
+    sections = {
+        name: view[offset:offset + length] for name, (offset, length) in zip(_SECTIONS, ranges)
+    }
+    return GraphSnapshot(_restore(sections, node_count), _restore_fingerprints(sections))
+
+
+def _restore(sections: dict[str, memoryview], node_count: int) -> CodeGraph:
+    """Rebuild a CodeGraph from snapshot sections, reading nodes lazily."""
+    ids = str(sections["ids"], "utf-8", _ERRORS).split("\0") if node_count else []
+    blob = sections["strings"]
+    string_offsets = sections["string_offsets"].cast("Q")
+    fields = sections["fields"].cast("i")
+
+    def string(number: int) -> Optional[str]:
+        if number < 0:
+            return None
+        return str(blob[string_offsets[number]:string_offsets[number + 1]], "utf-8", _ERRORS)
+
+    lookup: list[Optional[DriftStatus]] = [None] * 256
+    lookup[:len(_STATUSES)] = _STATUSES
+    statuses = list(map(lookup.__getitem__, sections["statuses"]))
+
+    # A file's nodes are mostly contiguous, so group runs of the file column
+    file_index: dict[str, set[str]] = {}
+    file_column = fields[_FILE_PATH_COLUMN * node_count:(_FILE_PATH_COLUMN + 1) * node_count]
+    for number, indices in groupby(range(node_count), key=file_column.__getitem__):
+        if number >= 0:
+            file_path = string(number)
+            file_index.setdefault(file_path, set()).update(map(ids.__getitem__, indices))
+
+    edges = {}
+    for name in _EDGE_SECTIONS:
+        edges[name] = array("I")
+        edges[name].frombytes(sections[name])
+
+    int_start = len(_STRING_FIELDS) * node_count
+
+    def load_node(index: int) -> CodeNode:
+        strings = {
+            name: string(fields[column * node_count + index])
+            for column, name in enumerate(_STRING_FIELDS)
+        }
+        return CodeNode(
+            id=ids[index],
+            start_line=fields[int_start + index],
+            end_line=fields[int_start + node_count + index],
+            is_method=bool(fields[int_start + 2 * node_count + index]),
+            drift_status=statuses[index],
+            **strings,
+        )
+
+    arrays = GraphArrays(ids=[node_id or None for node_id in ids], statuses=statuses, **edges)
+    return CodeGraph.from_arrays(arrays, load_node, file_index)
+
+
+def _restore_fingerprints(
+    sections: dict[str, memoryview],
+) -> dict[str, Optional[tuple[int, int, int]]]:
+    """The scanned files of a snapshot and their stat tuples."""
+    if not sections["files"]:
+        return {}
+    paths = str(sections["files"], "utf-8", _ERRORS).split("\0")
+    stats = sections["fingerprints"].cast("Q")
+    fingerprints: dict[str, Optional[tuple[int, int, int]]] = {}
+    for number, file_path in enumerate(paths):
+        fingerprint = tuple(stats[3 * number:3 * number + 3])
+        fingerprints[file_path] = None if fingerprint == _UNTRUSTED else fingerprint
+    return fingerprints
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to a multiple of 8, so sections can be cast in place."""
+    return (offset + 7) & ~7
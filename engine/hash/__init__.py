@@ -3,18 +3,85 @@ Hash module for Gen-D.
 
 This module provides semantic hashing functionality that computes
 stable hashes of function logic, ignoring formatting and documentation.
+Hashes are produced by versioned schemes, see engine.hash.schemes,
+with a configurable digest algorithm, see engine.hash.digest.
 """
 
+from engine.hash.ast_hash import (
+    canonical_ast_dump,
+    compute_ast_function_hashes,
+    compute_ast_hash,
+    compute_ast_hash_for_node,
+)
+from engine.hash.batch import compute_semantic_hashes
+from engine.hash.digest import DEFAULT_DIGEST, DIGEST_ALGORITHMS, Digest
+from engine.hash.rollup import (
+    RollupBuilder,
+    RollupEntry,
+    changed_files,
+    compute_rollups,
+)
+from engine.hash.sections import SECTIONS, FunctionHashes
+from engine.hash.schemes import (
+    AST_HASH_SCHEME,
+    CST_HASH_SCHEME,
+    DEFAULT_HASH_SCHEME,
+    HASH_SCHEMES,
+    compute_hash_with_scheme,
+    hash_function,
+    qualified_scheme,
+)
+from engine.hash.similarity import (
+    SIMILARITY_SCHEME,
+    SimilarityIndex,
+    compute_minhash,
+    estimate_similarity,
+)
 from engine.hash.semantic_hash import (
     compute_semantic_hash,
     compute_doc_hash,
+    compute_raw_hash,
+    compute_function_hashes,
+    compute_hash_for_node,
     normalize_function_code,
+    normalize_function_node,
     DocstringRemover,
+    SemanticNormalizer,
 )
 
 __all__ = [
+    "AST_HASH_SCHEME",
+    "CST_HASH_SCHEME",
+    "DEFAULT_DIGEST",
+    "DEFAULT_HASH_SCHEME",
+    "DIGEST_ALGORITHMS",
+    "Digest",
+    "FunctionHashes",
+    "HASH_SCHEMES",
+    "RollupBuilder",
+    "SECTIONS",
+    "SIMILARITY_SCHEME",
+    "SimilarityIndex",
+    "compute_minhash",
+    "estimate_similarity",
+    "RollupEntry",
+    "changed_files",
+    "compute_rollups",
+    "canonical_ast_dump",
+    "compute_ast_function_hashes",
+    "compute_ast_hash",
+    "compute_ast_hash_for_node",
+    "compute_hash_with_scheme",
+    "compute_semantic_hashes",
+    "hash_function",
+    "qualified_scheme",
     "compute_semantic_hash",
     "compute_doc_hash",
+    "compute_raw_hash",
+    "compute_function_hashes",
+    "compute_hash_for_node",
     "normalize_function_code",
+    "normalize_function_node",
     "DocstringRemover",
+    "SemanticNormalizer",
 ]
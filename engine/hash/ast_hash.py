@@ -0,0 +1,203 @@
+"""
+AST-based Semantic Hashing for Gen-D
+
+This module implements the "ast-v1" hash scheme, an alternative to the
+LibCST-based "cst-v1" scheme of semantic_hash. A function is hashed from
+a canonical dump of its stdlib `ast` tree, so formatting and comments are
+ignored without any transformation pass: they are simply not in the tree.
+
+Design Decisions:
+    - The dump is produced here rather than by ast.dump, whose output
+      format changes between Python releases
+    - Source positions, type comments and string prefix kinds are omitted
+    - Empty optional fields (None, []) are omitted, so fields added to the
+      grammar by newer Pythons do not change hashes of code not using them
+    - Docstrings of the function and of nested functions and classes are
+      dropped; a body holding only a docstring hashes as `pass`, as in cst-v1
+    - Uses SHA-256 for final hash computation by default, like cst-v1
+    - Section hashes (engine.hash.sections) are cut from the same dump:
+      the body and decorator_list fields, and everything else as signature
+
+Academic Context:
+    Input: Python function source code (string or ast node)
+    Transformation: Canonical ast dump without docstrings → SHA-256
+    Output: Deterministic 64-character hex hash
+    Limitation: Not comparable with cst-v1 hashes of the same code
+
+Hash Stability Guarantees:
+    Identical to cst-v1: whitespace, comments and docstrings never change
+    the hash, while renames and statement reordering do. Unlike cst-v1,
+    redundant parentheses and string quoting style do not change it either.
+"""
+
+import ast
+from typing import Optional, Union
+
+from engine.hash.digest import DEFAULT_DIGEST, Digest
+from engine.hash.sections import FunctionHashes
+
+# Fields that record presentation rather than behaviour
+_IGNORED_FIELDS = frozenset({"type_comment", "kind"})
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+# Nodes whose body may open with a docstring
+_DOCUMENTED_NODES = (*_FUNCTION_NODES, ast.ClassDef)
+
+# Function fields forming a section other than the signature
+_SECTION_FIELDS = {"body": "body", "decorator_list": "decorators"}
+
+
+def canonical_ast_dump(node: ast.AST) -> str:
+    """
+    Render an ast node in the canonical form hashed by the ast-v1 scheme.
+
+    Args:
+        node: Any ast node, typically a function definition
+
+    Returns:
+        The canonical dump, e.g. "Return(value=Name(id='x',ctx=Load(),),)"
+    """
+    parts: list[str] = []
+    _dump(node, parts)
+    return "".join(parts)
+
+
+def compute_ast_hash(source: str, digest: Digest = DEFAULT_DIGEST) -> str:
+    """
+    Compute the ast-v1 semantic hash of Python source code.
+
+    If the source is a single function definition the function node is
+    hashed, so the result equals compute_ast_hash_for_node of that node;
+    any other source is hashed as a whole module.
+
+    Args:
+        source: Python source code as a string
+        digest: Digest algorithm of the hash
+
+    Returns:
+        Hexadecimal hash (64 characters with the default SHA-256)
+
+    Raises:
+        SyntaxError: If the source has syntax errors
+
+    Example:
+        >>> hash1 = compute_ast_hash("def f(): return (1)")
+        >>> hash2 = compute_ast_hash("def f():\\n    return 1  # one")
+        >>> hash1 == hash2
+        True
+    """
+    module = ast.parse(source)
+    if len(module.body) == 1 and isinstance(module.body[0], _FUNCTION_NODES):
+        return compute_ast_hash_for_node(module.body[0], digest)
+    return compute_ast_hash_for_node(module, digest)
+
+
+def compute_ast_hash_for_node(
+    node: Union[ast.FunctionDef, ast.AsyncFunctionDef, ast.AST],
+    digest: Digest = DEFAULT_DIGEST,
+) -> str:
+    """
+    Compute the ast-v1 semantic hash of an already parsed node.
+
+    Args:
+        node: The ast node to hash, typically a function definition
+        digest: Digest algorithm of the hash
+
+    Returns:
+        Hexadecimal hash (64 characters with the default SHA-256)
+    """
+    return digest.hexdigest(canonical_ast_dump(node).encode("utf-8"))
+
+
+def compute_ast_function_hashes(
+    node: Union[ast.FunctionDef, ast.AsyncFunctionDef],
+    digest: Digest = DEFAULT_DIGEST,
+) -> FunctionHashes:
+    """
+    Compute the ast-v1 semantic hash and section hashes of a function.
+
+    The canonical dump is produced once; the semantic hash equals
+    compute_ast_hash_for_node(node, digest).
+
+    Args:
+        node: A function definition node
+        digest: Digest algorithm of the hashes
+
+    Returns:
+        FunctionHashes of the function (see engine.hash.sections)
+    """
+    parts: list[str] = []
+    spans: dict[str, tuple[int, int]] = {}
+    _dump(node, parts, spans)
+
+    signature: list[str] = []
+    start = 0
+    for begin, end in sorted(spans.values()):
+        signature.extend(parts[start:begin])
+        start = end
+    signature.extend(parts[start:])
+
+    def section(name: str) -> str:
+        begin, end = spans.get(name, (0, 0))
+        return digest.hexdigest("".join(parts[begin:end]).encode("utf-8"))
+
+    return FunctionHashes(
+        semantic=digest.hexdigest("".join(parts).encode("utf-8")),
+        signature=digest.hexdigest("".join(signature).encode("utf-8")),
+        body=section("body"),
+        decorators=section("decorators"),
+    )
+
+
+def _dump(
+    value: object,
+    parts: list[str],
+    spans: Optional[dict[str, tuple[int, int]]] = None,
+) -> None:
+    """
+    Append the canonical rendering of an ast node, list or constant.
+
+    If spans is given, the (start, end) range of parts rendering each
+    section field of the node (see _SECTION_FIELDS) is stored in it.
+    """
+    if isinstance(value, ast.AST):
+        parts.append(type(value).__name__)
+        parts.append("(")
+        for name in value._fields:
+            if name in _IGNORED_FIELDS:
+                continue
+            field = getattr(value, name, None)
+            if name == "body" and isinstance(value, _DOCUMENTED_NODES):
+                field = _without_docstring(field)
+            if field is None or (isinstance(field, list) and not field):
+                continue
+            start = len(parts)
+            parts.append(name)
+            parts.append("=")
+            _dump(field, parts)
+            parts.append(",")
+            if spans is not None and name in _SECTION_FIELDS:
+                spans[_SECTION_FIELDS[name]] = (start, len(parts))
+        parts.append(")")
+    elif isinstance(value, list):
+        parts.append("[")
+        for item in value:
+            _dump(item, parts)
+            parts.append(",")
+        parts.append("]")
+    else:
+        # Constants: repr keeps 1, 1.0, True and "1" apart
+        parts.append(repr(value))
+
+
+def _without_docstring(body: list[ast.stmt]) -> list[ast.stmt]:
+    """A body without its leading docstring, `pass` if nothing else remains."""
+    if (
+        body
+        and isinstance(body[0], ast.Expr)
+        and isinstance(body[0].value, ast.Constant)
+        and isinstance(body[0].value.value, str)
+    ):
+        return body[1:] or [ast.Pass()]
+    return body
@@ -0,0 +1,229 @@
+"""
+Rollup Hashes for Gen-D
+
+This module aggregates node hashes up the project hierarchy, Merkle
+style: functions and methods roll up into their class, classes and
+module-level functions into their file, files into their directory and
+directories into the project root.
+
+A rollup hash changes exactly when something below it changes, so two
+scans can be compared in O(1) at the root, and a comparison that finds a
+difference only needs to descend into the subtrees whose hashes differ.
+
+Hierarchy Paths:
+    ""                   the project root
+    "pkg/sub"            a directory, relative to the root
+    "pkg/sub/mod.py"     a file
+    "pkg/sub/mod.py::C"  a class within a file
+
+Design Decisions:
+    - A node's leaf hash covers its ID, hash scheme, semantic hash and doc
+      hash: everything drift detection compares, and nothing else, so
+      moving a function within its file does not change any rollup
+    - Children are combined in sorted path order, so rollups do not
+      depend on scan order
+    - Files are rolled up as soon as they are added, so streaming scans
+      only keep one entry per file and class in memory
+    - Files without functions are left out; they cannot drift
+"""
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    from engine.models import CodeNode
+
+
+# Kinds of hierarchy entries, from the top down
+ROLLUP_KINDS = ("project", "directory", "file", "class")
+
+
+@dataclass(frozen=True)
+class RollupEntry:
+    """
+    The rollup hash of one hierarchy level.
+
+    Attributes:
+        path: Hierarchy path, see the module docstring
+        parent: Path of the enclosing entry, None for the project root
+        kind: One of ROLLUP_KINDS
+        rollup_hash: Hash over the entry's children
+        file_path: Source file path as scanned, for file and class entries
+    """
+
+    path: str
+    parent: Optional[str]
+    kind: str
+    rollup_hash: str
+    file_path: Optional[str] = None
+
+
+class RollupBuilder:
+    """
+    Incrementally computes rollup hashes for the files of one scan.
+
+    Usage:
+        builder = RollupBuilder("/path/to/project")
+        for file_result in iter_scan(...):
+            builder.add_file(file_result.file_path, file_result.nodes)
+        entries = builder.finish()
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        """
+        Initialize the builder.
+
+        Args:
+            root: Scanned directory; hierarchy paths are relative to it
+        """
+        self._root = Path(root)
+        self._entries: dict[str, RollupEntry] = {}
+        # directory path -> {child path: child hash}
+        self._directories: dict[str, dict[str, str]] = {}
+
+    def add_file(self, file_path: str, nodes: Iterable["CodeNode"]) -> None:
+        """
+        Roll up the nodes of one file into class and file entries.
+
+        Args:
+            file_path: Path of the scanned file
+            nodes: The file's CodeNodes
+        """
+        file_key = self._file_key(file_path)
+        members: dict[str, str] = {}
+        classes: dict[str, dict[str, str]] = {}
+        for node in nodes:
+            if node.is_method and node.class_name:
+                classes.setdefault(node.class_name, {})[node.id] = node_leaf_hash(node)
+            else:
+                members[node.id] = node_leaf_hash(node)
+
+        if not members and not classes:
+            return
+
+        for class_name, methods in classes.items():
+            class_key = f"{file_key}::{class_name}"
+            class_hash = _combine("class", methods)
+            self._entries[class_key] = RollupEntry(
+                class_key, file_key, "class", class_hash, file_path
+            )
+            members[class_key] = class_hash
+
+        directory = _parent_directory(file_key)
+        file_hash = _combine("file", members)
+        self._entries[file_key] = RollupEntry(file_key, directory, "file", file_hash, file_path)
+        self._directories.setdefault(directory, {})[file_key] = file_hash
+
+    def finish(self) -> dict[str, RollupEntry]:
+        """
+        Roll the added files up into directories and the project root.
+
+        Returns:
+            Every entry of the hierarchy keyed by path, the root included
+            (with an empty-project hash if no file had functions)
+        """
+        directories = set()
+        for directory in self._directories:
+            while directory:
+                directories.add(directory)
+                directory = _parent_directory(directory)
+
+        entries = dict(self._entries)
+        children = {path: dict(members) for path, members in self._directories.items()}
+        # Deepest first, so each directory is complete before its parent
+        for directory in sorted(directories, key=lambda path: path.count("/"), reverse=True):
+            parent = _parent_directory(directory)
+            rollup_hash = _combine("directory", children.get(directory, {}))
+            entries[directory] = RollupEntry(directory, parent, "directory", rollup_hash)
+            children.setdefault(parent, {})[directory] = rollup_hash
+
+        entries[""] = RollupEntry("", None, "project", _combine("project", children.get("", {})))
+        return entries
+
+    def _file_key(self, file_path: str) -> str:
+        """Hierarchy path of a file: relative to the root where possible."""
+        path = Path(file_path)
+        try:
+            return path.relative_to(self._root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+
+def compute_rollups(nodes: Iterable["CodeNode"], root: str | Path) -> dict[str, RollupEntry]:
+    """
+    Compute the rollup hierarchy of a set of nodes.
+
+    Args:
+        nodes: CodeNodes of a scan, in any order
+        root: Scanned directory; hierarchy paths are relative to it
+
+    Returns:
+        Every entry of the hierarchy keyed by path
+    """
+    by_file: dict[str, list["CodeNode"]] = {}
+    for node in nodes:
+        by_file.setdefault(node.file_path, []).append(node)
+
+    builder = RollupBuilder(root)
+    for file_path, file_nodes in by_file.items():
+        builder.add_file(file_path, file_nodes)
+    return builder.finish()
+
+
+def changed_files(
+    stored: dict[str, RollupEntry],
+    current: dict[str, RollupEntry],
+) -> set[str]:
+    """
+    Find the files whose rollup differs, descending only into changed subtrees.
+
+    Args:
+        stored: Hierarchy saved by an earlier scan
+        current: Hierarchy of the current scan
+
+    Returns:
+        File paths (as scanned) of current files whose contents may differ
+        from the stored ones; empty if the root hashes match
+    """
+    children: dict[str, list[str]] = {}
+    for entry in current.values():
+        if entry.parent is not None and entry.kind != "class":
+            children.setdefault(entry.parent, []).append(entry.path)
+
+    changed: set[str] = set()
+    pending = [""] if "" in current else []
+    while pending:
+        path = pending.pop()
+        entry = current[path]
+        previous = stored.get(path)
+        if previous is not None and previous.rollup_hash == entry.rollup_hash:
+            continue
+        if entry.kind == "file":
+            changed.add(entry.file_path or path)
+        else:
+            pending.extend(children.get(path, []))
+    return changed
+
+
+def node_leaf_hash(node: "CodeNode") -> str:
+    """Hash of the fields of a node that drift detection compares."""
+    material = "\0".join(
+        [node.id, node.hash_scheme, node.semantic_hash, node.doc_hash or ""]
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _combine(kind: str, children: dict[str, str]) -> str:
+    """Hash a level from its children's paths and hashes."""
+    digest = hashlib.sha256(kind.encode("utf-8"))
+    for path in sorted(children):
+        digest.update(f"\n{path}\0{children[path]}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _parent_directory(path: str) -> str:
+    """Hierarchy path of the directory holding a file or directory."""
+    parent = PurePosixPath(path).parent.as_posix()
+    return "" if parent in (".", "/") else parent
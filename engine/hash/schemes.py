@@ -0,0 +1,90 @@
+"""
+Hash Scheme Registry for Gen-D
+
+Every semantic hash is produced by a named, versioned scheme, and the
+scheme identifier is stored next to the hash. Hashes are only comparable
+when their schemes match; a stored hash from another scheme is never
+evidence of drift, nor of its absence, until a scan re-bases it.
+
+    - cst-v1: LibCST normalization (semantic_hash). Used by the libcst
+      parser backend and by every database written before schemes existed.
+    - ast-v1: Canonical stdlib ast dump (ast_hash). Used by the ast
+      parser backend.
+
+Hashes computed with a digest other than SHA-256 are stored under a
+qualified identifier such as "cst-v1+blake2b-16", so switching digests
+re-bases stored hashes on the next scan instead of reporting every
+function as drifted.
+"""
+
+from typing import Callable
+
+from engine.hash.ast_hash import compute_ast_hash
+from engine.hash.digest import DEFAULT_DIGEST, Digest
+from engine.hash.semantic_hash import compute_semantic_hash
+from engine.models import AST_HASH_SCHEME, CST_HASH_SCHEME, DEFAULT_HASH_SCHEME
+
+HASH_SCHEMES: dict[str, Callable[[str, Digest], str]] = {
+    CST_HASH_SCHEME: compute_semantic_hash,
+    AST_HASH_SCHEME: compute_ast_hash,
+}
+
+
+def hash_function(scheme: str) -> Callable[[str, Digest], str]:
+    """
+    Look up the source hashing function of a scheme.
+
+    Args:
+        scheme: One of HASH_SCHEMES
+
+    Returns:
+        A function mapping Python source and a Digest to a hex hash
+
+    Raises:
+        ValueError: If the scheme is unknown
+    """
+    try:
+        return HASH_SCHEMES[scheme]
+    except KeyError:
+        raise ValueError(
+            f"Unknown hash scheme: {scheme!r} (expected one of {', '.join(HASH_SCHEMES)})"
+        ) from None
+
+
+def compute_hash_with_scheme(
+    source: str,
+    scheme: str = DEFAULT_HASH_SCHEME,
+    digest: Digest = DEFAULT_DIGEST,
+) -> str:
+    """
+    Compute the semantic hash of Python source code with a named scheme.
+
+    Args:
+        source: Python source code as a string
+        scheme: One of HASH_SCHEMES
+        digest: Digest algorithm of the hash
+
+    Returns:
+        Hexadecimal hash (64 characters with the default SHA-256)
+
+    Raises:
+        ValueError: If the scheme is unknown
+        libcst.ParserSyntaxError, SyntaxError: If the source has syntax errors
+    """
+    return hash_function(scheme)(source, digest)
+
+
+def qualified_scheme(scheme: str, digest: Digest = DEFAULT_DIGEST) -> str:
+    """
+    Identifier stored with hashes computed by a scheme and digest.
+
+    SHA-256 hashes keep the bare scheme name, so databases written before
+    digests were configurable stay comparable.
+
+    Example:
+        >>> qualified_scheme("cst-v1", Digest.from_name("blake2b-16"))
+        'cst-v1+blake2b-16'
+    """
+    if digest == DEFAULT_DIGEST:
+        return scheme
+    return f"{scheme}+{digest.name}"
@@ -0,0 +1,46 @@
+"""
+Function Section Hashes for Gen-D
+
+A semantic hash says whether a function changed, not where. Section
+hashes split the same normalized definition into three parts, computed
+in the same pass as the semantic hash:
+
+    signature: async marker, name, parameters and return annotation
+    body: the statements, without the docstring
+    decorators: the decorator list (a hash of empty input if there is none)
+
+Comparing them tells a signature change from a body change without the
+old source, and callers that only care about the public interface can
+compare signature hashes alone.
+
+Each scheme hashes its own normalized form of the sections (rendered code
+for cst-v1, the canonical dump for ast-v1), so like semantic hashes they
+are only comparable under one scheme and digest.
+"""
+
+from dataclasses import dataclass
+
+# Section names, in the order they are reported
+SECTIONS = ("signature", "body", "decorators")
+
+
+@dataclass(frozen=True)
+class FunctionHashes:
+    """
+    The semantic hash of a function and the hashes of its sections.
+
+    Attributes:
+        semantic: Hash of the whole normalized definition
+        signature: Hash of the signature section
+        body: Hash of the body section
+        decorators: Hash of the decorators section
+        minhash: Similarity signature of the function's source, see
+            engine.hash.compute_minhash; only set on stored hashes, so
+            reusing them also skips computing the signature
+    """
+
+    semantic: str
+    signature: str
+    body: str
+    decorators: str
+    minhash: str = ""
@@ -12,13 +12,22 @@ Unlike textual hashing, semantic hashes are designed to:
 Design Decisions:
     - Uses LibCST to parse and transform code before hashing
     - Strips docstrings via CST transformation
+    - Fuses docstring, comment and whitespace passes into one traversal
     - Normalizes to canonical string representation
-    - Uses SHA-256 for final hash computation
+    - Hashes stream the normalized code token by token into the digest,
+      never materializing it as one string or bytes object. Streaming
+      hooks into LibCST's private CodegenState; if that is missing or its
+      output, whole or per section, differs from the rendered code on a
+      sample, the code is rendered and hashed instead (see STREAMING)
+    - Signature, body and decorator hashes of a function (see
+      engine.hash.sections) are split off the same stream
+    - Uses SHA-256 for final hash computation by default; any Digest
+      (e.g. BLAKE2b-16) can be passed instead
 
 Academic Context:
     Input: Python function source code (string or CST node)
     Transformation: Docstring removal → Normalization → SHA-256
-    Output: Deterministic 64-character hex hash
+    Output: Deterministic 64-character hex hash (with the default digest)
     Limitation: Semantic equivalence is approximated, not proven
 
 Hash Stability Guarantees:
@@ -35,9 +44,20 @@ TODO (Research Extensions):
 """
 
 import hashlib
-from typing import Union
+import logging
+from typing import Optional, Union
 import libcst as cst
 
+try:
+    from libcst._nodes.internal import CodegenState
+except ImportError:  # private API; the streaming check fails without it
+    CodegenState = object
+
+from engine.hash.digest import DEFAULT_DIGEST, Digest
+from engine.hash.sections import SECTIONS, FunctionHashes
+
+logger = logging.getLogger(__name__)
+
 
 class DocstringRemover(cst.CSTTransformer):
     """
@@ -260,6 +280,235 @@ class WhitespaceNormalizer(cst.CSTTransformer):
         return updated_node.with_changes(leading_lines=[])
 
 
+class SemanticNormalizer(cst.CSTTransformer):
+    """
+    Single-pass CST Transformer used to normalize code for semantic hashing.
+
+    Fuses DocstringRemover, CommentRemover and WhitespaceNormalizer into one
+    traversal. Each pass of a CSTTransformer rebuilds the whole immutable
+    tree, so running the three transforms in sequence costs three rebuilds;
+    this transformer does the same work with one.
+
+    The output is byte-identical to applying the three transformers in
+    order. Every rewrite happens in a leave_* hook, so a node's children are
+    already fully normalized when it is processed, and for the two node
+    types touched by more than one transform (FunctionDef and ClassDef) the
+    docstring is removed before whitespace is normalized, as in the
+    sequential pipeline.
+
+    Usage:
+        module = cst.parse_module(source)
+        normalized = module.visit(SemanticNormalizer()).code
+    """
+
+    def __init__(self) -> None:
+        """Initialize the normalizer."""
+        super().__init__()
+        self._docstrings = DocstringRemover()
+
+    def leave_FunctionDef(
+        self,
+        original_node: cst.FunctionDef,
+        updated_node: cst.FunctionDef,
+    ) -> cst.FunctionDef:
+        """Remove the docstring, then empty lines before the definition."""
+        updated_node = self._docstrings.leave_FunctionDef(original_node, updated_node)
+        return updated_node.with_changes(
+            leading_lines=[],
+            lines_after_decorators=[],
+        )
+
+    def leave_ClassDef(
+        self,
+        original_node: cst.ClassDef,
+        updated_node: cst.ClassDef,
+    ) -> cst.ClassDef:
+        """Remove the docstring, then empty lines before the definition."""
+        updated_node = self._docstrings.leave_ClassDef(original_node, updated_node)
+        return updated_node.with_changes(
+            leading_lines=[],
+            lines_after_decorators=[],
+        )
+
+    def leave_EmptyLine(
+        self,
+        original_node: cst.EmptyLine,
+        updated_node: cst.EmptyLine,
+    ) -> cst.EmptyLine:
+        """Remove comment from empty lines."""
+        if updated_node.comment is not None:
+            return updated_node.with_changes(comment=None)
+        return updated_node
+
+    def leave_TrailingWhitespace(
+        self,
+        original_node: cst.TrailingWhitespace,
+        updated_node: cst.TrailingWhitespace,
+    ) -> cst.TrailingWhitespace:
+        """Remove trailing comments."""
+        if updated_node.comment is not None:
+            return updated_node.with_changes(comment=None)
+        return updated_node
+
+    def leave_IndentedBlock(
+        self,
+        original_node: cst.IndentedBlock,
+        updated_node: cst.IndentedBlock,
+    ) -> cst.IndentedBlock:
+        """Normalize the indented block header."""
+        return updated_node.with_changes(
+            header=cst.TrailingWhitespace(),
+        )
+
+    def leave_SimpleStatementLine(
+        self,
+        original_node: cst.SimpleStatementLine,
+        updated_node: cst.SimpleStatementLine,
+    ) -> cst.SimpleStatementLine:
+        """Remove empty lines before statements."""
+        return updated_node.with_changes(
+            leading_lines=[],
+            trailing_whitespace=cst.TrailingWhitespace(),
+        )
+
+    def leave_If(
+        self,
+        original_node: cst.If,
+        updated_node: cst.If,
+    ) -> cst.If:
+        """Remove empty lines before if statements."""
+        return updated_node.with_changes(leading_lines=[])
+
+    def leave_For(
+        self,
+        original_node: cst.For,
+        updated_node: cst.For,
+    ) -> cst.For:
+        """Remove empty lines before for loops."""
+        return updated_node.with_changes(leading_lines=[])
+
+    def leave_While(
+        self,
+        original_node: cst.While,
+        updated_node: cst.While,
+    ) -> cst.While:
+        """Remove empty lines before while loops."""
+        return updated_node.with_changes(leading_lines=[])
+
+    def leave_Try(
+        self,
+        original_node: cst.Try,
+        updated_node: cst.Try,
+    ) -> cst.Try:
+        """Remove empty lines before try blocks."""
+        return updated_node.with_changes(leading_lines=[])
+
+    def leave_With(
+        self,
+        original_node: cst.With,
+        updated_node: cst.With,
+    ) -> cst.With:
+        """Remove empty lines before with statements."""
+        return updated_node.with_changes(leading_lines=[])
+
+
+class HashingCodegenState(CodegenState):
+    """
+    Code generation state that feeds generated code into a hash object.
+
+    LibCST renders a tree by appending every token to CodegenState.tokens
+    and joining them at the end. Here the token list holds at most one
+    token: appending a token first hashes the one before it. Holding the
+    last token back keeps Module's final pop_trailing_newline working
+    (and its check for an empty module), and flush hashes what remains.
+
+    Hashing the UTF-8 encoding of each token in turn gives the same digest
+    as hashing the encoded ``module.code``, with memory bounded by the
+    largest single token instead of the size of the code.
+
+    Usage:
+        hasher = hashlib.sha256()
+        state = HashingCodegenState(hasher, module.default_indent, module.default_newline)
+        module._codegen(state)
+        state.flush()
+    """
+
+    def __init__(self, hasher: "hashlib._Hash", default_indent: str, default_newline: str):
+        """
+        Initialize the state.
+
+        Args:
+            hasher: Hash object receiving the generated code
+            default_indent: Indentation of the module being rendered
+            default_newline: Newline of the module being rendered
+        """
+        super().__init__(default_indent=default_indent, default_newline=default_newline)
+        # Update functions receiving tokens added now, and those that
+        # receive the buffered token; subclasses may route tokens elsewhere
+        self._updates: tuple = (hasher.update,)
+        self._pending: tuple = self._updates
+
+    def add_token(self, value: str) -> None:
+        """Hash the buffered token and buffer this one."""
+        tokens = self.tokens
+        if tokens:
+            data = tokens.pop().encode("utf-8")
+            for update in self._pending:
+                update(data)
+        tokens.append(value)
+        self._pending = self._updates
+
+    def add_indent_tokens(self) -> None:
+        """Add the current indentation, one token per level."""
+        for value in self.indent_tokens:
+            self.add_token(value)
+
+    def flush(self) -> None:
+        """Hash the buffered token; call once code generation is done."""
+        if self.tokens:
+            data = self.tokens.pop().encode("utf-8")
+            for update in self._pending:
+                update(data)
+
+
+class _SectionHashingState(HashingCodegenState):
+    """
+    HashingCodegenState that also hashes the sections of one function.
+
+    Every token goes into the whole hash; tokens generated inside the
+    function additionally go into the hash of the section being rendered,
+    switched as code generation enters and leaves the function's body and
+    decorators. Nested definitions are part of the body.
+    """
+
+    def __init__(
+        self,
+        hasher: "hashlib._Hash",
+        function: cst.FunctionDef,
+        digest: Digest,
+        default_indent: str,
+        default_newline: str,
+    ) -> None:
+        super().__init__(hasher, default_indent, default_newline)
+        self.section_hashers = {name: digest.new() for name in SECTIONS}
+        whole = self._updates
+        routes = {
+            name: whole + (hasher.update,) for name, hasher in self.section_hashers.items()
+        }
+        # Updates to switch to when code generation enters or leaves a node
+        self._enter = {id(function): routes["signature"], id(function.body): routes["body"]}
+        self._leave = {id(function): whole, id(function.body): routes["signature"]}
+        for decorator in function.decorators:
+            self._enter[id(decorator)] = routes["decorators"]
+            self._leave[id(decorator)] = routes["signature"]
+
+    def before_codegen(self, node: cst.CSTNode) -> None:
+        self._updates = self._enter.get(id(node), self._updates)
+
+    def after_codegen(self, node: cst.CSTNode) -> None:
+        self._updates = self._leave.get(id(node), self._updates)
+
+
 def normalize_function_code(source: str) -> str:
     """
     Normalize Python source code for semantic comparison.
@@ -272,6 +521,9 @@ def normalize_function_code(source: str) -> str:
     3. Remove all comments
     4. Convert back to string (LibCST handles whitespace normalization)
 
+    Steps 2 and 3 and whitespace normalization run as a single fused
+    traversal (see SemanticNormalizer).
+
     Args:
         source: Python source code as a string
 
@@ -300,16 +552,65 @@ def normalize_function_code(source: str) -> str:
     except cst.ParserSyntaxError:
         raise
 
-    # Apply transformations in sequence
-    module = module.visit(DocstringRemover())
-    module = module.visit(CommentRemover())
-    module = module.visit(WhitespaceNormalizer())
+    return _normalize_module(module)
+
+
+def normalize_function_node(node: cst.FunctionDef) -> str:
+    """
+    Normalize an already-parsed function definition for semantic comparison.
+
+    Produces exactly the same output as calling normalize_function_code on
+    ``cst.Module(body=[node]).code``, without rendering and re-parsing the
+    function. When that source is re-parsed, LibCST moves the function's
+    leading lines into the module header; the module is built in that same
+    shape here so the normalized text (and therefore the hash) is identical.
+
+    Args:
+        node: A function definition node taken from a parsed module
+
+    Returns:
+        Normalized source code string
+    """
+    return _normalize_module(_function_module(node))
+
+
+def _function_module(node: cst.FunctionDef) -> cst.Module:
+    """Module holding a function, shaped as if its source were re-parsed."""
+    return cst.Module(
+        header=node.leading_lines,
+        body=[node.with_changes(leading_lines=())],
+    )
+
+
+def _normalize_module(module: cst.Module) -> str:
+    """Apply the normalization transforms to a module and render it."""
+    # Docstring, comment and whitespace normalization in one traversal
+    module = module.visit(SemanticNormalizer())
 
     # Return normalized code
     return module.code
 
 
-def compute_semantic_hash(source: str) -> str:
+def _hash_module(module: cst.Module, digest: Digest) -> str:
+    """
+    Hash the normalized rendering of a module.
+
+    Equal to hashing _normalize_module(module), but the code is streamed
+    into the digest (see HashingCodegenState) instead of being joined
+    into one string and encoded into a second copy.
+    """
+    module = module.visit(SemanticNormalizer())
+    if not _streaming():
+        return digest.hexdigest(module.code.encode("utf-8"))
+
+    hasher = digest.new()
+    state = HashingCodegenState(hasher, module.default_indent, module.default_newline)
+    module._codegen(state)
+    state.flush()
+    return hasher.hexdigest()
+
+
+def compute_semantic_hash(source: str, digest: Digest = DEFAULT_DIGEST) -> str:
     """
     Compute a semantic hash of Python source code.
 
@@ -326,9 +627,10 @@ def compute_semantic_hash(source: str) -> str:
 
     Args:
         source: Python source code as a string
+        digest: Digest algorithm of the hash
 
     Returns:
-        64-character hexadecimal SHA-256 hash
+        Hexadecimal hash (64 characters with the default SHA-256)
 
     Raises:
         libcst.ParserSyntaxError: If the source has syntax errors
@@ -339,15 +641,89 @@ def compute_semantic_hash(source: str) -> str:
         >>> hash1 == hash2  # Same logic, different formatting
         True
     """
-    normalized = normalize_function_code(source)
+    return _hash_module(cst.parse_module(source), digest)
+
 
-    # Compute SHA-256 hash
-    hash_bytes = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+def compute_function_hashes(
+    node: cst.FunctionDef,
+    digest: Digest = DEFAULT_DIGEST,
+) -> FunctionHashes:
+    """
+    Compute the semantic hash and section hashes of a function definition.
 
-    return hash_bytes
+    One normalization and one code generation pass produce all four
+    hashes; the semantic hash equals compute_hash_for_node(node, digest).
 
+    Args:
+        node: A function definition node taken from a parsed module
+        digest: Digest algorithm of the hashes
 
-def compute_doc_hash(docstring: str) -> str:
+    Returns:
+        FunctionHashes of the function (see engine.hash.sections)
+    """
+    module = _function_module(node).visit(SemanticNormalizer())
+    if not _streaming():
+        return _rendered_function_hashes(module, digest)
+    return _streamed_function_hashes(module, digest)
+
+
+def _streamed_function_hashes(module: cst.Module, digest: Digest) -> FunctionHashes:
+    """Hashes of a normalized function module, streamed in one codegen pass."""
+    function = module.body[0]
+    hasher = digest.new()
+    state = _SectionHashingState(
+        hasher, function, digest, module.default_indent, module.default_newline
+    )
+    module._codegen(state)
+    state.flush()
+
+    sections = {name: section.hexdigest() for name, section in state.section_hashers.items()}
+    return FunctionHashes(semantic=hasher.hexdigest(), **sections)
+
+
+def _rendered_function_hashes(module: cst.Module, digest: Digest) -> FunctionHashes:
+    """
+    Hashes of a normalized function module, from its rendered code.
+
+    The function is rendered as its decorators, then its signature, then
+    its body, so the signature is what remains of the function's code
+    between the two.
+    """
+    function = module.body[0]
+    code = module.code_for_node(function)
+    decorators = "".join(module.code_for_node(decorator) for decorator in function.decorators)
+    body = module.code_for_node(function.body)
+    sections = {
+        "signature": code[len(decorators):len(code) - len(body)],
+        "body": body,
+        "decorators": decorators,
+    }
+    return FunctionHashes(
+        semantic=digest.hexdigest(module.code.encode("utf-8")),
+        **{name: digest.hexdigest(section.encode("utf-8")) for name, section in sections.items()},
+    )
+
+
+def compute_raw_hash(source: str, digest: Digest = DEFAULT_DIGEST) -> str:
+    """
+    Compute a hash of a function's exact source text.
+
+    Nothing is parsed or normalized, so this is far cheaper than
+    compute_semantic_hash and changes with any edit, formatting included.
+    Equal raw hashes imply equal semantic hashes (under one scheme), so
+    a stored semantic hash can be reused when the raw hash is unchanged.
+
+    Args:
+        source: Function source code as a string
+        digest: Digest algorithm of the hash
+
+    Returns:
+        Hexadecimal hash (64 characters with the default SHA-256)
+    """
+    return digest.hexdigest(source.encode("utf-8"))
+
+
+def compute_doc_hash(docstring: str, digest: Digest = DEFAULT_DIGEST) -> str:
     """
     Compute a hash of docstring content.
 
@@ -357,9 +733,10 @@ def compute_doc_hash(docstring: str) -> str:
 
     Args:
         docstring: The docstring content (without quotes)
+        digest: Digest algorithm of the hash
 
     Returns:
-        64-character hexadecimal SHA-256 hash
+        Hexadecimal hash (64 characters with the default SHA-256)
 
     Example:
         >>> hash1 = compute_doc_hash("Calculate the sum.")
@@ -370,29 +747,33 @@ def compute_doc_hash(docstring: str) -> str:
     # Normalize by stripping leading/trailing whitespace
     normalized = docstring.strip()
 
-    # Compute SHA-256 hash
-    hash_bytes = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
-
-    return hash_bytes
+    return digest.hexdigest(normalized.encode("utf-8"))
 
 
 def compute_hash_for_node(
-    source_code: Union[str, cst.BaseSuite],
+    source_code: Union[str, cst.FunctionDef, cst.BaseSuite],
+    digest: Digest = DEFAULT_DIGEST,
 ) -> str:
     """
-    Compute semantic hash for a function body node.
+    Compute semantic hash for a function node.
 
     This is a convenience function that handles both string sources
-    and CST nodes (as returned by the parser).
+    and CST nodes (as returned by the parser). Function definitions are
+    hashed directly from the tree, so no re-parse is needed, and the
+    result equals compute_semantic_hash of the function's source.
 
     Args:
         source_code: Either a source string or a CST node
+        digest: Digest algorithm of the hash
 
     Returns:
-        64-character hexadecimal SHA-256 hash
+        Hexadecimal hash (64 characters with the default SHA-256)
     """
     if isinstance(source_code, str):
-        return compute_semantic_hash(source_code)
+        return compute_semantic_hash(source_code, digest)
+
+    if isinstance(source_code, cst.FunctionDef):
+        return _hash_module(_function_module(source_code), digest)
 
     # Convert CST node to string first
     if hasattr(source_code, "code"):
@@ -402,4 +783,50 @@ def compute_hash_for_node(
         code_str = cst.Module(body=[]).code
         # This is a fallback; ideally we have the full function
 
-    return compute_semantic_hash(code_str)
+    return compute_semantic_hash(code_str, digest)
+
+
+def _streaming() -> bool:
+    """Whether to stream hashes, checking this LibCST on first use (see STREAMING)."""
+    global STREAMING
+    if STREAMING is None:
+        STREAMING = _streaming_supported()
+        if not STREAMING:
+            logger.debug("LibCST code generation internals changed; hashing rendered code")
+    return STREAMING
+
+
+def _streaming_supported() -> bool:
+    """Whether streamed hashes equal hashes of the rendered code with this LibCST."""
+    module = cst.parse_module(_STREAMING_SAMPLE).visit(SemanticNormalizer())
+    function = _function_module(module.body[0]).visit(SemanticNormalizer())
+    try:
+        hasher = hashlib.sha256()
+        state = HashingCodegenState(hasher, module.default_indent, module.default_newline)
+        module._codegen(state)
+        state.flush()
+        sections = _streamed_function_hashes(function, DEFAULT_DIGEST)
+    except Exception:
+        return False
+    return (
+        hasher.digest() == hashlib.sha256(module.code.encode("utf-8")).digest()
+        and sections == _rendered_function_hashes(function, DEFAULT_DIGEST)
+    )
+
+
+_STREAMING_SAMPLE = """\
+# header
+@decorator(1)
+async def sample(a, *args, b: int = 2, **kwargs) -> list:
+    \"\"\"Docstring.\"\"\"
+    if a:  # comment
+        return [b async for b in args]
+    with open(a) as f, open(b):
+        pass
+"""
+
+# Whether hashes are streamed through CodegenState; None until the first
+# hash checks the installed LibCST against the sample above. Should its
+# internals have changed, hashes fall back to rendering the code, which is
+# slower but gives the same hashes.
+STREAMING: Optional[bool] = None
@@ -0,0 +1,213 @@
+"""
+Function Similarity for Gen-D
+
+This module estimates how similar two functions are, to recognize a
+function that was moved to another file or renamed: its node ID changes,
+but its code stays mostly the same.
+
+Each function is reduced to a MinHash signature over shingles (runs of
+consecutive tokens) of its normalized token stream. The fraction of equal
+signature values estimates the Jaccard similarity of the shingle sets.
+Signatures are split into bands for locality-sensitive hashing: functions
+sharing any band land in a common bucket, so likely matches are found by
+bucket lookups instead of comparing every pair.
+The store persists the bucket keys of every signature in an indexed
+table (engine.storage), so candidates are found without loading all
+signatures; SimilarityIndex then compares only those candidates.
+
+Design Decisions:
+    - Tokens are normalized: comments, whitespace and the function's own
+      name are dropped and string literals collapse to one placeholder, so
+      renames and docstring edits keep functions similar
+    - 32 hash values of 32 bits: a 128-byte signature
+    - 8 bands of 4 values: pairs above ~0.7 similarity share a bucket with
+      probability 0.9 or more, pairs below 0.3 rarely do
+    - Signatures are exchanged as hex strings, like every other hash
+"""
+
+import hashlib
+import re
+import struct
+from typing import Optional
+
+# Identifier of the signature format; bump it whenever signatures change
+SIMILARITY_SCHEME = "minhash-v1"
+
+# Hash values in a signature; a multiple of SIMILARITY_BANDS
+SIGNATURE_SIZE = 32
+
+# LSH bands; each band holds SIGNATURE_SIZE // SIMILARITY_BANDS values
+SIMILARITY_BANDS = 8
+
+# Tokens per shingle
+_SHINGLE_SIZE = 5
+
+_SIGNATURE_FORMAT = struct.Struct(f">{SIGNATURE_SIZE}I")
+
+# String literals (optionally prefixed and triple-quoted), comments, then
+# names, numbers and single punctuation characters
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<string>[rRbBuUfF]{0,2}
+        (?:\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'))
+    |(?P<comment>\#[^\n]*)
+    |(?P<token>\w+|[^\w\s])
+    """,
+    re.VERBOSE,
+)
+
+
+def normalized_tokens(source: str) -> list[str]:
+    """
+    Tokenize function source for similarity comparison.
+
+    A regular expression is used rather than the tokenize module, which is
+    several times slower; token boundaries only need to be consistent.
+
+    Args:
+        source: Source code of one function
+
+    Returns:
+        Token strings without comments or layout, with the defined
+        function's name replaced by "<name>" and every string literal by
+        "<str>"
+    """
+    tokens: list[str] = []
+    named = False
+    for match in _TOKEN_PATTERN.finditer(source):
+        kind = match.lastgroup
+        if kind == "string":
+            tokens.append("<str>")
+        elif kind == "token":
+            if not named and tokens and tokens[-1] == "def":
+                tokens.append("<name>")
+                named = True
+            else:
+                tokens.append(match.group())
+    return tokens
+
+
+def compute_minhash(source: str) -> Optional[str]:
+    """
+    Compute the MinHash signature of a function.
+
+    Every shingle is hashed once with SHAKE-128 into SIGNATURE_SIZE
+    independent 32-bit values; the signature holds the minimum of each.
+
+    Args:
+        source: Source code of one function
+
+    Returns:
+        Signature as a hex string of SIGNATURE_SIZE 32-bit values, or None
+        if the source has no tokens
+    """
+    tokens = normalized_tokens(source)
+    if not tokens:
+        return None
+
+    size = min(_SHINGLE_SIZE, len(tokens))
+    shingles = {"\0".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+    rows = [
+        _SIGNATURE_FORMAT.unpack(
+            hashlib.shake_128(shingle.encode("utf-8")).digest(_SIGNATURE_FORMAT.size)
+        )
+        for shingle in shingles
+    ]
+    return _SIGNATURE_FORMAT.pack(*map(min, zip(*rows))).hex()
+
+
+def estimate_similarity(first: str, second: str) -> float:
+    """
+    Estimate the Jaccard similarity of two functions from their signatures.
+
+    Returns:
+        Fraction of equal signature values, from 0.0 to 1.0
+    """
+    a = _SIGNATURE_FORMAT.unpack(bytes.fromhex(first))
+    b = _SIGNATURE_FORMAT.unpack(bytes.fromhex(second))
+    return sum(x == y for x, y in zip(a, b)) / SIGNATURE_SIZE
+
+
+def minhash_buckets(minhash: str) -> list[int]:
+    """
+    LSH bucket keys of a signature, one per band.
+
+    Keys are signed 64-bit integers, stored as SQLite INTEGERs in the
+    similarity_buckets table, covering the band number and its values, so
+    equal keys mean an equal band.
+    """
+    data = bytes.fromhex(minhash)
+    width = len(data) // SIMILARITY_BANDS
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                bytes([band]) + data[band * width : (band + 1) * width], digest_size=8
+            ).digest(),
+            "big",
+            signed=True,
+        )
+        for band in range(SIMILARITY_BANDS)
+    ]
+
+
+class SimilarityIndex:
+    """
+    In-memory LSH index of function signatures.
+
+    Usage:
+        index = SimilarityIndex()
+        index.add("old.py:f", compute_minhash(old_source))
+        index.query(compute_minhash(new_source))  # [("old.py:f", 0.94)]
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._signatures: dict[str, str] = {}
+        self._buckets: dict[int, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    def add(self, key: str, minhash: str) -> None:
+        """
+        Index a signature.
+
+        Args:
+            key: Identifier of the function, typically its node ID
+            minhash: Signature from compute_minhash
+        """
+        if key in self._signatures:
+            return
+        self._signatures[key] = minhash
+        for bucket in minhash_buckets(minhash):
+            self._buckets.setdefault(bucket, []).append(key)
+
+    def query(self, minhash: str, threshold: float = 0.0) -> list[tuple[str, float]]:
+        """
+        Find indexed functions similar to a signature.
+
+        Only functions sharing an LSH bucket with the signature are
+        compared, so the cost depends on the number of likely matches, not
+        on the size of the index.
+
+        Args:
+            minhash: Signature to look up
+            threshold: Minimum estimated similarity of returned matches
+
+        Returns:
+            (key, similarity) pairs, most similar first
+        """
+        candidates: set[str] = set()
+        for bucket in minhash_buckets(minhash):
+            candidates.update(self._buckets.get(bucket, ()))
+
+        matches = [
+            (key, estimate_similarity(minhash, self._signatures[key])) for key in candidates
+        ]
+        return sorted(
+            (match for match in matches if match[1] >= threshold),
+            key=lambda match: (-match[1], match[0]),
+        )
@@ -5,18 +5,33 @@ This module defines the canonical data structures used throughout the system:
 - CodeNode: Represents a function or method with its semantic properties
 - CallEdge: Represents a call relationship between functions
 - DriftStatus: Classification of documentation freshness
+- FileScanResult / ScanResult: Per-file and aggregate scan output
+- Hash scheme identifiers stored with every semantic hash
 
 These models are designed to be:
 - Immutable where possible (using frozen dataclasses)
 - Serializable for storage
 - Clear in their semantic meaning
+- Free of dependencies, so importing them loads no parser
 """
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from engine.graph import CodeGraph
+
+
+# Identifiers stored alongside semantic hashes (see engine.hash.schemes).
+# Bump a scheme's version whenever its normalization changes.
+CST_HASH_SCHEME = "cst-v1"  # engine.hash.semantic_hash
+AST_HASH_SCHEME = "ast-v1"  # engine.hash.ast_hash
+
+# Scheme assumed for hashes stored without an identifier
+DEFAULT_HASH_SCHEME = CST_HASH_SCHEME
+
 
 class DriftStatus(Enum):
     """
@@ -31,11 +46,16 @@ class DriftStatus(Enum):
 
         UNDOCUMENTED: No docstring exists for this function.
                Cannot assess freshness without documentation.
+
+        INCOMPARABLE: The stored hash was computed with another hash scheme
+               or digest, so freshness cannot be assessed until the function
+               is rehashed with the stored scheme's parser.
     """
 
     FRESH = "fresh"
     STALE = "stale"
     UNDOCUMENTED = "undocumented"
+    INCOMPARABLE = "incomparable"
 
 
 @dataclass(frozen=True)
@@ -60,6 +80,14 @@ class CodeNode:
         is_method: True if this is a method within a class
         class_name: Name of containing class if is_method is True
         docstring: The actual docstring content, if present
+        hash_scheme: Identifier of the scheme semantic_hash was computed with
+        raw_hash: SHA-256 hash of the function's exact source text, if known
+        minhash: Similarity signature of the source, if known; lets a moved
+            or renamed function be matched to its old ID (engine.hash.similarity)
+        signature_hash: Hash of the signature section, if known
+            (see engine.hash.sections)
+        body_hash: Hash of the body section, if known
+        decorator_hash: Hash of the decorators section, if known
 
     Invariants:
         - id is unique across the entire graph
@@ -79,6 +107,12 @@ class CodeNode:
     is_method: bool = False
     class_name: Optional[str] = None
     docstring: Optional[str] = None
+    hash_scheme: str = DEFAULT_HASH_SCHEME
+    raw_hash: Optional[str] = None
+    minhash: Optional[str] = None
+    signature_hash: Optional[str] = None
+    body_hash: Optional[str] = None
+    decorator_hash: Optional[str] = None
 
     def __post_init__(self) -> None:
         """Validate invariants after initialization."""
@@ -113,6 +147,12 @@ class CodeNode:
             is_method=self.is_method,
             class_name=self.class_name,
             docstring=self.docstring,
+            hash_scheme=self.hash_scheme,
+            raw_hash=self.raw_hash,
+            minhash=self.minhash,
+            signature_hash=self.signature_hash,
+            body_hash=self.body_hash,
+            decorator_hash=self.decorator_hash,
         )
 
 
@@ -164,6 +204,11 @@ class NodeSnapshot:
         semantic_hash: Semantic hash at time of snapshot
         doc_hash: Documentation hash at time of snapshot
         timestamp: When this snapshot was taken
+        hash_scheme: Identifier of the scheme semantic_hash was computed with
+        raw_hash: Source text hash at time of snapshot, if known
+        signature_hash: Signature section hash at time of snapshot, if known
+        body_hash: Body section hash at time of snapshot, if known
+        decorator_hash: Decorators section hash at time of snapshot, if known
     """
 
     node_id: str
@@ -173,6 +218,11 @@ class NodeSnapshot:
     semantic_hash: str
     doc_hash: Optional[str]
     timestamp: datetime = field(default_factory=datetime.utcnow)
+    hash_scheme: str = DEFAULT_HASH_SCHEME
+    raw_hash: Optional[str] = None
+    signature_hash: Optional[str] = None
+    body_hash: Optional[str] = None
+    decorator_hash: Optional[str] = None
 
     @classmethod
     def from_node(cls, node: CodeNode) -> "NodeSnapshot":
@@ -184,9 +234,43 @@ class NodeSnapshot:
             end_line=node.end_line,
             semantic_hash=node.semantic_hash,
             doc_hash=node.doc_hash,
+            hash_scheme=node.hash_scheme,
+            raw_hash=node.raw_hash,
+            signature_hash=node.signature_hash,
+            body_hash=node.body_hash,
+            decorator_hash=node.decorator_hash,
         )
 
 
+@dataclass
+class FileScanResult:
+    """
+    Result of scanning a single file.
+
+    Yielded by streaming scans as soon as the file has been processed.
+
+    Attributes:
+        file_path: Path to the scanned file
+        nodes: CodeNodes defined in the file
+        edges: CallEdges originating in the file
+        error: Parse or read error message, None on success
+        cached: True if the result was served from the parse cache
+        parse_seconds: Time spent parsing and hashing the file (0 if cached)
+    """
+
+    file_path: str
+    nodes: list[CodeNode] = field(default_factory=list)
+    edges: list[CallEdge] = field(default_factory=list)
+    error: Optional[str] = None
+    cached: bool = False
+    parse_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether the file was scanned without errors."""
+        return self.error is None
+
+
 @dataclass
 class ScanResult:
     """
@@ -200,6 +284,8 @@ class ScanResult:
         files_scanned: Number of Python files processed
         errors: List of files that failed to parse with error messages
         scan_time_seconds: Total time taken for the scan
+        graph: CodeGraph built from the nodes and edges, or None if the
+               scan was run without building one
     """
 
     nodes: list[CodeNode] = field(default_factory=list)
@@ -207,6 +293,7 @@ class ScanResult:
     files_scanned: int = 0
     errors: list[tuple[str, str]] = field(default_factory=list)
     scan_time_seconds: float = 0.0
+    graph: Optional["CodeGraph"] = field(default=None, compare=False, repr=False)
 
     @property
     def node_count(self) -> int:
@@ -235,6 +322,11 @@ class DriftReport:
         undocumented_count: Number of nodes without documentation
         stale_nodes: List of node IDs that are stale (for detailed reporting)
         undocumented_nodes: List of node IDs without documentation
+        incomparable_count: Number of documented nodes whose stored hash
+            uses another scheme or digest (counted neither fresh nor stale)
+        incomparable_nodes: List of node IDs that could not be compared
+        moved_nodes: Node IDs without a snapshot of their own, mapped to the
+            vanished node ID whose snapshot they were compared against
     """
 
     fresh_count: int = 0
@@ -242,23 +334,29 @@ class DriftReport:
     undocumented_count: int = 0
     stale_nodes: list[str] = field(default_factory=list)
     undocumented_nodes: list[str] = field(default_factory=list)
+    incomparable_count: int = 0
+    incomparable_nodes: list[str] = field(default_factory=list)
+    moved_nodes: dict[str, str] = field(default_factory=dict)
 
     @property
     def total_nodes(self) -> int:
         """Total number of nodes analyzed."""
-        return self.fresh_count + self.stale_count + self.undocumented_count
+        return (
+            self.fresh_count + self.stale_count + self.undocumented_count
+            + self.incomparable_count
+        )
 
     @property
     def documented_percentage(self) -> float:
         """Percentage of nodes that have documentation."""
         if self.total_nodes == 0:
             return 0.0
-        documented = self.fresh_count + self.stale_count
+        documented = self.fresh_count + self.stale_count + self.incomparable_count
         return (documented / self.total_nodes) * 100
 
     @property
     def fresh_percentage(self) -> float:
-        """Percentage of documented nodes that are fresh."""
+        """Percentage of compared documented nodes that are fresh."""
         documented = self.fresh_count + self.stale_count
         if documented == 0:
             return 0.0
@@ -1,22 +1,32 @@
 """
 Parser module for Gen-D.
 
-This module provides LibCST-based extraction of functions, methods,
-and their call relationships from Python source files.
+This module provides extraction of functions, methods, and their call
+relationships from Python source files, with a LibCST backend and a
+faster stdlib ast backend (see engine.parser.backends).
 """
 
 from engine.parser.extractor import (
     extract_functions_from_file,
     extract_functions_from_source,
     extract_calls_from_source,
+    extract_functions_and_calls_from_source,
     FunctionCollector,
     CallCollector,
 )
+from engine.parser.ast_extractor import AstCollector, extract_functions_and_calls_with_ast
+from engine.parser.backends import BACKEND_CHOICES, backend_for_scheme, extract_with_backend
 
 __all__ = [
     "extract_functions_from_file",
     "extract_functions_from_source",
     "extract_calls_from_source",
+    "extract_functions_and_calls_from_source",
     "FunctionCollector",
     "CallCollector",
+    "AstCollector",
+    "extract_functions_and_calls_with_ast",
+    "extract_with_backend",
+    "BACKEND_CHOICES",
+    "backend_for_scheme",
 ]
@@ -0,0 +1,300 @@
+"""
+Stdlib ast-based Function and Call Extractor
+
+This module is the fast-path parser backend for Gen-D. It reports the
+same FunctionInfo and CallInfo records as the LibCST extractor, using
+the C-implemented `ast` parser and a single tree walk.
+
+Key Components:
+    - AstCollector: ast visitor that extracts functions and calls together
+    - extract_functions_and_calls_with_ast: Entry point for string-based extraction
+
+Design Decisions:
+    - Mirrors the LibCST collectors' naming rules exactly: qualified names
+      are module, then enclosing classes, then enclosing functions
+    - Docstrings are taken from the raw source text with the same quote
+      stripping as the LibCST extractor, not from the evaluated constant
+    - Decorator, default and annotation calls belong to the decorated
+      function, as they do in the LibCST tree
+    - Semantic hashes use the ast-v1 scheme, computed from the tree
+      already parsed, so they are not comparable with the LibCST
+      backend's cst-v1 hashes
+    - Like the LibCST extractor, functions whose raw hash is known reuse
+      their stored (ast-v1) hashes and similarity signature
+
+Academic Context:
+    Input: Python source string
+    Transformation: ast traversal with visitor pattern
+    Output: FunctionInfo and CallInfo lists
+    Limitation: No lossless tree, so code cannot be rewritten
+"""
+
+import ast
+import io
+import tokenize
+from typing import Optional, Union
+
+from engine.hash import (
+    AST_HASH_SCHEME,
+    DEFAULT_DIGEST,
+    Digest,
+    FunctionHashes,
+    compute_ast_function_hashes,
+    compute_minhash,
+    compute_raw_hash,
+    qualified_scheme,
+)
+from engine.parser.extractor import CallInfo, FunctionInfo
+
+_FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+
+class AstCollector(ast.NodeVisitor):
+    """
+    ast visitor that collects function definitions and call sites.
+
+    Usage:
+        collector = AstCollector(source, module_name="pkg.mod")
+        collector.visit(ast.parse(source))
+        functions, calls = collector.functions, collector.calls
+    """
+
+    def __init__(
+        self,
+        source: str,
+        module_name: str = "",
+        known_hashes: Optional[dict[str, FunctionHashes]] = None,
+        digest: Digest = DEFAULT_DIGEST,
+    ) -> None:
+        """
+        Initialize the collector.
+
+        Args:
+            source: Source code the visited tree was parsed from
+            module_name: Base module name for qualified names
+            known_hashes: Hashes (ast-v1, same digest) of previously seen
+                functions keyed by raw hash; functions whose raw hash is
+                found reuse them instead of being hashed
+            digest: Digest algorithm of the raw and semantic hashes
+        """
+        self.module_name = module_name
+        self.known_hashes = known_hashes or {}
+        self.digest = digest
+        self.hash_scheme = qualified_scheme(AST_HASH_SCHEME, digest)
+        self.functions: list[FunctionInfo] = []
+        self.calls: list[CallInfo] = []
+        self._lines = source.splitlines(keepends=True)
+        self._class_stack: list[str] = []
+        self._function_stack: list[str] = []
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        """Visit a class; its decorators and bases are inside its context too."""
+        self._class_stack.append(node.name)
+        for child in [*node.decorator_list, *node.bases, *node.keywords, *node.body]:
+            self.visit(child)
+        self._class_stack.pop()
+
+    def visit_FunctionDef(self, node: _FunctionNode) -> None:
+        """Visit a function definition and extract its information."""
+        self.functions.append(self._function_info(node))
+
+        # Everything under the def, decorators included, is inside the function
+        self._function_stack.append(node.name)
+        for child in node.decorator_list:
+            self.visit(child)
+        self.visit(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        for child in node.body:
+            self.visit(child)
+        self._function_stack.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef  # noqa: N815
+
+    def visit_Call(self, node: ast.Call) -> None:
+        """Record a call made inside a function, then visit its children."""
+        if self._function_stack:
+            callee_name = _callee_name(node.func)
+            if callee_name is not None:
+                self.calls.append(
+                    CallInfo(
+                        caller_qualified_name=self._qualify(),
+                        callee_name=callee_name,
+                        call_line=node.lineno,
+                    )
+                )
+        self.generic_visit(node)
+
+    def _qualify(self, *names: str) -> str:
+        """Qualified name of the current scope, extended by names."""
+        parts = [self.module_name] if self.module_name else []
+        parts.extend(self._class_stack)
+        parts.extend(self._function_stack)
+        parts.extend(names)
+        return ".".join(parts)
+
+    def _function_info(self, node: _FunctionNode) -> FunctionInfo:
+        """Build the FunctionInfo for a definition in the current scope."""
+        is_method = len(self._class_stack) > 0
+        start_line = node.lineno
+        end_line = node.end_lineno or node.lineno
+
+        source_code = "".join(self._lines[start_line - 1 : end_line])
+        raw_hash = compute_raw_hash(source_code, self.digest)
+        hashes = self.known_hashes.get(raw_hash)
+        if hashes is None:
+            hashes = compute_ast_function_hashes(node, self.digest)
+        return FunctionInfo(
+            name=node.name,
+            qualified_name=self._qualify(node.name),
+            start_line=start_line,
+            end_line=end_line,
+            is_method=is_method,
+            class_name=self._class_stack[-1] if is_method else None,
+            docstring=self._docstring(node),
+            source_code=source_code,
+            semantic_hash=hashes.semantic,
+            hash_scheme=self.hash_scheme,
+            raw_hash=raw_hash,
+            minhash=hashes.minhash or compute_minhash(source_code) or "",
+            signature_hash=hashes.signature,
+            body_hash=hashes.body,
+            decorator_hash=hashes.decorators,
+        )
+
+    def _docstring(self, node: _FunctionNode) -> Optional[str]:
+        """
+        Extract a docstring as the LibCST extractor does.
+
+        Only a string expression opening an indented body counts, and its
+        text is the raw literal with the outer quotes removed.
+        """
+        first = node.body[0]
+        if not isinstance(first, ast.Expr):
+            return None
+        if not isinstance(first.value, (ast.Constant, ast.JoinedStr)):
+            return None
+        if isinstance(first.value, ast.Constant) and not isinstance(
+            first.value.value, (str, bytes)
+        ):
+            return None
+
+        # A body on the def line itself is not an indented block
+        line = self._line_bytes(first.lineno)
+        if line[: first.col_offset].strip():
+            return None
+
+        literals = _string_tokens(self._segment(first.value))
+        if len(literals) == 1 and _is_fstring(literals[0]):
+            return None
+        return "".join("" if _is_fstring(lit) else _strip_quotes(lit) for lit in literals)
+
+    def _line_bytes(self, lineno: int) -> bytes:
+        """A source line as UTF-8, matching ast's byte-based column offsets."""
+        return self._lines[lineno - 1].encode("utf-8")
+
+    def _segment(self, node: ast.expr) -> str:
+        """Source text of an expression."""
+        if node.lineno == node.end_lineno:
+            line = self._line_bytes(node.lineno)
+            return line[node.col_offset : node.end_col_offset].decode("utf-8")
+
+        first = self._line_bytes(node.lineno)[node.col_offset :]
+        middle = [line.encode("utf-8") for line in self._lines[node.lineno : node.end_lineno - 1]]
+        last = self._line_bytes(node.end_lineno)[: node.end_col_offset]
+        return b"".join([first, *middle, last]).decode("utf-8")
+
+
+def extract_functions_and_calls_with_ast(
+    source: str,
+    module_name: str = "",
+    known_hashes: Optional[dict[str, FunctionHashes]] = None,
+    digest: Digest = DEFAULT_DIGEST,
+) -> tuple[list[FunctionInfo], list[CallInfo]]:
+    """
+    Extract function definitions and call sites using the stdlib parser.
+
+    Args:
+        source: Python source code as a string
+        module_name: Optional module name for qualified names
+        known_hashes: Known ast-v1 hashes keyed by raw hash, see AstCollector
+        digest: Digest algorithm of the hashes
+
+    Returns:
+        Tuple of (functions, calls); functions are in source order
+
+    Raises:
+        SyntaxError: If the source code has syntax errors
+
+    Example:
+        >>> functions, calls = extract_functions_and_calls_with_ast(source)
+    """
+    collector = AstCollector(
+        source, module_name=module_name, known_hashes=known_hashes, digest=digest
+    )
+    collector.visit(ast.parse(source))
+
+    return collector.functions, collector.calls
+
+
+def _callee_name(node: ast.expr) -> Optional[str]:
+    """Name of a called expression, following CallCollector's rules."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        parts = []
+        current: ast.expr = node
+        while isinstance(current, ast.Attribute):
+            parts.append(current.attr)
+            current = current.value
+        if isinstance(current, ast.Name):
+            parts.append(current.id)
+        parts.reverse()
+        return ".".join(parts)
+    return None
+
+
+def _string_tokens(segment: str) -> list[str]:
+    """
+    The string literal tokens making up a (possibly concatenated) string.
+
+    Since Python 3.12 an f-string is tokenized as FSTRING_START, its parts
+    and FSTRING_END, with any strings in its replacement fields as tokens
+    of their own; it is returned as its FSTRING_START token (prefix and
+    opening quote), which is all _is_fstring looks at.
+    """
+    # Parentheses let implicitly concatenated parts span several lines
+    tokens = tokenize.generate_tokens(io.StringIO(f"({segment})").readline)
+    literals = []
+    depth = 0
+    for token in tokens:
+        if token.type == _FSTRING_START:
+            if not depth:
+                literals.append(token.string)
+            depth += 1
+        elif token.type == _FSTRING_END:
+            depth -= 1
+        elif token.type == tokenize.STRING and not depth:
+            literals.append(token.string)
+    return literals
+
+
+# f-string token types of Python 3.12+; no token has type -1
+_FSTRING_START = getattr(tokenize, "FSTRING_START", -1)
+_FSTRING_END = getattr(tokenize, "FSTRING_END", -1)
+
+
+def _is_fstring(literal: str) -> bool:
+    """Whether a string literal token is an f-string."""
+    prefix = literal[: len(literal) - len(literal.lstrip("rRbBuUfF"))]
+    return "f" in prefix.lower()
+
+
+def _strip_quotes(literal: str) -> str:
+    """Remove the outer quotes of an unprefixed literal, as LibCST's extractor does."""
+    if literal.startswith(('"""', "'''")):
+        return literal[3:-3]
+    if literal.startswith(('"', "'")):
+        return literal[1:-1]
+    return literal
+
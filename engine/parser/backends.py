@@ -0,0 +1,112 @@
+"""
+Parser Backend Selection for Gen-D
+
+Gen-D can extract functions and calls with either of two parsers:
+
+    - libcst: The lossless LibCST tree. Reference backend; its semantic
+      hashes are the ones stored by earlier versions.
+    - ast: The stdlib parser, several times faster. Reports the same
+      functions and calls, but hashes on a different basis.
+
+"auto" uses LibCST and falls back to ast for files LibCST cannot parse
+(for example syntax newer than the installed LibCST grammar), which
+would otherwise be reported as parse errors.
+"""
+
+from typing import Callable, Optional
+
+import libcst as cst
+
+from engine.hash import AST_HASH_SCHEME, CST_HASH_SCHEME, DEFAULT_DIGEST, Digest, FunctionHashes
+from engine.parser.ast_extractor import extract_functions_and_calls_with_ast
+from engine.parser.extractor import (
+    CallInfo,
+    FunctionInfo,
+    extract_functions_and_calls_from_source,
+)
+
+_Extractor = Callable[..., tuple[list[FunctionInfo], list[CallInfo]]]
+
+PARSER_BACKENDS: dict[str, _Extractor] = {
+    "libcst": extract_functions_and_calls_from_source,
+    "ast": extract_functions_and_calls_with_ast,
+}
+
+# Hash scheme of the semantic hashes each backend computes
+BACKEND_SCHEMES = {
+    "libcst": CST_HASH_SCHEME,
+    "ast": AST_HASH_SCHEME,
+}
+
+# Accepted backend names, including the automatic choice
+BACKEND_CHOICES = ("auto", *PARSER_BACKENDS)
+
+DEFAULT_BACKEND = "auto"
+
+
+def backend_for_scheme(scheme: str) -> Optional[str]:
+    """
+    Find the parser backend that computes hashes of a scheme.
+
+    Args:
+        scheme: A stored scheme identifier, possibly qualified with a
+                digest (e.g. "ast-v1+blake2b-16")
+
+    Returns:
+        A key of PARSER_BACKENDS, or None if no backend uses the scheme
+    """
+    base = scheme.split("+", 1)[0]
+    for backend, backend_scheme in BACKEND_SCHEMES.items():
+        if backend_scheme == base:
+            return backend
+    return None
+
+
+def extract_with_backend(
+    source: str,
+    module_name: str = "",
+    backend: str = DEFAULT_BACKEND,
+    known_hashes: Optional[dict[str, FunctionHashes]] = None,
+    digest: Digest = DEFAULT_DIGEST,
+) -> tuple[list[FunctionInfo], list[CallInfo]]:
+    """
+    Extract function definitions and call sites with a chosen parser.
+
+    Args:
+        source: Python source code as a string
+        module_name: Optional module name for qualified names
+        backend: One of BACKEND_CHOICES
+        known_hashes: Known hashes of the backend's own scheme (cst-v1 for
+                      libcst and auto, ast-v1 for ast) keyed by raw hash;
+                      the ast fallback of auto does not reuse them
+        digest: Digest algorithm of the hashes
+
+    Returns:
+        Tuple of (functions, calls)
+
+    Raises:
+        ValueError: If the backend name is unknown
+        libcst.ParserSyntaxError: If the libcst backend (or both backends,
+            with "auto") cannot parse the source
+        SyntaxError: If the ast backend cannot parse the source
+    """
+    if backend == "auto":
+        try:
+            return extract_functions_and_calls_from_source(
+                source, module_name, known_hashes, digest
+            )
+        except cst.ParserSyntaxError:
+            try:
+                return extract_functions_and_calls_with_ast(source, module_name, digest=digest)
+            except SyntaxError:
+                pass
+            # Neither parser accepts the file: report LibCST's error
+            raise
+
+    try:
+        extractor = PARSER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown parser backend: {backend!r} (expected one of {', '.join(BACKEND_CHOICES)})"
+        ) from None
+    return extractor(source, module_name, known_hashes, digest)
@@ -6,15 +6,18 @@ extracting function definitions and call relationships from Python source code.
 
 Key Components:
     - FunctionCollector: CST visitor that extracts function/method definitions
+      and computes their semantic hashes during the same visit
     - CallCollector: CST visitor that extracts function call sites
     - extract_functions_from_file: Main entry point for file-based extraction
     - extract_functions_from_source: Entry point for string-based extraction
+    - extract_functions_and_calls_from_source: Single-parse extraction of both
 
 Design Decisions:
     - Uses LibCST (not ast) to preserve position information and enable future rewrites
     - Extracts both standalone functions and class methods
     - Handles nested functions by creating hierarchical IDs
     - Does not resolve dynamic calls (limitation of static analysis)
+    - Collectors are batchable so one parse and one traversal serve both
 
 Academic Context:
     Input: Python source file or string
@@ -29,6 +32,17 @@ from typing import Optional
 import libcst as cst
 from libcst.metadata import MetadataWrapper, PositionProvider
 
+from engine.hash import (
+    CST_HASH_SCHEME,
+    DEFAULT_DIGEST,
+    Digest,
+    FunctionHashes,
+    compute_function_hashes,
+    compute_minhash,
+    compute_raw_hash,
+    qualified_scheme,
+)
+
 
 @dataclass
 class FunctionInfo:
@@ -47,6 +61,15 @@ class FunctionInfo:
         class_name: Name of containing class if is_method
         docstring: Extracted docstring content, if present
         source_code: Original source code of the function body
+        semantic_hash: Semantic hash computed from the parsed node,
+            empty if hashing was disabled or failed
+        hash_scheme: Identifier of the scheme semantic_hash was computed with
+        raw_hash: Hash of source_code, see engine.hash.compute_raw_hash
+        signature_hash: Hash of the signature section, see engine.hash.sections
+        body_hash: Hash of the body section
+        decorator_hash: Hash of the decorators section
+        minhash: Similarity signature of source_code, see
+            engine.hash.compute_minhash; empty if hashing was disabled
     """
 
     name: str
@@ -57,6 +80,13 @@ class FunctionInfo:
     class_name: Optional[str] = None
     docstring: Optional[str] = None
     source_code: str = ""
+    semantic_hash: str = ""
+    hash_scheme: str = CST_HASH_SCHEME
+    raw_hash: str = ""
+    minhash: str = ""
+    signature_hash: str = ""
+    body_hash: str = ""
+    decorator_hash: str = ""
 
 
 @dataclass
@@ -75,7 +105,7 @@ class CallInfo:
     call_line: int
 
 
-class FunctionCollector(cst.CSTVisitor):
+class FunctionCollector(cst.CSTVisitor, cst.BatchableCSTVisitor):
     """
     CST Visitor that collects function and method definitions.
 
@@ -93,18 +123,36 @@ class FunctionCollector(cst.CSTVisitor):
         collector = FunctionCollector()
         wrapper.visit(collector)
         functions = collector.functions
+
+    The collector is also batchable, so it can share a single traversal
+    with a CallCollector via ``wrapper.visit_batched``.
     """
 
     METADATA_DEPENDENCIES = (PositionProvider,)
 
-    def __init__(self, module_name: str = "") -> None:
+    def __init__(
+        self,
+        module_name: str = "",
+        compute_hashes: bool = True,
+        known_hashes: Optional[dict[str, FunctionHashes]] = None,
+        digest: Digest = DEFAULT_DIGEST,
+    ) -> None:
         """
         Initialize the collector.
 
         Args:
             module_name: Base module name for qualified names
+            compute_hashes: Compute semantic hashes from the visited nodes
+            known_hashes: Semantic and section hashes (cst-v1, same digest)
+                of previously seen functions keyed by raw hash; functions
+                whose raw hash is found reuse them instead of being normalized
+            digest: Digest algorithm of the raw and semantic hashes
         """
         self.module_name = module_name
+        self.compute_hashes = compute_hashes
+        self.known_hashes = known_hashes or {}
+        self.digest = digest
+        self.hash_scheme = qualified_scheme(CST_HASH_SCHEME, digest)
         self.functions: list[FunctionInfo] = []
         self._class_stack: list[str] = []
         self._function_stack: list[str] = []
@@ -126,7 +174,8 @@ class FunctionCollector(cst.CSTVisitor):
             - Function name and qualified name
             - Line range from position metadata
             - Docstring if present
-            - Source code for semantic hashing
+            - Source code of the function
+            - Semantic hash, computed directly from the node
         """
         func_name = node.name.value
 
@@ -159,6 +208,24 @@ class FunctionCollector(cst.CSTVisitor):
         except Exception:
             source_code = ""
 
+        # Unchanged source text has an unchanged semantic hash, so only
+        # normalize functions not seen before. Hash the node we already
+        # hold instead of re-parsing source_code.
+        raw_hash = compute_raw_hash(source_code, self.digest) if source_code else ""
+        hashes: Optional[FunctionHashes] = None
+        minhash = ""
+        if self.compute_hashes:
+            hashes = self.known_hashes.get(raw_hash) if raw_hash else None
+            if hashes is None:
+                try:
+                    hashes = compute_function_hashes(node, self.digest)
+                except Exception:
+                    pass  # Hash computation failed, leave empty
+            if hashes is not None and hashes.minhash:
+                minhash = hashes.minhash
+            elif source_code:
+                minhash = compute_minhash(source_code) or ""
+
         # Determine if this is a method
         is_method = len(self._class_stack) > 0
         class_name = self._class_stack[-1] if is_method else None
@@ -172,6 +239,13 @@ class FunctionCollector(cst.CSTVisitor):
             class_name=class_name,
             docstring=docstring,
             source_code=source_code,
+            semantic_hash=hashes.semantic if hashes else "",
+            hash_scheme=self.hash_scheme,
+            raw_hash=raw_hash,
+            minhash=minhash,
+            signature_hash=hashes.signature if hashes else "",
+            body_hash=hashes.body if hashes else "",
+            decorator_hash=hashes.decorators if hashes else "",
         )
         self.functions.append(func_info)
 
@@ -234,7 +308,7 @@ class FunctionCollector(cst.CSTVisitor):
         return ""
 
 
-class CallCollector(cst.CSTVisitor):
+class CallCollector(cst.CSTVisitor, cst.BatchableCSTVisitor):
     """
     CST Visitor that collects function call sites.
 
@@ -256,6 +330,9 @@ class CallCollector(cst.CSTVisitor):
         collector = CallCollector()
         wrapper.visit(collector)
         calls = collector.calls
+
+    The collector is also batchable, so it can share a single traversal
+    with a FunctionCollector via ``wrapper.visit_batched``.
     """
 
     METADATA_DEPENDENCIES = (PositionProvider,)
@@ -393,14 +470,8 @@ def extract_functions_from_source(
         >>> functions[0].docstring
         'Greet someone.'
     """
-    try:
-        module = cst.parse_module(source)
-    except cst.ParserSyntaxError:
-        raise
-
-    wrapper = MetadataWrapper(module)
     collector = FunctionCollector(module_name=module_name)
-    wrapper.visit(collector)
+    _visit_source(source, [collector])
 
     return collector.functions
 
@@ -470,13 +541,68 @@ def extract_calls_from_source(
         >>> [c.callee_name for c in calls]
         ['fetch_data', 'transform']
     """
-    try:
-        module = cst.parse_module(source)
-    except cst.ParserSyntaxError:
-        raise
-
-    wrapper = MetadataWrapper(module)
     collector = CallCollector(module_name=module_name)
-    wrapper.visit(collector)
+    _visit_source(source, [collector])
 
     return collector.calls
+
+
+def extract_functions_and_calls_from_source(
+    source: str,
+    module_name: str = "",
+    known_hashes: Optional[dict[str, FunctionHashes]] = None,
+    digest: Digest = DEFAULT_DIGEST,
+) -> tuple[list[FunctionInfo], list[CallInfo]]:
+    """
+    Extract function definitions and call sites from one parse of the source.
+
+    The source is parsed and position-resolved once, and a FunctionCollector
+    and a CallCollector share a single batched traversal of the tree. This is
+    the preferred entry point when both results are needed, as it halves the
+    parsing cost compared to calling the two extractors separately.
+
+    Args:
+        source: Python source code as a string
+        module_name: Optional module name for qualified names
+        known_hashes: Known cst-v1 semantic and section hashes keyed by
+                      raw hash, reused for functions whose source is unchanged
+        digest: Digest algorithm of the hashes
+
+    Returns:
+        Tuple of (functions, calls) in source order
+
+    Raises:
+        libcst.ParserSyntaxError: If the source code has syntax errors
+
+    Example:
+        >>> functions, calls = extract_functions_and_calls_from_source(source)
+    """
+    function_collector = FunctionCollector(
+        module_name=module_name, known_hashes=known_hashes, digest=digest
+    )
+    call_collector = CallCollector(module_name=module_name)
+    _visit_source(source, [function_collector, call_collector])
+
+    return function_collector.functions, call_collector.calls
+
+
+def _visit_source(
+    source: str,
+    collectors: list[cst.BatchableCSTVisitor],
+) -> None:
+    """
+    Parse source once and run all collectors in a single traversal.
+
+    The freshly parsed module is never reused, so the MetadataWrapper is
+    allowed to skip its defensive deep copy of the tree.
+
+    Args:
+        source: Python source code as a string
+        collectors: Batchable visitors to run over the parsed module
+
+    Raises:
+        libcst.ParserSyntaxError: If the source code has syntax errors
+    """
+    module = cst.parse_module(source)
+    wrapper = MetadataWrapper(module, unsafe_skip_copy=True)
+    wrapper.visit_batched(collectors)
@@ -7,6 +7,9 @@ node snapshots, enabling drift detection across scans.
 
 from engine.storage.database import (
     Database,
+    DuplicateCluster,
+    DuplicateMember,
+    ManifestEntry,
     init_database,
     save_snapshot,
     load_snapshots,
@@ -15,6 +18,9 @@ from engine.storage.database import (
 
 __all__ = [
     "Database",
+    "DuplicateCluster",
+    "DuplicateMember",
+    "ManifestEntry",
     "init_database",
     "save_snapshot",
     "load_snapshots",
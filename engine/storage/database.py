@@ -11,9 +11,24 @@ Design Decisions:
     - Simple schema optimized for read-heavy workloads
 
 Schema:
-    nodes: Stores snapshot of each function's hashes and location
+    nodes: Stores snapshot of each function's hashes, hash scheme and location;
+        the raw (source text) hash lets rescans reuse unchanged semantic hashes,
+        and signature, body and decorator hashes locate a change
     edges: Stores call relationships (for future graph persistence)
-    scans: Metadata about each scan operation
+    scans: Metadata about each scan operation, including its hash digest
+    file_cache: Extracted functions and calls per file, keyed by content digest
+    file_manifest: Stat tuple and content digest of each scanned file
+    hierarchy: Rollup hashes of the classes, files, directories and root
+        of the last scan, valid only while nodes is unchanged since then
+    similarity: MinHash signature of each node, kept after the node's ID
+        disappears so a moved or renamed function can be matched to it
+    similarity_buckets: LSH bucket keys of each signature, indexed so the
+        candidates for a match are found without loading every signature
+
+Hashes are stored as BLOBs of the raw digest bytes, half the size of
+their hex text; the API exchanges them as hex strings. Values that are
+not lowercase hex are stored as text, unchanged. Schema changes are
+applied by _migrate_schema, which tracks progress in PRAGMA user_version.
 
 Academic Context:
     Input: CodeNodes and scan metadata
@@ -22,20 +37,47 @@ Academic Context:
     Limitation: No transactional guarantees for partial scans
 """
 
+import json
 import sqlite3
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import datetime
+from itertools import groupby
 from pathlib import Path
-from typing import Iterator, Optional
+from typing import Iterable, Iterator, Optional
 import uuid
 
-from engine.models import CodeNode, NodeSnapshot, CallEdge
+from engine.hash.digest import DEFAULT_DIGEST, Digest
+from engine.hash.rollup import RollupBuilder, RollupEntry
+from engine.hash.sections import FunctionHashes
+from engine.hash.similarity import SimilarityIndex, minhash_buckets
+from engine.models import CodeNode, NodeSnapshot, CallEdge, FileScanResult
+from engine.parser.extractor import CallInfo, FunctionInfo
 
 
 # Default database location
 DEFAULT_DB_PATH = ".gen-d/gen-d.db"
 
+# Stay well below SQLite's limit on bound parameters per statement
+_MAX_QUERY_PARAMS = 500
+
+# Columns of the nodes table read into a NodeSnapshot
+_SNAPSHOT_COLUMNS = (
+    "node_id, file_path, start_line, end_line, semantic_hash, doc_hash, "
+    "last_scanned, hash_scheme, raw_hash, signature_hash, body_hash, decorator_hash"
+)
+
+# Rows buffered by save_scan before they are written and committed
+_WRITE_BATCH_ROWS = 10_000
+
+# Version of the schema written by this module, kept in PRAGMA user_version
+#   1: nodes.hash_scheme and nodes.raw_hash
+#   2: hashes stored as BLOBs, scans.digest
+#   3: index on nodes(scan_id, hash_scheme, semantic_hash)
+#   4: nodes.signature_hash, nodes.body_hash and nodes.decorator_hash
+#   5: similarity_buckets
+_SCHEMA_VERSION = 5
+
 
 @dataclass
 class ScanRecord:
@@ -49,6 +91,7 @@ class ScanRecord:
         files_scanned: Number of files processed
         nodes_found: Number of functions discovered
         errors: Number of files that failed to parse
+        digest: Name of the digest the scan's hashes were computed with
     """
 
     scan_id: str
@@ -57,6 +100,73 @@ class ScanRecord:
     files_scanned: int
     nodes_found: int
     errors: int
+    digest: str = DEFAULT_DIGEST.name
+
+
+@dataclass(frozen=True)
+class DuplicateMember:
+    """
+    A function in a cluster of semantically identical functions.
+
+    Attributes:
+        node_id: The function's unique identifier
+        file_path: Path to the source file
+        start_line: First line of the function
+        end_line: Last line of the function
+        documented: Whether the function had a docstring when scanned
+    """
+
+    node_id: str
+    file_path: str
+    start_line: int
+    end_line: int
+    documented: bool
+
+
+@dataclass(frozen=True)
+class DuplicateCluster:
+    """
+    Functions of the last scan sharing one semantic hash.
+
+    Attributes:
+        semantic_hash: The hash the members share
+        hash_scheme: Scheme the hash was computed with
+        members: The functions, ordered by node ID
+    """
+
+    semantic_hash: str
+    hash_scheme: str
+    members: tuple[DuplicateMember, ...]
+
+    @property
+    def documented_count(self) -> int:
+        """Number of members with a docstring."""
+        return sum(member.documented for member in self.members)
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """
+    Stat record of a scanned file, used to skip unchanged files.
+
+    Attributes:
+        file_path: Path of the scanned file
+        size: File size in bytes
+        mtime_ns: Modification time in nanoseconds
+        inode: Inode number of the file
+        content_digest: SHA-256 hex digest of the file content
+    """
+
+    file_path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    content_digest: str
+
+    @property
+    def fingerprint(self) -> tuple[int, int, int]:
+        """The (size, mtime_ns, inode) tuple compared against a fresh stat."""
+        return self.size, self.mtime_ns, self.inode
 
 
 class Database:
@@ -109,10 +219,15 @@ class Database:
                     file_path TEXT NOT NULL,
                     start_line INTEGER NOT NULL,
                     end_line INTEGER NOT NULL,
-                    semantic_hash TEXT NOT NULL,
-                    doc_hash TEXT,
+                    semantic_hash BLOB NOT NULL,
+                    doc_hash BLOB,
                     last_scanned TIMESTAMP NOT NULL,
-                    scan_id TEXT
+                    scan_id TEXT,
+                    hash_scheme TEXT NOT NULL DEFAULT 'cst-v1',
+                    raw_hash BLOB,
+                    signature_hash BLOB,
+                    body_hash BLOB,
+                    decorator_hash BLOB
                 );
 
                 CREATE TABLE IF NOT EXISTS edges (
@@ -128,9 +243,45 @@ class Database:
                     directory TEXT NOT NULL,
                     files_scanned INTEGER NOT NULL,
                     nodes_found INTEGER NOT NULL,
-                    errors INTEGER NOT NULL
+                    errors INTEGER NOT NULL,
+                    digest TEXT NOT NULL DEFAULT 'sha256'
+                );
+
+                CREATE TABLE IF NOT EXISTS file_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS file_manifest (
+                    file_path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    content_digest TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS hierarchy (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT,
+                    kind TEXT NOT NULL,
+                    rollup_hash BLOB NOT NULL,
+                    file_path TEXT
                 );
 
+                CREATE TABLE IF NOT EXISTS similarity (
+                    node_id TEXT PRIMARY KEY,
+                    minhash BLOB NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS similarity_buckets (
+                    bucket INTEGER NOT NULL,
+                    node_id TEXT NOT NULL,
+                    PRIMARY KEY (bucket, node_id)
+                ) WITHOUT ROWID;
+
+                CREATE INDEX IF NOT EXISTS idx_similarity_buckets_node
+                    ON similarity_buckets(node_id);
+
                 CREATE INDEX IF NOT EXISTS idx_nodes_file
                     ON nodes(file_path);
 
@@ -143,6 +294,7 @@ class Database:
                 CREATE INDEX IF NOT EXISTS idx_edges_callee
                     ON edges(callee_id);
             """)
+            _migrate_schema(conn)
 
     def save_nodes(
         self,
@@ -152,7 +304,8 @@ class Database:
         """
         Save node snapshots to the database.
 
-        Existing nodes with the same ID will be updated.
+        Existing nodes with the same ID will be updated. The stored rollup
+        hierarchy no longer describes the nodes and is discarded.
 
         Args:
             nodes: List of CodeNodes to persist
@@ -161,25 +314,9 @@ class Database:
         timestamp = datetime.utcnow().isoformat()
 
         with self._connection() as conn:
-            for node in nodes:
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO nodes
-                    (node_id, file_path, start_line, end_line,
-                     semantic_hash, doc_hash, last_scanned, scan_id)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        node.id,
-                        node.file_path,
-                        node.start_line,
-                        node.end_line,
-                        node.semantic_hash,
-                        node.doc_hash,
-                        timestamp,
-                        scan_id,
-                    ),
-                )
+            conn.execute("DELETE FROM hierarchy")
+            _insert_nodes(conn, (_node_row(node, timestamp, scan_id) for node in nodes))
+            _insert_similarity(conn, (_similarity_row(node) for node in nodes if node.minhash))
 
     def save_edges(self, edges: list[CallEdge]) -> None:
         """
@@ -191,45 +328,122 @@ class Database:
             edges: List of CallEdges to persist
         """
         with self._connection() as conn:
-            for edge in edges:
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO edges
-                    (caller_id, callee_id, call_line)
-                    VALUES (?, ?, ?)
-                    """,
-                    (edge.caller_id, edge.callee_id, edge.call_line),
-                )
+            _insert_edges(conn, (_edge_row(edge) for edge in edges))
 
-    def load_snapshots(self) -> dict[str, NodeSnapshot]:
+    def save_scan(
+        self,
+        directory: str,
+        results: Iterable[FileScanResult],
+        digest: Digest = DEFAULT_DIGEST,
+    ) -> ScanRecord:
         """
-        Load all node snapshots from the database.
+        Stream per-file scan results into the database as one scan.
+
+        Nodes and edges are buffered and written in batches, so memory
+        stays bounded for large repositories. No transaction is held open
+        while waiting for the next result, which leaves the database free
+        for the parse cache writes made by the scan producing them.
+
+        The rollup hierarchy of the scan replaces the stored one once all
+        nodes are written; it is cleared first, so an interrupted save
+        never leaves a hierarchy that disagrees with the nodes.
+
+        Args:
+            directory: Path that was scanned
+            results: Per-file results, e.g. from engine.graph.iter_scan
+            digest: Digest the results' hashes were computed with
 
         Returns:
-            Dictionary mapping node IDs to their snapshots
+            The record of the saved scan
         """
-        snapshots = {}
+        scan_id = str(uuid.uuid4())
+        timestamp = datetime.utcnow().isoformat()
+        files_scanned = nodes_found = errors = 0
+        node_rows: list[tuple] = []
+        edge_rows: list[tuple] = []
+        similarity_rows: list[tuple] = []
+        rollups = RollupBuilder(directory)
 
         with self._connection() as conn:
-            cursor = conn.execute(
-                """
-                SELECT node_id, file_path, start_line, end_line,
-                       semantic_hash, doc_hash, last_scanned
-                FROM nodes
+            conn.execute("DELETE FROM hierarchy")
+            conn.commit()
+            for file_result in results:
+                if not file_result.ok:
+                    errors += 1
+                    continue
+
+                files_scanned += 1
+                nodes_found += len(file_result.nodes)
+                rollups.add_file(file_result.file_path, file_result.nodes)
+                node_rows.extend(_node_row(node, timestamp, scan_id) for node in file_result.nodes)
+                edge_rows.extend(_edge_row(edge) for edge in file_result.edges)
+                similarity_rows.extend(
+                    _similarity_row(node) for node in file_result.nodes if node.minhash
+                )
+
+                if len(node_rows) + len(edge_rows) >= _WRITE_BATCH_ROWS:
+                    _insert_nodes(conn, node_rows)
+                    _insert_edges(conn, edge_rows)
+                    _insert_similarity(conn, similarity_rows)
+                    conn.commit()
+                    node_rows.clear()
+                    edge_rows.clear()
+                    similarity_rows.clear()
+
+            _insert_nodes(conn, node_rows)
+            _insert_edges(conn, edge_rows)
+            _insert_similarity(conn, similarity_rows)
+            _insert_hierarchy(conn, rollups.finish().values())
+            conn.execute(
                 """
+                INSERT INTO scans
+                (scan_id, timestamp, directory, files_scanned, nodes_found, errors, digest)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (scan_id, timestamp, directory, files_scanned, nodes_found, errors, digest.name),
             )
 
-            for row in cursor:
-                snapshot = NodeSnapshot(
-                    node_id=row["node_id"],
-                    file_path=row["file_path"],
-                    start_line=row["start_line"],
-                    end_line=row["end_line"],
-                    semantic_hash=row["semantic_hash"],
-                    doc_hash=row["doc_hash"],
-                    timestamp=datetime.fromisoformat(row["last_scanned"]),
-                )
-                snapshots[snapshot.node_id] = snapshot
+        return ScanRecord(
+            scan_id=scan_id,
+            timestamp=datetime.fromisoformat(timestamp),
+            directory=directory,
+            files_scanned=files_scanned,
+            nodes_found=nodes_found,
+            errors=errors,
+            digest=digest.name,
+        )
+
+    def load_snapshots(self, file_paths: Optional[list[str]] = None) -> dict[str, NodeSnapshot]:
+        """
+        Load node snapshots from the database.
+
+        Args:
+            file_paths: Only load the snapshots of nodes in these files
+                        (default: all snapshots)
+
+        Returns:
+            Dictionary mapping node IDs to their snapshots
+        """
+        snapshots = {}
+
+        with self._connection() as conn:
+            if file_paths is None:
+                queries = [(f"SELECT {_SNAPSHOT_COLUMNS} FROM nodes", [])]
+            else:
+                queries = []
+                for start in range(0, len(file_paths), _MAX_QUERY_PARAMS):
+                    chunk = file_paths[start : start + _MAX_QUERY_PARAMS]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    queries.append((
+                        f"SELECT {_SNAPSHOT_COLUMNS} FROM nodes "
+                        f"WHERE file_path IN ({placeholders})",
+                        chunk,
+                    ))
+
+            for query, params in queries:
+                for row in conn.execute(query, params):
+                    snapshot = _snapshot_from_row(row)
+                    snapshots[snapshot.node_id] = snapshot
 
         return snapshots
 
@@ -245,12 +459,7 @@ class Database:
         """
         with self._connection() as conn:
             cursor = conn.execute(
-                """
-                SELECT node_id, file_path, start_line, end_line,
-                       semantic_hash, doc_hash, last_scanned
-                FROM nodes
-                WHERE node_id = ?
-                """,
+                f"SELECT {_SNAPSHOT_COLUMNS} FROM nodes WHERE node_id = ?",
                 (node_id,),
             )
 
@@ -258,15 +467,249 @@ class Database:
             if row is None:
                 return None
 
-            return NodeSnapshot(
-                node_id=row["node_id"],
-                file_path=row["file_path"],
-                start_line=row["start_line"],
-                end_line=row["end_line"],
-                semantic_hash=row["semantic_hash"],
-                doc_hash=row["doc_hash"],
-                timestamp=datetime.fromisoformat(row["last_scanned"]),
+            return _snapshot_from_row(row)
+
+    def load_node_ids(self) -> set[str]:
+        """
+        Load the IDs of all stored node snapshots, without the snapshots.
+
+        Returns:
+            Set of snapshotted node IDs
+        """
+        with self._connection() as conn:
+            return {row[0] for row in conn.execute("SELECT node_id FROM nodes")}
+
+    def load_hash_schemes(self) -> set[str]:
+        """
+        Load the identifiers of the hash schemes of the stored snapshots.
+
+        Returns:
+            Set of hash_scheme values, e.g. {"cst-v1"}; empty if nothing
+            is stored
+        """
+        with self._connection() as conn:
+            return {row[0] for row in conn.execute("SELECT DISTINCT hash_scheme FROM nodes")}
+
+    def load_known_hashes(
+        self,
+        file_paths: list[str],
+        hash_scheme: str,
+    ) -> dict[str, dict[str, FunctionHashes]]:
+        """
+        Load the stored semantic and section hashes of the given files by raw hash.
+
+        A function whose raw hash is unchanged has unchanged semantic and
+        section hashes and similarity signature, so these let a rescan
+        skip normalizing and shingling unchanged functions. Nodes stored
+        without section hashes are left out, so they are hashed again once.
+
+        Args:
+            file_paths: Files to look up
+            hash_scheme: Only hashes computed with this scheme are returned
+
+        Returns:
+            Dictionary mapping each file path with stored nodes to a
+            {raw_hash: FunctionHashes} dictionary
+        """
+        known: dict[str, dict[str, FunctionHashes]] = {}
+
+        with self._connection() as conn:
+            for start in range(0, len(file_paths), _MAX_QUERY_PARAMS):
+                chunk = file_paths[start : start + _MAX_QUERY_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor = conn.execute(
+                    f"""
+                    SELECT file_path, raw_hash, semantic_hash,
+                           signature_hash, body_hash, decorator_hash, similarity.minhash
+                    FROM nodes LEFT JOIN similarity USING (node_id)
+                    WHERE file_path IN ({placeholders})
+                      AND hash_scheme = ? AND raw_hash IS NOT NULL
+                      AND signature_hash IS NOT NULL
+                    """,
+                    [*chunk, hash_scheme],
+                )
+
+                for row in cursor:
+                    known.setdefault(row["file_path"], {})[
+                        _hash_from_db(row["raw_hash"])
+                    ] = FunctionHashes(
+                        semantic=_hash_from_db(row["semantic_hash"]),
+                        signature=_hash_from_db(row["signature_hash"]),
+                        body=_hash_from_db(row["body_hash"]),
+                        decorators=_hash_from_db(row["decorator_hash"]),
+                        minhash=_hash_from_db(row["minhash"]) or "",
+                    )
+
+        return known
+
+    def load_hierarchy(self) -> dict[str, RollupEntry]:
+        """
+        Load the rollup hierarchy saved by the last scan.
+
+        Returns:
+            Dictionary mapping hierarchy paths to their entries; empty if
+            the nodes were modified outside save_scan since
+        """
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "SELECT path, parent, kind, rollup_hash, file_path FROM hierarchy"
             )
+            return {
+                row["path"]: RollupEntry(
+                    path=row["path"],
+                    parent=row["parent"],
+                    kind=row["kind"],
+                    rollup_hash=_hash_from_db(row["rollup_hash"]),
+                    file_path=row["file_path"],
+                )
+                for row in cursor
+            }
+
+    def load_similarity_index(self, node_ids: list[str]) -> SimilarityIndex:
+        """
+        Load the stored similarity signatures of the given nodes.
+
+        Signatures outlive their nodes' IDs, so this is how a node that
+        disappeared can be found again under a new ID.
+
+        Args:
+            node_ids: Nodes to index, typically those missing from a rescan
+
+        Returns:
+            A SimilarityIndex holding the nodes that have a signature
+        """
+        index = SimilarityIndex()
+
+        with self._connection() as conn:
+            for start in range(0, len(node_ids), _MAX_QUERY_PARAMS):
+                chunk = node_ids[start : start + _MAX_QUERY_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor = conn.execute(
+                    f"SELECT node_id, minhash FROM similarity WHERE node_id IN ({placeholders})",
+                    chunk,
+                )
+                for row in cursor:
+                    index.add(row["node_id"], _hash_from_db(row["minhash"]))
+
+        return index
+
+    def load_similar_signatures(
+        self,
+        minhashes: list[str],
+        node_ids: Optional[Iterable[str]] = None,
+    ) -> SimilarityIndex:
+        """
+        Load the stored signatures sharing an LSH bucket with any of minhashes.
+
+        Bucket keys are looked up in the indexed similarity_buckets table,
+        so the cost depends on the number of candidates rather than on the
+        number of stored signatures.
+
+        Args:
+            minhashes: Signatures to find candidate matches for, typically
+                       those of nodes without a snapshot
+            node_ids: Only index candidates with these IDs, e.g. the nodes
+                      missing from a rescan (default: every candidate)
+
+        Returns:
+            A SimilarityIndex holding the candidates
+        """
+        index = SimilarityIndex()
+        allowed = None if node_ids is None else set(node_ids)
+        buckets = sorted({bucket for minhash in minhashes for bucket in minhash_buckets(minhash)})
+
+        with self._connection() as conn:
+            for start in range(0, len(buckets), _MAX_QUERY_PARAMS):
+                chunk = buckets[start : start + _MAX_QUERY_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor = conn.execute(
+                    f"""
+                    SELECT DISTINCT s.node_id, s.minhash
+                    FROM similarity_buckets AS b JOIN similarity AS s USING (node_id)
+                    WHERE b.bucket IN ({placeholders})
+                    """,
+                    chunk,
+                )
+                for row in cursor:
+                    if allowed is None or row["node_id"] in allowed:
+                        index.add(row["node_id"], _hash_from_db(row["minhash"]))
+
+        return index
+
+    def find_duplicates(self, min_lines: int = 1) -> list[DuplicateCluster]:
+        """
+        Find clusters of semantically identical functions.
+
+        Functions are grouped by (hash_scheme, semantic_hash) in one SQL
+        query. Only nodes written by the most recent scan are considered,
+        as nodes of deleted functions stay in the table; without any
+        recorded scan, all nodes are. The idx_nodes_semantic index on
+        (scan_id, hash_scheme, semantic_hash) lets the grouping subquery
+        count group sizes without sorting; only the members of duplicate
+        groups are then sorted, largest cluster first.
+
+        The semantic hash covers the function's name, so clusters are
+        copies of a function; renamed copies are left to the similarity
+        index.
+
+        Args:
+            min_lines: Ignore functions shorter than this many lines, such
+                       as trivial accessors that are identical by nature
+
+        Returns:
+            Clusters of two or more functions, largest first
+        """
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT scan_id FROM scans ORDER BY timestamp DESC LIMIT 1"
+            ).fetchone()
+            conditions: list[str] = []
+            params: list = []
+            if row is not None:
+                conditions.append("scan_id = ?")
+                params.append(row["scan_id"])
+            if min_lines > 1:
+                conditions.append("end_line - start_line + 1 >= ?")
+                params.append(min_lines)
+            scope = " AND ".join(conditions) or "1"
+
+            cursor = conn.execute(
+                f"""
+                SELECT n.hash_scheme, n.semantic_hash, n.node_id, n.file_path,
+                       n.start_line, n.end_line, n.doc_hash IS NOT NULL AS documented
+                FROM nodes AS n
+                JOIN (
+                    SELECT hash_scheme, semantic_hash, COUNT(*) AS size
+                    FROM nodes
+                    WHERE {scope}
+                    GROUP BY hash_scheme, semantic_hash
+                    HAVING COUNT(*) > 1
+                ) AS d USING (hash_scheme, semantic_hash)
+                WHERE {scope}
+                ORDER BY d.size DESC, n.hash_scheme, n.semantic_hash, n.node_id
+                """,
+                params + params,
+            )
+
+            return [
+                DuplicateCluster(
+                    semantic_hash=_hash_from_db(semantic_hash),
+                    hash_scheme=hash_scheme,
+                    members=tuple(
+                        DuplicateMember(
+                            node_id=member["node_id"],
+                            file_path=member["file_path"],
+                            start_line=member["start_line"],
+                            end_line=member["end_line"],
+                            documented=bool(member["documented"]),
+                        )
+                        for member in members
+                    ),
+                )
+                for (hash_scheme, semantic_hash), members in groupby(
+                    cursor, key=lambda member: (member["hash_scheme"], member["semantic_hash"])
+                )
+            ]
 
     def record_scan(
         self,
@@ -274,6 +717,7 @@ class Database:
         files_scanned: int,
         nodes_found: int,
         errors: int,
+        digest: Digest = DEFAULT_DIGEST,
     ) -> str:
         """
         Record metadata about a scan operation.
@@ -283,6 +727,7 @@ class Database:
             files_scanned: Number of files processed
             nodes_found: Number of functions discovered
             errors: Number of files that failed to parse
+            digest: Digest the scan's hashes were computed with
 
         Returns:
             The generated scan_id
@@ -294,10 +739,10 @@ class Database:
             conn.execute(
                 """
                 INSERT INTO scans
-                (scan_id, timestamp, directory, files_scanned, nodes_found, errors)
-                VALUES (?, ?, ?, ?, ?, ?)
+                (scan_id, timestamp, directory, files_scanned, nodes_found, errors, digest)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
                 """,
-                (scan_id, timestamp, directory, files_scanned, nodes_found, errors),
+                (scan_id, timestamp, directory, files_scanned, nodes_found, errors, digest.name),
             )
 
         return scan_id
@@ -318,7 +763,7 @@ class Database:
             cursor = conn.execute(
                 """
                 SELECT scan_id, timestamp, directory,
-                       files_scanned, nodes_found, errors
+                       files_scanned, nodes_found, errors, digest
                 FROM scans
                 ORDER BY timestamp DESC
                 LIMIT ?
@@ -334,11 +779,182 @@ class Database:
                     files_scanned=row["files_scanned"],
                     nodes_found=row["nodes_found"],
                     errors=row["errors"],
+                    digest=row["digest"],
                 )
                 records.append(record)
 
         return records
 
+    def load_file_cache(
+        self,
+        cache_keys: list[str],
+    ) -> dict[str, tuple[list[FunctionInfo], list[CallInfo]]]:
+        """
+        Load cached extraction results for the given keys.
+
+        Cached FunctionInfo records carry their semantic hashes but not
+        their source code, which is never stored. Entries that no longer
+        match the FunctionInfo or CallInfo fields, e.g. written by another
+        version, are left out and so treated as cache misses.
+
+        Args:
+            cache_keys: Cache keys to look up
+
+        Returns:
+            Dictionary mapping each readable cached key to its (functions, calls)
+        """
+        entries = {}
+
+        with self._connection() as conn:
+            for start in range(0, len(cache_keys), _MAX_QUERY_PARAMS):
+                chunk = cache_keys[start : start + _MAX_QUERY_PARAMS]
+                placeholders = ", ".join("?" for _ in chunk)
+                cursor = conn.execute(
+                    f"""
+                    SELECT cache_key, payload
+                    FROM file_cache
+                    WHERE cache_key IN ({placeholders})
+                    """,
+                    chunk,
+                )
+
+                for row in cursor:
+                    try:
+                        payload = json.loads(row["payload"])
+                        functions = [FunctionInfo(**record) for record in payload["functions"]]
+                        calls = [CallInfo(**record) for record in payload["calls"]]
+                    except (TypeError, KeyError, ValueError):
+                        continue  # Unreadable entry: re-extract the file
+                    entries[row["cache_key"]] = (functions, calls)
+
+        return entries
+
+    def save_file_cache(
+        self,
+        entries: dict[str, tuple[list[FunctionInfo], list[CallInfo]]],
+    ) -> None:
+        """
+        Save extraction results to the parse cache.
+
+        Args:
+            entries: Dictionary mapping cache keys to (functions, calls)
+        """
+        rows = []
+        for cache_key, (functions, calls) in entries.items():
+            payload = {
+                "functions": [_function_record(func) for func in functions],
+                "calls": [asdict(call) for call in calls],
+            }
+            rows.append((cache_key, json.dumps(payload, separators=(",", ":"))))
+
+        with self._connection() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO file_cache (cache_key, payload)
+                VALUES (?, ?)
+                """,
+                rows,
+            )
+
+    def prune_file_cache(self, live_keys: set[str]) -> int:
+        """
+        Delete parse cache entries that are no longer in use.
+
+        Args:
+            live_keys: Cache keys to keep
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._connection() as conn:
+            conn.execute("CREATE TEMP TABLE live_keys (cache_key TEXT PRIMARY KEY)")
+            conn.executemany(
+                "INSERT INTO live_keys (cache_key) VALUES (?)",
+                ((key,) for key in live_keys),
+            )
+            cursor = conn.execute(
+                """
+                DELETE FROM file_cache
+                WHERE cache_key NOT IN (SELECT cache_key FROM live_keys)
+                """
+            )
+            return cursor.rowcount
+
+    def load_manifest(self) -> dict[str, ManifestEntry]:
+        """
+        Load the stat manifest of scanned files.
+
+        Returns:
+            Dictionary mapping file paths to their manifest entries
+        """
+        manifest = {}
+
+        with self._connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT file_path, size, mtime_ns, inode, content_digest
+                FROM file_manifest
+                """
+            )
+
+            for row in cursor:
+                entry = ManifestEntry(
+                    file_path=row["file_path"],
+                    size=row["size"],
+                    mtime_ns=row["mtime_ns"],
+                    inode=row["inode"],
+                    content_digest=row["content_digest"],
+                )
+                manifest[entry.file_path] = entry
+
+        return manifest
+
+    def save_manifest(self, entries: list[ManifestEntry]) -> None:
+        """
+        Save stat manifest entries.
+
+        Existing entries for the same file paths will be replaced.
+
+        Args:
+            entries: Manifest entries to persist
+        """
+        with self._connection() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO file_manifest
+                (file_path, size, mtime_ns, inode, content_digest)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    (e.file_path, e.size, e.mtime_ns, e.inode, e.content_digest)
+                    for e in entries
+                ),
+            )
+
+    def prune_manifest(self, live_paths: set[str]) -> int:
+        """
+        Delete manifest entries for files that were not part of a scan.
+
+        Args:
+            live_paths: File paths to keep
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._connection() as conn:
+            conn.execute("CREATE TEMP TABLE live_paths (file_path TEXT PRIMARY KEY)")
+            conn.executemany(
+                "INSERT INTO live_paths (file_path) VALUES (?)",
+                ((path,) for path in live_paths),
+            )
+            cursor = conn.execute(
+                """
+                DELETE FROM file_manifest
+                WHERE file_path NOT IN (SELECT file_path FROM live_paths)
+                """
+            )
+            return cursor.rowcount
+
     def get_node_count(self) -> int:
         """Get the total number of stored node snapshots."""
         with self._connection() as conn:
@@ -358,6 +974,11 @@ class Database:
                 DELETE FROM nodes;
                 DELETE FROM edges;
                 DELETE FROM scans;
+                DELETE FROM file_cache;
+                DELETE FROM file_manifest;
+                DELETE FROM hierarchy;
+                DELETE FROM similarity;
+                DELETE FROM similarity_buckets;
             """)
 
     def delete_file_nodes(self, file_path: str) -> int:
@@ -373,6 +994,13 @@ class Database:
             Number of nodes deleted
         """
         with self._connection() as conn:
+            conn.execute("DELETE FROM hierarchy")
+            for table in ("similarity", "similarity_buckets"):
+                conn.execute(
+                    f"DELETE FROM {table} WHERE node_id IN "
+                    "(SELECT node_id FROM nodes WHERE file_path = ?)",
+                    (file_path,),
+                )
             cursor = conn.execute(
                 "DELETE FROM nodes WHERE file_path = ?",
                 (file_path,),
@@ -380,6 +1008,241 @@ class Database:
             return cursor.rowcount
 
 
+def _migrate_schema(conn: sqlite3.Connection) -> None:
+    """
+    Upgrade a database created by an earlier version to _SCHEMA_VERSION.
+
+    Each step is idempotent, as databases written before user_version was
+    tracked report version 0 whatever columns they already have. Converting
+    hashes to BLOBs frees half of their pages, so the file is vacuumed
+    afterwards to return the space to the file system.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= _SCHEMA_VERSION:
+        return
+
+    converted = 0
+    if version < 1:
+        columns = _table_columns(conn, "nodes")
+        if "hash_scheme" not in columns:
+            # Hashes stored before schemes existed were all computed with cst-v1
+            conn.execute(
+                "ALTER TABLE nodes ADD COLUMN hash_scheme TEXT NOT NULL DEFAULT 'cst-v1'"
+            )
+        if "raw_hash" not in columns:
+            conn.execute("ALTER TABLE nodes ADD COLUMN raw_hash TEXT")
+    if version < 2:
+        if "digest" not in _table_columns(conn, "scans"):
+            # Every scan before digests were configurable used SHA-256
+            conn.execute("ALTER TABLE scans ADD COLUMN digest TEXT NOT NULL DEFAULT 'sha256'")
+        converted = _convert_hashes_to_blobs(conn)
+    if version < 3:
+        # Created here rather than in _init_schema, which runs before old
+        # databases gain the hash_scheme column
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_nodes_semantic "
+            "ON nodes(scan_id, hash_scheme, semantic_hash)"
+        )
+    if version < 4:
+        columns = _table_columns(conn, "nodes")
+        for column in ("signature_hash", "body_hash", "decorator_hash"):
+            if column not in columns:
+                # Filled in as functions are hashed again
+                conn.execute(f"ALTER TABLE nodes ADD COLUMN {column} BLOB")
+    if version < 5:
+        # Bucket keys of the signatures stored before they were indexed
+        rows = conn.execute("SELECT node_id, minhash FROM similarity").fetchall()
+        _insert_buckets(conn, rows)
+
+    conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+    if converted:
+        conn.commit()
+        conn.execute("VACUUM")
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    """Names of the columns of a table."""
+    return {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _convert_hashes_to_blobs(conn: sqlite3.Connection) -> int:
+    """
+    Rewrite hex text hashes as BLOBs.
+
+    Returns:
+        Number of rows rewritten
+    """
+    rows = [
+        (*(_hash_to_db(value) for value in row[1:]), row[0])
+        for row in conn.execute(
+            """
+            SELECT rowid, semantic_hash, doc_hash, raw_hash FROM nodes
+            WHERE typeof(semantic_hash) = 'text' OR typeof(doc_hash) = 'text'
+               OR typeof(raw_hash) = 'text'
+            """
+        )
+    ]
+    conn.executemany(
+        "UPDATE nodes SET semantic_hash = ?, doc_hash = ?, raw_hash = ? WHERE rowid = ?",
+        rows,
+    )
+
+    hierarchy_rows = [
+        (_hash_to_db(row[1]), row[0])
+        for row in conn.execute(
+            "SELECT rowid, rollup_hash FROM hierarchy WHERE typeof(rollup_hash) = 'text'"
+        )
+    ]
+    conn.executemany("UPDATE hierarchy SET rollup_hash = ? WHERE rowid = ?", hierarchy_rows)
+    return len(rows) + len(hierarchy_rows)
+
+
+def _hash_to_db(value: Optional[str]) -> Optional[bytes | str]:
+    """Stored form of a hash: the digest bytes of lowercase hex, else the text."""
+    if not value:
+        return value
+    try:
+        data = bytes.fromhex(value)
+    except ValueError:
+        return value
+    # fromhex also accepts uppercase and spaces, which would not round-trip
+    return data if data.hex() == value else value
+
+
+def _hash_from_db(value: Optional[bytes | str]) -> Optional[str]:
+    """Hex string of a stored hash."""
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+def _snapshot_from_row(row: sqlite3.Row) -> NodeSnapshot:
+    """NodeSnapshot for a row of _SNAPSHOT_COLUMNS."""
+    return NodeSnapshot(
+        node_id=row["node_id"],
+        file_path=row["file_path"],
+        start_line=row["start_line"],
+        end_line=row["end_line"],
+        semantic_hash=_hash_from_db(row["semantic_hash"]),
+        doc_hash=_hash_from_db(row["doc_hash"]),
+        timestamp=datetime.fromisoformat(row["last_scanned"]),
+        hash_scheme=row["hash_scheme"],
+        raw_hash=_hash_from_db(row["raw_hash"]),
+        signature_hash=_hash_from_db(row["signature_hash"]),
+        body_hash=_hash_from_db(row["body_hash"]),
+        decorator_hash=_hash_from_db(row["decorator_hash"]),
+    )
+
+
+def _node_row(node: CodeNode, timestamp: str, scan_id: Optional[str]) -> tuple:
+    """Row of the nodes table for a CodeNode."""
+    return (
+        node.id,
+        node.file_path,
+        node.start_line,
+        node.end_line,
+        _hash_to_db(node.semantic_hash),
+        _hash_to_db(node.doc_hash),
+        timestamp,
+        scan_id,
+        node.hash_scheme,
+        _hash_to_db(node.raw_hash),
+        _hash_to_db(node.signature_hash),
+        _hash_to_db(node.body_hash),
+        _hash_to_db(node.decorator_hash),
+    )
+
+
+def _edge_row(edge: CallEdge) -> tuple:
+    """Row of the edges table for a CallEdge."""
+    return (edge.caller_id, edge.callee_id, edge.call_line)
+
+
+def _insert_nodes(conn: sqlite3.Connection, rows: Iterable[tuple]) -> None:
+    """Insert or replace node rows."""
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO nodes
+        (node_id, file_path, start_line, end_line,
+         semantic_hash, doc_hash, last_scanned, scan_id, hash_scheme, raw_hash,
+         signature_hash, body_hash, decorator_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+
+
+def _insert_edges(conn: sqlite3.Connection, rows: Iterable[tuple]) -> None:
+    """Insert or replace edge rows."""
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO edges
+        (caller_id, callee_id, call_line)
+        VALUES (?, ?, ?)
+        """,
+        rows,
+    )
+
+
+def _similarity_row(node: CodeNode) -> tuple:
+    """Row of the similarity table for a CodeNode with a signature."""
+    return (node.id, _hash_to_db(node.minhash))
+
+
+def _insert_similarity(conn: sqlite3.Connection, rows: Iterable[tuple]) -> None:
+    """Insert or replace similarity signature rows and their bucket keys."""
+    rows = list(rows)
+    conn.executemany(
+        "DELETE FROM similarity_buckets WHERE node_id = ?",
+        ((node_id,) for node_id, _ in rows),
+    )
+    conn.executemany(
+        "INSERT OR REPLACE INTO similarity (node_id, minhash) VALUES (?, ?)",
+        rows,
+    )
+    _insert_buckets(conn, rows)
+
+
+def _insert_buckets(conn: sqlite3.Connection, rows: Iterable[tuple]) -> None:
+    """Insert the LSH bucket keys of (node_id, minhash) similarity rows."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO similarity_buckets (bucket, node_id) VALUES (?, ?)",
+        (
+            (bucket, node_id)
+            for node_id, minhash in rows
+            for bucket in minhash_buckets(_hash_from_db(minhash))
+        ),
+    )
+
+
+def _insert_hierarchy(conn: sqlite3.Connection, entries: Iterable[RollupEntry]) -> None:
+    """Insert or replace rollup hierarchy rows."""
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO hierarchy
+        (path, parent, kind, rollup_hash, file_path)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (
+            (
+                entry.path,
+                entry.parent,
+                entry.kind,
+                _hash_to_db(entry.rollup_hash),
+                entry.file_path,
+            )
+            for entry in entries
+        ),
+    )
+
+
+def _function_record(func: FunctionInfo) -> dict:
+    """Serialize a FunctionInfo for the parse cache, leaving out its source."""
+    record = asdict(func)
+    del record["source_code"]
+    return record
+
+
 # Module-level convenience functions
 
 def init_database(db_path: str | Path = DEFAULT_DB_PATH) -> Database:
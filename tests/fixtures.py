@@ -82,6 +82,109 @@ def class_method(cls):
     return cls.__name__
 '''
 
+FUNCTION_WITH_LEADING_TRIVIA = '''
+import os
+
+# Comment above the function
+
+@decorator(1)
+# Comment between decorator and def
+def first(a,
+          b):  # trailing comment
+    """Docstring."""
+    value = a + b
+
+    # Footer comment inside the block
+    return value
+
+
+class Holder:
+  # Two-space indented class body
+  def method(self):
+      if self:
+          return 1
+      # Comment at block level
+  # Comment after the method
+
+  async def later(self):
+    """Only a docstring."""
+'''
+
+CONTROL_FLOW_WITH_TRIVIA = '''
+def control(items):  # header comment
+    """Walk the items."""
+
+    # Leading comment
+    total = 0
+    for item in items:
+
+        if item > 0:  # positive
+            total += item
+        elif item < 0:
+            # negative
+            total -= item
+        else:
+            continue
+    else:
+        pass
+
+    while total > 100:
+        total //= 2
+    try:
+        value = int(total)
+    except ValueError:  # never happens
+        value = 0
+    finally:
+        pass
+
+    with open("f") as handle:
+        handle.write(str(value))
+
+    class Local:
+        "Local class docstring."
+        # nothing else
+
+    def one_liner(): return 1
+    return value
+'''
+
+# Docstring literal forms and call placements the parser backends must agree on
+DOCSTRING_AND_CALL_VARIANTS = '''
+def raw_doc():
+    r"""Raw \\d docstring."""
+    return compile(r"\\d")
+
+def concatenated_doc():
+    ("Part one, "
+     'part two.')
+
+def fstring_doc():
+    f"""Not a docstring {1}."""
+
+def fstring_nested_doc():
+    f"Not {'a'} docstring {f'{2}'}."
+
+def fstring_concatenated_doc():
+    ("Plain part, " f"formatted {'part'}"
+     " and tail.")
+
+def bytes_doc():
+    b"bytes"
+
+def suite_doc(): "Same-line body is not a docstring"
+
+@register(name=lookup("key"))
+def decorated(value=default(), *, flag: check() = None) -> annotate():
+    def inner():
+        class Scoped(make_base()):
+            attr = compute()
+
+            def method(self):
+                return self.helper().finish(key=get())
+        return Scoped
+    return inner
+'''
+
 # Code that should produce the same semantic hash
 SEMANTICALLY_EQUIVALENT_1 = '''
 def compute(x, y):
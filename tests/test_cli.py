@@ -0,0 +1,124 @@
+"""
+Tests for the CLI.
+
+Runs gdg commands end to end on small projects written to a temporary
+directory.
+"""
+
+import os
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from cli.main import app
+
+runner = CliRunner()
+
+PARSE_CONFIG = '''
+def parse_config(path):
+    """Parse the config file at path into a dict."""
+    result = {}
+    with open(path) as handle:
+        for line in handle:
+            key, _, value = line.partition("=")
+            result[key.strip()] = value.strip()
+    return result
+'''
+
+
+def _gdg(*args: str) -> str:
+    """Run a gdg command, check that it succeeded and return its output."""
+    result = runner.invoke(app, [str(arg) for arg in args])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+class TestStatus:
+    """Tests for gdg status."""
+
+    def test_near_copy_in_unchanged_file_is_not_a_successor(self, tmp_path: Path):
+        """Test that deleting a function does not hand its snapshot to a copy elsewhere."""
+        (tmp_path / "a.py").write_text(PARSE_CONFIG)
+        (tmp_path / "b.py").write_text(PARSE_CONFIG.replace("parse_config", "parse_config_copy"))
+        _gdg("scan", tmp_path)
+
+        (tmp_path / "a.py").unlink()
+        output = _gdg("status", tmp_path)
+
+        assert "predecessors" not in output
+        assert "Stale Documentation" not in output
+
+    def test_moved_function_matched_through_stored_buckets(self, tmp_path: Path):
+        """Test that an edited function moved to another file keeps its snapshot."""
+        (tmp_path / "a.py").write_text(PARSE_CONFIG)
+        _gdg("scan", tmp_path)
+
+        (tmp_path / "a.py").unlink()
+        (tmp_path / "b.py").write_text(PARSE_CONFIG.replace("value.strip()", "value.strip().lower()"))
+        output = _gdg("status", tmp_path)
+
+        assert "1 function(s) matched to moved or renamed predecessors" in " ".join(output.split())
+        assert "Stale Documentation (1 total)" in output
+
+    def test_ast_parser_still_reports_drift_against_libcst_hashes(self, tmp_path: Path):
+        """Test that status --parser ast falls back to the stored scheme's parser."""
+        module = tmp_path / "m.py"
+        module.write_text('def f(x):\n    """Add one to x."""\n    return x + 1\n')
+        _gdg("scan", tmp_path)
+
+        module.write_text('def f(x):\n    """Add one to x."""\n    return x * 7\n')
+        output = " ".join(_gdg("status", tmp_path, "--parser", "ast").split())
+
+        assert "Stored hashes use cst-v1" in output
+        assert "using libcst instead" in output
+        assert "Stale Documentation (1 total)" in output
+
+    def test_auto_parser_uses_ast_for_ast_hashes(self, tmp_path: Path):
+        """Test that status picks the fast ast parser for a database scanned with it."""
+        module = tmp_path / "m.py"
+        module.write_text('def f(x):\n    """Add one to x."""\n    return x + 1\n')
+        _gdg("scan", tmp_path, "--parser", "ast")
+
+        module.write_text('def f(x):\n    """Add one to x."""\n    return x * 7\n')
+        output = _gdg("status", tmp_path)
+
+        assert "instead" not in output
+        assert "not be compared" not in output
+        assert "Stale Documentation (1 total)" in output
+
+
+class TestImpact:
+    """Tests for gdg impact."""
+
+    def test_lists_callers_nearest_first(self, tmp_path: Path):
+        """Test that the transitive callers of a function are listed by distance."""
+        (tmp_path / "m.py").write_text(
+            "def a():\n    b()\n\ndef b():\n    c()\n\ndef c():\n    pass\n"
+        )
+        _gdg("scan", tmp_path)
+
+        output = _gdg("impact", "m.c", tmp_path)
+
+        assert "2 function(s) affected" in output
+        assert output.index("m.b") < output.index("m.a")
+
+    def test_read_only_commands_keep_the_graph(self, tmp_path: Path):
+        """Test that status recording recently modified files does not invalidate it."""
+        module = tmp_path / "m.py"
+        module.write_text("def a():\n    b()\n\ndef b():\n    pass\n")
+        _gdg("scan", tmp_path)
+
+        # Out of the racy window now, so status adds the file to the manifest
+        os.utime(module, ns=(1_000_000_000, 1_000_000_000))
+        _gdg("status", tmp_path)
+        output = _gdg("impact", "m.b", tmp_path)
+
+        assert "1 function(s) affected" in output
+        assert "1 file(s) may have changed" in output
+
+    def test_requires_a_scan(self, tmp_path: Path):
+        """Test that impact asks for a scan when there is no call graph."""
+        result = runner.invoke(app, ["impact", "m.c", str(tmp_path)])
+
+        assert result.exit_code == 1
+        assert "gdg scan" in result.output
@@ -5,7 +5,13 @@ Tests drift classification rules and report generation.
 """
 
 import pytest
-from engine.drift import DriftDetector, detect_node_drift, analyze_codebase_drift
+from engine.drift import (
+    DriftDetector,
+    changed_sections,
+    detect_node_drift,
+    analyze_codebase_drift,
+)
+from engine.hash import SimilarityIndex, compute_minhash
 from engine.models import CodeNode, DriftStatus, NodeSnapshot, DriftReport
 
 
@@ -121,6 +127,45 @@ class TestDriftClassification:
         assert status == DriftStatus.STALE
 
 
+    def test_incomparable_when_hash_scheme_changed(self):
+        """Test that hashes from another scheme are neither fresh nor stale."""
+        node = CodeNode(
+            id="mod:func",
+            name="func",
+            file_path="mod.py",
+            start_line=1,
+            end_line=5,
+            semantic_hash="ast_hash",
+            doc_hash="same_doc",
+            docstring="The docstring.",
+            hash_scheme="ast-v1",
+        )
+
+        snapshot = NodeSnapshot(
+            node_id="mod:func",
+            file_path="mod.py",
+            start_line=1,
+            end_line=5,
+            semantic_hash="cst_hash",
+            doc_hash="same_doc",
+            hash_scheme="cst-v1",
+        )
+
+        assert detect_node_drift(node, snapshot) == DriftStatus.INCOMPARABLE
+
+        explanation = DriftDetector({node.id: snapshot}).explain(node)
+        assert explanation.current_status == DriftStatus.INCOMPARABLE
+        assert "cst-v1" in explanation.reason
+        assert "--parser libcst" in explanation.suggestions[0]
+        assert not any("re-base" in suggestion for suggestion in explanation.suggestions)
+
+        report = analyze_codebase_drift([node], {node.id: snapshot})
+        assert report.fresh_count == 0
+        assert report.incomparable_count == 1
+        assert report.incomparable_nodes == ["mod:func"]
+        assert report.total_nodes == 1
+
+
 class TestDriftDetector:
     """Tests for the DriftDetector class."""
 
@@ -184,6 +229,154 @@ class TestDriftDetector:
         assert len(explanation.suggestions) > 0
 
 
+_MOVED_SOURCE = """
+def total(items):
+    \"\"\"Sum the price of every item.\"\"\"
+    result = 0
+    for item in items:
+        result += item.price * item.quantity
+    return result
+"""
+
+
+def _moved_node(semantic_hash: str, doc_hash: str = "doc") -> CodeNode:
+    """The function above after moving from old.py to new.py."""
+    return CodeNode(
+        id="new:total",
+        name="total",
+        file_path="new.py",
+        start_line=1,
+        end_line=7,
+        semantic_hash=semantic_hash,
+        doc_hash=doc_hash,
+        docstring="Sum the price of every item.",
+        minhash=compute_minhash(_MOVED_SOURCE),
+    )
+
+
+class TestMovedNodes:
+    """Tests for matching moved or renamed nodes to vanished snapshots."""
+
+    def _detector(self) -> DriftDetector:
+        snapshot = NodeSnapshot(
+            node_id="old:total",
+            file_path="old.py",
+            start_line=1,
+            end_line=7,
+            semantic_hash="old_hash",
+            doc_hash="doc",
+        )
+        index = SimilarityIndex()
+        index.add("old:total", compute_minhash(_MOVED_SOURCE.replace("total", "sum_prices")))
+        return DriftDetector({"old:total": snapshot}, index)
+
+    def test_moved_node_compared_to_predecessor(self):
+        """Test that a moved function whose code changed is STALE, not new."""
+        detector = self._detector()
+        node = _moved_node("new_hash")
+
+        report = detector.generate_report([node])
+        explanation = detector.explain(node)
+
+        assert report.moved_nodes == {"new:total": "old:total"}
+        assert report.stale_nodes == ["new:total"]
+        assert explanation.predecessor_id == "old:total"
+        assert "moved or renamed" in explanation.reason
+
+    def test_unchanged_move_is_fresh(self):
+        """Test that a function moved without changes stays FRESH."""
+        detector = self._detector()
+
+        report = detector.generate_report([_moved_node("old_hash")])
+
+        assert report.fresh_count == 1
+        assert report.moved_nodes == {"new:total": "old:total"}
+
+    def test_predecessor_still_present_is_not_matched(self):
+        """Test that a copy does not take over the snapshot of its original."""
+        detector = self._detector()
+        original = CodeNode(
+            id="old:total",
+            name="total",
+            file_path="old.py",
+            start_line=1,
+            end_line=7,
+            semantic_hash="old_hash",
+            doc_hash="doc",
+            docstring="Sum the price of every item.",
+        )
+
+        assert detector.match_successors([original, _moved_node("new_hash")]) == {}
+        assert detector.detect(_moved_node("new_hash")) == DriftStatus.FRESH
+
+    def test_node_with_unloaded_snapshot_is_not_matched(self):
+        """Test that a node whose snapshot exists but was not loaded keeps its own."""
+        snapshot = NodeSnapshot(
+            node_id="old:total", file_path="old.py", start_line=1, end_line=7,
+            semantic_hash="old_hash", doc_hash="doc",
+        )
+        index = SimilarityIndex()
+        index.add("old:total", compute_minhash(_MOVED_SOURCE))
+        detector = DriftDetector(
+            {"old:total": snapshot}, index, stored_ids={"old:total", "new:total"}
+        )
+
+        report = detector.generate_report([_moved_node("new_hash")])
+
+        assert report.moved_nodes == {}
+        assert report.fresh_count == 1
+
+
+def _sectioned_node(signature: str, body: str) -> CodeNode:
+    return CodeNode(
+        id="mod:f", name="f", file_path="mod.py", start_line=1, end_line=3,
+        semantic_hash=f"{signature}{body}", doc_hash="doc", docstring="Doc.",
+        signature_hash=signature, body_hash=body, decorator_hash="none",
+    )
+
+
+class TestChangedSections:
+    """Tests for reporting which sections of a function changed."""
+
+    def _detector(self) -> DriftDetector:
+        stored = NodeSnapshot.from_node(_sectioned_node("sig", "body"))
+        return DriftDetector({"mod:f": stored})
+
+    def test_signature_change(self):
+        """Test that a signature change is named in the explanation."""
+        detector = self._detector()
+        node = _sectioned_node("sig2", "body")
+
+        explanation = detector.explain(node)
+
+        assert detector.changed_sections(node) == ["signature"]
+        assert explanation.current_status == DriftStatus.STALE
+        assert explanation.changed_sections == ["signature"]
+        assert "changed in the signature" in explanation.reason
+        assert "Update the documented parameters and return value" in explanation.suggestions
+
+    def test_body_change_leaves_signature(self):
+        """Test that a body-only change does not count as a signature change."""
+        detector = self._detector()
+
+        sections = detector.changed_sections(_sectioned_node("sig", "body2"))
+
+        assert sections == ["body"]
+        assert "signature" not in sections
+
+    def test_missing_sections_are_not_compared(self):
+        """Test that snapshots without section hashes give None."""
+        node = _sectioned_node("sig", "body")
+        old = NodeSnapshot(
+            node_id="mod:f", file_path="mod.py", start_line=1, end_line=3,
+            semantic_hash="old", doc_hash="doc",
+        )
+
+        assert changed_sections(node, old) is None
+        assert changed_sections(node, None) is None
+        assert DriftDetector({"mod:f": old}).explain(node).changed_sections is None
+
+
 class TestDriftReport:
     """Tests for drift report generation."""
 
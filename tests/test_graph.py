@@ -4,9 +4,22 @@ Tests for the graph module.
 Tests CodeGraph operations and graph construction.
 """
 
+import dataclasses
+import hashlib
+import os
+
 import pytest
-from engine.graph import CodeGraph, build_graph_from_source
+from pathlib import Path
+
+from engine.graph import CodeGraph, GraphDelta, build_graph_from_source, build_graph_from_directory
+from engine.graph import file_fingerprint, iter_python_files, iter_scan
+from engine.graph import load_graph_snapshot, save_graph_snapshot
+from engine.graph.discovery import IgnoreFile, PathMatcher
+from engine.graph import builder
 from engine.models import CodeNode, CallEdge, DriftStatus
+from engine.storage import Database
+
+SAMPLE_PROJECT = Path(__file__).parent / "fixtures" / "sample_project"
 
 
 class TestCodeGraph:
@@ -174,6 +187,349 @@ class TestCodeGraph:
         assert graph.node_count == 0
 
 
+def _graph_node(node_id: str, status: DriftStatus = DriftStatus.FRESH) -> CodeNode:
+    """A CodeNode in mod.py with the given ID."""
+    return CodeNode(
+        id=node_id, name=node_id.rpartition(":")[2], file_path="mod.py",
+        start_line=1, end_line=2, semantic_hash=f"hash-{node_id}", drift_status=status,
+    )
+
+
+class TestGraphStorage:
+    """Tests for the interned, CSR-backed graph storage."""
+
+    def test_duplicate_edges_and_placeholders(self):
+        """Test that repeated edges count once and unknown callees are placeholders."""
+        graph = CodeGraph()
+        graph.add_node(_graph_node("mod:a"))
+        graph.add_edge(CallEdge(caller_id="mod:a", callee_id="print", call_line=2))
+        graph.add_edge(CallEdge(caller_id="mod:a", callee_id="print", call_line=5))
+
+        assert graph.edge_count == 1
+        assert graph.node_count == 2
+        assert graph.get_node("print") is None
+        assert [node.id for node in graph.get_all_nodes()] == ["mod:a"]
+        assert list(graph.get_callers("print")) == ["mod:a"]
+
+    def test_edges_added_after_queries(self):
+        """Test that queries see edges and nodes added after the last query."""
+        graph = CodeGraph()
+        graph.add_edge(CallEdge(caller_id="mod:a", callee_id="mod:b"))
+        assert list(graph.get_callees("mod:a")) == ["mod:b"]
+
+        graph.add_node(_graph_node("mod:c"))
+        assert list(graph.get_callers("mod:c")) == []
+
+        graph.add_edge(CallEdge(caller_id="mod:c", callee_id="mod:b"))
+        assert sorted(graph.get_callers("mod:b")) == ["mod:a", "mod:c"]
+        assert graph.edge_count == 2
+
+    def test_few_staged_edges_are_merged(self):
+        """Test that edges merged into a large sorted graph match a full sort."""
+        pairs = [(f"f{i}", f"f{(i * 7) % 600}") for i in range(600)]
+        extra = [("f5", "f0"), ("f5", "f0"), ("f299", "new"), ("f1", "f7")]
+        merged = CodeGraph()
+        for caller, callee in pairs:
+            merged.add_edge(CallEdge(caller_id=caller, callee_id=callee, call_line=1))
+        merged.edge_count  # sort the first batch
+        for line, (caller, callee) in enumerate(extra, start=2):
+            merged.add_edge(CallEdge(caller_id=caller, callee_id=callee, call_line=line))
+
+        rebuilt = CodeGraph()
+        for caller, callee in pairs:
+            rebuilt.add_edge(CallEdge(caller_id=caller, callee_id=callee, call_line=1))
+        for line, (caller, callee) in enumerate(extra, start=2):
+            rebuilt.add_edge(CallEdge(caller_id=caller, callee_id=callee, call_line=line))
+
+        assert _graph_state(merged) == _graph_state(rebuilt)
+        assert sorted(merged.get_callers("f0")) == ["f0", "f5"]
+
+    def test_networkx_view(self):
+        """Test that the on-demand DiGraph carries node and edge attributes."""
+        graph = CodeGraph()
+        graph.add_node(_graph_node("mod:a", DriftStatus.STALE))
+        graph.add_edge(CallEdge(caller_id="mod:a", callee_id="mod:b", call_line=3))
+        graph.add_edge(CallEdge(caller_id="mod:a", callee_id="mod:b", call_line=4))
+
+        view = graph.to_networkx()
+
+        assert set(view.nodes) == {"mod:a", "mod:b"}
+        assert view.nodes["mod:a"]["drift_status"] == "stale"
+        assert view.nodes["mod:a"]["code_node"] is graph.get_node("mod:a")
+        assert view.edges["mod:a", "mod:b"]["call_line"] == 4
+
+        view.remove_node("mod:a")
+        assert graph.node_count == 2
+
+    def test_graph_property_is_a_deprecated_copy(self):
+        """Test that the old graph property warns and returns a fresh copy."""
+        graph = CodeGraph()
+        graph.add_node(_graph_node("mod:a"))
+
+        with pytest.warns(DeprecationWarning, match="to_networkx"):
+            view = graph.graph
+
+        assert set(view.nodes) == {"mod:a"}
+        assert view is not graph.to_networkx()
+
+    def test_status_index_follows_updates(self):
+        """Test that status listings and counts track updates and replacements."""
+        graph = CodeGraph()
+        for name in ("a", "b", "c"):
+            graph.add_node(_graph_node(f"mod:{name}"))
+
+        graph.update_node_status("mod:b", DriftStatus.STALE)
+        graph.add_node(_graph_node("mod:c", DriftStatus.UNDOCUMENTED))
+        graph.update_node_status("missing", DriftStatus.STALE)
+
+        assert [node.id for node in graph.get_fresh_nodes()] == ["mod:a"]
+        assert [node.id for node in graph.get_stale_nodes()] == ["mod:b"]
+        assert graph.get_stale_nodes()[0].drift_status == DriftStatus.STALE
+        assert graph.count_by_status(DriftStatus.UNDOCUMENTED) == 1
+        assert graph.count_by_status(DriftStatus.FRESH) == 1
+
+    def test_drift_report_from_index(self):
+        """Test that the report matches the node statuses."""
+        graph = CodeGraph()
+        statuses = [DriftStatus.FRESH, DriftStatus.STALE, DriftStatus.STALE,
+                    DriftStatus.UNDOCUMENTED]
+        for i, status in enumerate(statuses):
+            graph.add_node(_graph_node(f"mod:f{i}", status))
+        graph.add_edge(CallEdge(caller_id="mod:f0", callee_id="print"))
+        graph.update_node_status("mod:f2", DriftStatus.FRESH)
+
+        report = graph.drift_report()
+
+        assert (report.fresh_count, report.stale_count, report.undocumented_count) == (2, 1, 1)
+        assert report.stale_nodes == ["mod:f1"]
+        assert report.undocumented_nodes == ["mod:f3"]
+
+    def test_affected_by_change_through_cycle(self):
+        """Test transitive callers across mutual recursion."""
+        graph = CodeGraph()
+        for caller, callee in [("a", "b"), ("b", "a"), ("c", "a"), ("d", "e")]:
+            graph.add_edge(CallEdge(caller_id=caller, callee_id=callee))
+
+        assert graph.get_affected_by_change({"a"}) == {"a", "b", "c"}
+        assert graph.get_affected_by_change({"missing"}) == {"missing"}
+
+    def test_impact_distances(self):
+        """Test distances to the nearest change and the depth limit."""
+        graph = CodeGraph()
+        for caller, callee in [("b", "a"), ("c", "b"), ("d", "c"), ("c", "x"), ("y", "x")]:
+            graph.add_edge(CallEdge(caller_id=caller, callee_id=callee))
+
+        distances = graph.get_impact_distances({"a", "x"})
+
+        assert distances == {"a": 0, "x": 0, "b": 1, "c": 1, "y": 1, "d": 2}
+        assert graph.get_impact_distances(["a"], max_depth=1) == {"a": 0, "b": 1}
+        assert graph.get_affected_by_change({"a", "missing"}, max_depth=2) == {
+            "a", "b", "c", "missing",
+        }
+
+
+def _file_contents(file_path: str, calls: dict[str, list[str]], version: str = "1"):
+    """Nodes and edges of a file whose functions make the given calls."""
+    nodes = [
+        CodeNode(
+            id=f"{file_path}:{name}", name=name, file_path=file_path, start_line=1,
+            end_line=2, semantic_hash=f"{name}-{version}",
+        )
+        for name in calls
+    ]
+    edges = [
+        CallEdge(caller_id=f"{file_path}:{name}", callee_id=callee, call_line=2)
+        for name, callees in calls.items()
+        for callee in callees
+    ]
+    return nodes, edges
+
+
+def _graph_state(graph: CodeGraph) -> tuple:
+    view = graph.to_networkx()
+    return (
+        graph.node_count,
+        graph.edge_count,
+        dict(view.nodes(data="semantic_hash")),
+        sorted(view.edges(data="call_line")),
+    )
+
+
+class TestReplaceFile:
+    """Tests for replacing one file's nodes and edges in place."""
+
+    def _graph(self, files: dict[str, dict[str, list[str]]]) -> CodeGraph:
+        graph = CodeGraph()
+        for file_path, calls in files.items():
+            nodes, edges = _file_contents(file_path, calls)
+            for node in nodes:
+                graph.add_node(node)
+            for edge in edges:
+                graph.add_edge(edge)
+        return graph
+
+    def test_matches_fresh_build(self):
+        """Test that replacing a file gives the graph a full rebuild would."""
+        other = {"g": ["a.py:f", "a.py:gone"]}
+        graph = self._graph({"a.py": {"f": ["len"], "gone": ["print"]}, "b.py": other})
+
+        graph.replace_file("a.py", *_file_contents("a.py", {"f": ["b.py:g"], "new": []}))
+
+        expected = self._graph({"a.py": {"f": ["b.py:g"], "new": []}, "b.py": other})
+        assert _graph_state(graph) == _graph_state(expected)
+        assert graph.get_node("a.py:gone") is None
+        assert "print" not in graph.to_networkx()
+        assert list(graph.get_callers("a.py:gone")) == ["b.py:g"]
+
+    def test_delta(self):
+        """Test the added, removed and changed node IDs."""
+        graph = self._graph({"a.py": {"f": [], "g": [], "h": []}})
+        nodes, edges = _file_contents("a.py", {"f": [], "g": [], "k": []})
+        nodes[1] = CodeNode(
+            id="a.py:g", name="g", file_path="a.py", start_line=5, end_line=9,
+            semantic_hash="g-2",
+        )
+
+        delta = graph.replace_file("a.py", nodes, edges)
+
+        assert delta == GraphDelta(added={"a.py:k"}, removed={"a.py:h"}, changed={"a.py:g"})
+        assert {node.id for node in graph.get_nodes_by_file("a.py")} == {
+            "a.py:f", "a.py:g", "a.py:k",
+        }
+
+    def test_remove_and_restore_file(self):
+        """Test deleting a file's nodes and adding them back."""
+        graph = self._graph({"a.py": {"f": ["a.py:g"], "g": []}})
+        graph.update_node_status("a.py:g", DriftStatus.STALE)
+
+        delta = graph.replace_file("a.py", [], [])
+
+        assert delta.removed == {"a.py:f", "a.py:g"}
+        assert (graph.node_count, graph.edge_count) == (0, 0)
+        assert graph.get_stale_nodes() == []
+
+        graph.replace_file("a.py", *_file_contents("a.py", {"f": ["a.py:g"], "g": []}))
+        assert _graph_state(graph) == _graph_state(
+            self._graph({"a.py": {"f": ["a.py:g"], "g": []}})
+        )
+        assert graph.count_by_status(DriftStatus.UNDOCUMENTED) == 2
+
+
+class TestGraphSnapshot:
+    """Tests for saving and loading binary graph snapshots."""
+
+    FINGERPRINTS = {"a.py": (10, 1, 1), "b.py": None}
+
+    def _graph(self) -> CodeGraph:
+        graph = CodeGraph()
+        nodes, edges = _file_contents("a.py", {"f": ["a.py:g", "len"], "g": ["b.py:h"]})
+        nodes[0] = dataclasses.replace(
+            nodes[0], docstring="Does f. \udcff", is_method=True, class_name="K",
+        )
+        nodes += _file_contents("b.py", {"h": [], "k": ["a.py:f"]})[0]
+        for node in nodes:
+            graph.add_node(node)
+        for edge in edges + [CallEdge(caller_id="b.py:k", callee_id="a.py:f", call_line=7)]:
+            graph.add_edge(edge)
+        graph.update_node_status("a.py:g", DriftStatus.STALE)
+        graph.replace_file("b.py", [], [])
+        graph.replace_file("b.py", *_file_contents("b.py", {"h": [], "k": ["a.py:f"]}))
+        return graph
+
+    def _load(self, tmp_path, graph: CodeGraph) -> CodeGraph:
+        save_graph_snapshot(graph, tmp_path / "graph", "scan-1", self.FINGERPRINTS)
+        return load_graph_snapshot(tmp_path / "graph", "scan-1").graph
+
+    def test_arrays_round_trip(self):
+        """Test that a graph rebuilt from its arrays reads nodes lazily."""
+        graph = self._graph()
+        arrays = graph.to_arrays()
+        file_index = {"a.py": {"a.py:f", "a.py:g"}, "b.py": {"b.py:h", "b.py:k"}}
+        loaded_ids = []
+
+        def load_node(index):
+            loaded_ids.append(arrays.ids[index])
+            return dataclasses.replace(graph.get_node(arrays.ids[index]))
+
+        restored = CodeGraph.from_arrays(arrays, load_node, file_index)
+
+        assert [node.id for node in restored.get_stale_nodes()] == ["a.py:g"]
+        assert set(restored.get_callers("a.py:f")) == {"b.py:k"}
+        assert loaded_ids == ["a.py:g"]
+        assert _graph_state(restored) == _graph_state(graph)
+        assert list(restored.get_all_nodes()) == list(graph.get_all_nodes())
+
+    def test_round_trip(self, tmp_path):
+        """Test that a loaded snapshot equals the saved graph."""
+        graph = self._graph()
+
+        loaded = self._load(tmp_path, graph)
+
+        assert _graph_state(loaded) == _graph_state(graph)
+        assert list(loaded.get_all_nodes()) == list(graph.get_all_nodes())
+        assert loaded.get_node("a.py:f").docstring == "Does f. \udcff"
+        assert loaded.get_node("len") is None
+        assert [node.id for node in loaded.get_stale_nodes()] == ["a.py:g"]
+        assert loaded.drift_report() == graph.drift_report()
+        assert {node.id for node in loaded.get_nodes_by_file("b.py")} == {"b.py:h", "b.py:k"}
+        assert loaded.get_impact_distances({"b.py:h"}) == {
+            "b.py:h": 0, "a.py:g": 1, "a.py:f": 2, "b.py:k": 3,
+        }
+
+    def test_loaded_graph_can_be_updated(self, tmp_path):
+        """Test that a loaded graph accepts status changes and file replacements."""
+        loaded = self._load(tmp_path, self._graph())
+
+        loaded.update_node_status("a.py:f", DriftStatus.STALE)
+        loaded.replace_file("a.py", *_file_contents("a.py", {"f": ["b.py:h"]}))
+
+        assert loaded.get_node("a.py:g") is None
+        assert list(loaded.get_callers("b.py:h")) == ["a.py:f"]
+        assert loaded.get_stale_nodes() == []
+
+    def test_invalid_snapshots_are_not_loaded(self, tmp_path):
+        """Test that other scans, missing and damaged files give None."""
+        path = tmp_path / "graph"
+        save_graph_snapshot(self._graph(), path, "scan-1", self.FINGERPRINTS)
+
+        assert load_graph_snapshot(path, "scan-2") is None
+        assert load_graph_snapshot(tmp_path / "missing", "scan-1") is None
+
+        data = path.read_bytes()
+        path.write_bytes(data[:len(data) // 2])
+        assert load_graph_snapshot(path, "scan-1") is None
+        path.write_bytes(b"")
+        assert load_graph_snapshot(path, "scan-1") is None
+        path.write_bytes(b"X" + data[1:])
+        assert load_graph_snapshot(path, "scan-1") is None
+
+    def test_empty_graph(self, tmp_path):
+        """Test the snapshot of a graph without nodes or files."""
+        save_graph_snapshot(CodeGraph(), tmp_path / "graph", "scan-1", {})
+
+        snapshot = load_graph_snapshot(tmp_path / "graph", "scan-1")
+
+        assert (snapshot.graph.node_count, snapshot.graph.edge_count) == (0, 0)
+        assert snapshot.fingerprints == {}
+
+    def test_modified_files(self, tmp_path):
+        """Test that changed, deleted and untrusted files are reported."""
+        files = {name: tmp_path / name for name in ("a.py", "b.py", "c.py", "d.py")}
+        fingerprints = {}
+        for file in files.values():
+            file.write_text("pass\n")
+            fingerprints[str(file)] = file_fingerprint(file.stat())
+        fingerprints[str(files["d.py"])] = None
+        save_graph_snapshot(CodeGraph(), tmp_path / "graph", "scan-1", fingerprints)
+
+        files["a.py"].write_text("x = 1\n")
+        files["b.py"].unlink()
+        snapshot = load_graph_snapshot(tmp_path / "graph", "scan-1")
+
+        assert snapshot.fingerprints[str(files["d.py"])] is None
+        assert snapshot.modified_files() == [str(files[name]) for name in ("a.py", "b.py", "d.py")]
+
+
 class TestGraphBuilding:
     """Tests for graph construction from source."""
 
@@ -235,3 +591,459 @@ def undocumented():
 
         assert nodes["documented"].docstring == "This is the docstring."
         assert nodes["undocumented"].docstring is None
+
+    @pytest.mark.parametrize("backend", ["libcst", "ast"])
+    def test_same_file_callees_are_resolved(self, tmp_path, backend):
+        """Test that calls to functions of the same file point at their nodes."""
+        (tmp_path / "m.py").write_text('''
+def helper():
+    pass
+
+class Box:
+    def fill(self):
+        helper()
+        self.close()
+        Box.make()
+
+    def close(self):
+        def helper():
+            pass
+        helper()
+        print()
+
+    @staticmethod
+    def make():
+        pass
+''')
+        result = build_graph_from_directory(tmp_path, jobs=1, backend=backend)
+        prefix = f"{tmp_path / 'm.py'}:m."
+
+        callees = {
+            (edge.caller_id.removeprefix(prefix), edge.callee_id.removeprefix(prefix))
+            for edge in result.edges
+        }
+        assert callees == {
+            ("Box.fill", "helper"),
+            ("Box.fill", "Box.close"),
+            ("Box.fill", "Box.make"),
+            ("Box.close", "Box.close.helper"),
+            ("Box.close", f"{tmp_path / 'm.py'}:print"),
+        }
+
+
+class TestDirectoryScan:
+    """Tests for scanning a directory of Python files."""
+
+    def test_scan_sample_project(self):
+        """Test that the sample project is scanned without errors."""
+        result = build_graph_from_directory(SAMPLE_PROJECT, jobs=1)
+
+        assert result.files_scanned == 3
+        assert result.error_count == 0
+        names = {node.name for node in result.nodes}
+        assert {"main", "process_data", "format_currency", "get_stats"} <= names
+
+    def test_parallel_scan_matches_serial(self):
+        """Test that a process-pool scan merges results in the serial order."""
+        serial = build_graph_from_directory(SAMPLE_PROJECT, jobs=1)
+        parallel = build_graph_from_directory(SAMPLE_PROJECT, jobs=2)
+
+        assert parallel.nodes == serial.nodes
+        assert parallel.edges == serial.edges
+        assert parallel.files_scanned == serial.files_scanned
+
+    def test_scan_returns_built_graph(self):
+        """Test that the graph built during the scan is returned."""
+        result = build_graph_from_directory(SAMPLE_PROJECT, jobs=1)
+
+        assert result.graph is not None
+        assert {node.id for node in result.graph.get_all_nodes()} == {
+            node.id for node in result.nodes
+        }
+        assert result.graph.edge_count == len(set((e.caller_id, e.callee_id) for e in result.edges))
+
+    def test_scan_without_graph(self):
+        """Test that build_graph=False skips graph construction only."""
+        with_graph = build_graph_from_directory(SAMPLE_PROJECT, jobs=1)
+        without_graph = build_graph_from_directory(SAMPLE_PROJECT, jobs=1, build_graph=False)
+
+        assert without_graph.graph is None
+        assert without_graph.nodes == with_graph.nodes
+        assert without_graph.edges == with_graph.edges
+
+    def test_parse_errors_are_collected(self, tmp_path):
+        """Test that unparsable files are reported instead of aborting the scan."""
+        (tmp_path / "good.py").write_text("def ok():\n    return 1\n")
+        (tmp_path / "bad.py").write_text("def broken(\n")
+
+        result = build_graph_from_directory(tmp_path, jobs=2)
+
+        assert result.files_scanned == 1
+        assert [path for path, _ in result.errors] == [str(tmp_path / "bad.py")]
+
+
+class TestStreamingScan:
+    """Tests for the per-file streaming scan API."""
+
+    def test_results_match_collected_scan(self):
+        """Test that streamed results add up to build_graph_from_directory."""
+        collected = build_graph_from_directory(SAMPLE_PROJECT, jobs=1)
+        streamed = list(iter_scan(SAMPLE_PROJECT, jobs=1))
+
+        assert [r.file_path for r in streamed] == sorted(r.file_path for r in streamed)
+        assert [n for r in streamed for n in r.nodes] == collected.nodes
+        assert [e for r in streamed for e in r.edges] == collected.edges
+
+    def test_results_are_yielded_before_the_scan_ends(self, tmp_path, monkeypatch):
+        """Test that the first file's result arrives before later files are parsed."""
+        (tmp_path / "a.py").write_text("def a():\n    pass\n")
+        (tmp_path / "b.py").write_text("def b():\n    pass\n")
+        parsed = []
+        extract = builder.extract_with_backend
+
+        def recording_extract(source, module_name, backend, known_hashes=None, digest=None):
+            parsed.append(module_name)
+            return extract(source, module_name, backend, known_hashes, digest)
+
+        monkeypatch.setattr(builder, "extract_with_backend", recording_extract)
+        results = iter_scan(tmp_path, jobs=1)
+        first = next(results)
+
+        assert [n.name for n in first.nodes] == ["a"]
+        assert parsed == ["a"]
+        assert [n.name for r in results for n in r.nodes] == ["b"]
+
+    def test_errors_and_cache_hits_are_reported_per_file(self, tmp_path):
+        """Test the error, cached and timing fields of per-file results."""
+        project = tmp_path / "project"
+        project.mkdir()
+        (project / "bad.py").write_text("def broken(\n")
+        (project / "good.py").write_text("def ok():\n    return 1\n")
+        db = Database(tmp_path / "gen-d.db")
+
+        bad, good = iter_scan(project, jobs=1, database=db)
+        assert not bad.ok and bad.nodes == []
+        assert good.ok and not good.cached and good.parse_seconds > 0
+
+        _, good_again = iter_scan(project, jobs=1, database=db)
+        assert good_again.cached and good_again.parse_seconds == 0
+        assert good_again.nodes == good.nodes
+
+
+class TestFileDiscovery:
+    """Tests for the pruning directory walker."""
+
+    @staticmethod
+    def _make_tree(root):
+        for relative in [
+            "pkg/__init__.py",
+            "pkg/core.py",
+            "pkg/test_core.py",
+            "pkg/__pycache__/core.py",
+            ".venv/lib/site.py",
+            "node_modules/x/setup.py",
+            "build/gen.py",
+            "notes.txt",
+        ]:
+            path = root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("")
+
+    def test_default_patterns_skip_tool_directories(self, tmp_path):
+        """Test that hidden, cache and node_modules trees are not scanned."""
+        self._make_tree(tmp_path)
+
+        files = [p.relative_to(tmp_path).as_posix() for p in iter_python_files(tmp_path)]
+
+        assert files == ["build/gen.py", "pkg/__init__.py", "pkg/core.py", "pkg/test_core.py"]
+
+    def test_excluded_directories_are_not_entered(self, tmp_path, monkeypatch):
+        """Test that an excluded directory is pruned rather than filtered."""
+        self._make_tree(tmp_path)
+        scanned = []
+        scandir = os.scandir
+
+        def recording_scandir(path):
+            scanned.append(Path(path).relative_to(tmp_path).as_posix())
+            return scandir(path)
+
+        monkeypatch.setattr(os, "scandir", recording_scandir)
+        list(iter_python_files(tmp_path, ["/build", "**/.*"]))
+
+        assert "build" not in scanned
+        assert ".venv" not in scanned
+        assert "pkg" in scanned
+
+    def test_relative_patterns_match_at_any_depth(self):
+        """Test pattern anchoring and ** semantics."""
+        matcher = PathMatcher(["test_*.py", "/build", "docs/**/*.py"])
+
+        assert matcher.excludes_file("test_a.py")
+        assert matcher.excludes_file("pkg/sub/test_a.py")
+        assert matcher.excludes_dir("build")
+        assert not matcher.excludes_dir("pkg/build")
+        assert matcher.excludes_file("docs/conf.py")
+        assert matcher.excludes_file("docs/a/b/conf.py")
+        assert not matcher.excludes_file("pkg/docsconf.py")
+
+    def test_directory_scan_uses_exclude_patterns(self, tmp_path):
+        """Test that build_graph_from_directory honours exclude patterns."""
+        (tmp_path / "keep.py").write_text("def keep():\n    pass\n")
+        (tmp_path / "gen").mkdir()
+        (tmp_path / "gen" / "skip.py").write_text("def skip():\n    pass\n")
+
+        result = build_graph_from_directory(tmp_path, exclude_patterns=["gen"], jobs=1)
+
+        assert [node.name for node in result.nodes] == ["keep"]
+
+
+class TestGitignore:
+    """Tests for .gitignore-aware file discovery."""
+
+    @staticmethod
+    def _files(root, **kwargs):
+        return [p.relative_to(root).as_posix() for p in iter_python_files(root, **kwargs)]
+
+    @staticmethod
+    def _write(root, files):
+        for relative, content in files.items():
+            path = root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+
+    def test_rule_semantics(self):
+        """Test negation, directory-only and anchored rules."""
+        rules = IgnoreFile(["# comment", "*_pb2.py", "!keep_pb2.py", "build/", "/top.py"])
+
+        assert rules.match("api/msg_pb2.py", is_dir=False) is True
+        assert rules.match("api/keep_pb2.py", is_dir=False) is False
+        assert rules.match("src/build", is_dir=True) is True
+        assert rules.match("src/build", is_dir=False) is None
+        assert rules.match("top.py", is_dir=False) is True
+        assert rules.match("pkg/top.py", is_dir=False) is None
+
+    def test_nested_gitignore_and_gendignore(self, tmp_path):
+        """Test that nested .gitignore and .gendignore files are honoured."""
+        self._write(
+            tmp_path,
+            {
+                ".gitignore": "build/\n*_pb2.py\n",
+                ".gendignore": "scripts/\n",
+                "app.py": "",
+                "api/msg_pb2.py": "",
+                "build/out.py": "",
+                "scripts/tool.py": "",
+                "pkg/.gitignore": "generated.py\n!msg_pb2.py\n",
+                "pkg/generated.py": "",
+                "pkg/msg_pb2.py": "",
+                "pkg/core.py": "",
+            },
+        )
+
+        assert self._files(tmp_path) == ["app.py", "pkg/core.py", "pkg/msg_pb2.py"]
+        assert len(self._files(tmp_path, respect_gitignore=False)) == 7
+
+    def test_rules_above_walk_root_and_info_exclude(self, tmp_path):
+        """Test that repository-level rules apply when scanning a subdirectory."""
+        self._write(
+            tmp_path,
+            {
+                ".git/info/exclude": "local.py\n",
+                ".gitignore": "src/vendor/\n",
+                "src/local.py": "",
+                "src/main.py": "",
+                "src/vendor/lib.py": "",
+            },
+        )
+
+        assert self._files(tmp_path / "src") == ["main.py"]
+
+    def test_git_directory_is_never_scanned(self, tmp_path):
+        """Test that .git is skipped even without the default exclusions."""
+        self._write(tmp_path, {".git/hooks/hook.py": "", "mod.py": ""})
+
+        assert self._files(tmp_path, exclude_patterns=[]) == ["mod.py"]
+
+
+class TestParseCache:
+    """Tests for the content-digest parse cache used by directory scans."""
+
+    def test_cached_scan_matches_fresh_scan(self, tmp_path):
+        """Test that results served from the cache equal a fresh scan."""
+        db = Database(tmp_path / "gen-d.db")
+
+        fresh = build_graph_from_directory(SAMPLE_PROJECT, jobs=1)
+        first = build_graph_from_directory(SAMPLE_PROJECT, jobs=1, database=db)
+        second = build_graph_from_directory(SAMPLE_PROJECT, jobs=1, database=db)
+
+        assert first.nodes == fresh.nodes
+        assert second.nodes == fresh.nodes
+        assert second.edges == fresh.edges
+
+    def test_unchanged_files_skip_parsing(self, tmp_path, monkeypatch):
+        """Test that a warm cache never invokes the parser."""
+        db = Database(tmp_path / "gen-d.db")
+        build_graph_from_directory(SAMPLE_PROJECT, jobs=1, database=db)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("parser should not run for cached files")
+
+        monkeypatch.setattr(builder, "extract_with_backend", fail)
+
+        result = build_graph_from_directory(SAMPLE_PROJECT, jobs=1, database=db)
+
+        assert result.error_count == 0
+        assert result.files_scanned == 3
+
+    def test_changed_file_is_reparsed(self, tmp_path):
+        """Test that editing a file invalidates its cache entry."""
+        project = tmp_path / "project"
+        project.mkdir()
+        module = project / "mod.py"
+        module.write_text("def f():\n    return 1\n")
+        db = Database(tmp_path / "gen-d.db")
+
+        before = build_graph_from_directory(project, jobs=1, database=db)
+        module.write_text("def f():\n    return 2\n")
+        after = build_graph_from_directory(project, jobs=1, database=db)
+
+        assert before.nodes[0].semantic_hash != after.nodes[0].semantic_hash
+
+    def test_cache_key_depends_on_versions(self, monkeypatch):
+        """Test that a different gen-d or LibCST version changes the cache key."""
+        key = builder._cache_key(hashlib.sha256(b"def f(): pass\n").hexdigest(), "mod")
+
+        monkeypatch.setattr(builder, "_CACHE_VERSION", "gen-d 9.9.9; libcst 0.0.0")
+
+        assert builder._cache_key(hashlib.sha256(b"def f(): pass\n").hexdigest(), "mod") != key
+
+
+class TestRawHashGate:
+    """Tests for reusing stored semantic hashes of functions whose source is unchanged."""
+
+    def test_only_edited_functions_are_normalized(self, tmp_path, monkeypatch):
+        """Test that a rescan normalizes only the functions whose text changed."""
+        from engine.parser import extractor
+
+        project = tmp_path / "project"
+        project.mkdir()
+        module = project / "mod.py"
+        module.write_text("def f():\n    return 1\n\n\ndef g():\n    return 2\n")
+        db = Database(tmp_path / "gen-d.db")
+        db.save_scan(str(project), iter_scan(project, jobs=1, database=db))
+
+        hashed = []
+        compute = extractor.compute_function_hashes
+
+        def counting_hash(node, digest):
+            hashed.append(node.name.value)
+            return compute(node, digest)
+
+        monkeypatch.setattr(extractor, "compute_function_hashes", counting_hash)
+        module.write_text("def f():\n    return 1\n\n\ndef g():\n    return 3\n")
+        rescanned = build_graph_from_directory(project, jobs=1, database=db)
+
+        assert hashed == ["g"]
+        monkeypatch.undo()
+        assert rescanned.nodes == build_graph_from_directory(project, jobs=1).nodes
+
+    def test_nodes_store_raw_hashes(self, tmp_path):
+        """Test that scanned nodes carry the raw hash of their source text."""
+        db = Database(tmp_path / "gen-d.db")
+        db.save_scan(str(SAMPLE_PROJECT), iter_scan(SAMPLE_PROJECT, jobs=1, database=db))
+
+        snapshots = db.load_snapshots()
+        assert snapshots
+        assert all(len(snapshot.raw_hash) == 64 for snapshot in snapshots.values())
+
+
+class TestDigestSelection:
+    """Tests for scanning with a non-default digest."""
+
+    def test_scan_uses_digest_and_scheme(self, tmp_path):
+        """Test that nodes carry digest-sized hashes and a qualified scheme."""
+        from engine.hash import Digest
+
+        db = Database(tmp_path / "gen-d.db")
+        digest = Digest.from_name("blake2b-16")
+        default = build_graph_from_directory(SAMPLE_PROJECT, jobs=1, database=db)
+        result = build_graph_from_directory(SAMPLE_PROJECT, jobs=1, database=db, digest=digest)
+
+        # The parse cache is keyed by digest, so nothing is served across digests
+        documented = [n for n in result.nodes if n.doc_hash]
+        assert documented
+        assert {n.hash_scheme for n in result.nodes} == {"cst-v1+blake2b-16"}
+        assert all(len(n.semantic_hash) == 32 for n in result.nodes)
+        assert all(len(n.doc_hash) == 32 for n in documented)
+        assert all(len(n.semantic_hash) == 64 for n in default.nodes)
+
+
+class TestStatManifest:
+    """Tests for the stat manifest that lets scans skip reading files."""
+
+    @staticmethod
+    def _old_project(tmp_path):
+        """Create a project whose files are outside the racy mtime window."""
+        project = tmp_path / "project"
+        project.mkdir()
+        module = project / "mod.py"
+        module.write_text("def f():\n    return g()\n\ndef g():\n    pass\n")
+        os.utime(module, ns=(1_000_000_000, 1_000_000_000))
+        return project, module
+
+    def test_unchanged_files_are_not_read(self, tmp_path, monkeypatch):
+        """Test that a file with an unchanged stat tuple is never opened."""
+        project, _ = self._old_project(tmp_path)
+        db = Database(tmp_path / "gen-d.db")
+        first = build_graph_from_directory(project, jobs=1, database=db)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("unchanged file should not be read")
+
+        monkeypatch.setattr(builder, "_read_file", fail)
+        second = build_graph_from_directory(project, jobs=1, database=db)
+
+        assert second.error_count == 0
+        assert second.nodes == first.nodes
+        assert second.edges == first.edges
+
+    def test_paranoid_scan_reads_every_file(self, tmp_path, monkeypatch):
+        """Test that --paranoid ignores the manifest."""
+        project, _ = self._old_project(tmp_path)
+        db = Database(tmp_path / "gen-d.db")
+        build_graph_from_directory(project, jobs=1, database=db)
+
+        reads = []
+        read_file = builder._read_file
+
+        def counting_read(file_path, *args):
+            reads.append(file_path)
+            return read_file(file_path, *args)
+
+        monkeypatch.setattr(builder, "_read_file", counting_read)
+        build_graph_from_directory(project, jobs=1, database=db, paranoid=True)
+
+        assert len(reads) == 1
+
+    def test_changed_stat_tuple_is_reread(self, tmp_path):
+        """Test that a new mtime causes the file to be read and re-hashed."""
+        project, module = self._old_project(tmp_path)
+        db = Database(tmp_path / "gen-d.db")
+        before = build_graph_from_directory(project, jobs=1, database=db)
+
+        module.write_text("def f():\n    return h()\n\ndef g():\n    pass\n")
+        os.utime(module, ns=(2_000_000_000, 2_000_000_000))
+        after = build_graph_from_directory(project, jobs=1, database=db)
+
+        assert before.nodes[0].semantic_hash != after.nodes[0].semantic_hash
+
+    def test_recently_modified_files_are_not_trusted(self, tmp_path):
+        """Test that files modified within the racy window stay out of the manifest."""
+        project = tmp_path / "project"
+        project.mkdir()
+        (project / "mod.py").write_text("def f():\n    pass\n")
+        db = Database(tmp_path / "gen-d.db")
+
+        build_graph_from_directory(project, jobs=1, database=db)
+
+        assert db.load_manifest() == {}
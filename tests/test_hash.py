@@ -4,20 +4,67 @@ Tests for the semantic hashing module.
 Tests hash stability, normalization, and semantic equivalence.
 """
 
+import ast
+import subprocess
+import sys
+
 import pytest
+import libcst as cst
 from engine.hash import (
+    AST_HASH_SCHEME,
+    CST_HASH_SCHEME,
+    DEFAULT_DIGEST,
+    Digest,
+    canonical_ast_dump,
+    compute_ast_hash,
+    compute_ast_hash_for_node,
+    compute_ast_function_hashes,
+    compute_function_hashes,
+    compute_hash_with_scheme,
+    compute_semantic_hashes,
+    compute_rollups,
+    changed_files,
     compute_semantic_hash,
     compute_doc_hash,
+    compute_hash_for_node,
+    compute_raw_hash,
+    qualified_scheme,
     normalize_function_code,
+    normalize_function_node,
     DocstringRemover,
+    SemanticNormalizer,
+    SimilarityIndex,
+    compute_minhash,
+    estimate_similarity,
 )
+from engine.hash import semantic_hash
+from engine.hash.semantic_hash import CommentRemover, HashingCodegenState, WhitespaceNormalizer
+from engine.models import CodeNode
+from tests import fixtures
 from tests.fixtures import (
     SEMANTICALLY_EQUIVALENT_1,
     SEMANTICALLY_EQUIVALENT_2,
     SEMANTICALLY_DIFFERENT,
+    CLASS_WITH_METHODS,
+    NESTED_FUNCTIONS,
+    DECORATED_FUNCTION,
+    FUNCTION_WITH_LEADING_TRIVIA,
 )
 
 
+def _function_nodes(source: str) -> list[cst.FunctionDef]:
+    """Collect every FunctionDef node in a parsed module, nested ones included."""
+    nodes: list[cst.FunctionDef] = []
+
+    class _Collector(cst.CSTVisitor):
+        def visit_FunctionDef(self, node: cst.FunctionDef) -> bool:
+            nodes.append(node)
+            return True
+
+    cst.parse_module(source).visit(_Collector())
+    return nodes
+
+
 class TestSemanticHashStability:
     """Tests for hash stability across non-behavioral changes."""
 
@@ -130,6 +177,176 @@ def documented_only():
         assert "pass" in normalized
 
 
+class TestNodeHashing:
+    """Tests for hashing functions straight from parsed CST nodes."""
+
+    @pytest.mark.parametrize(
+        "source",
+        [
+            CLASS_WITH_METHODS,
+            NESTED_FUNCTIONS,
+            DECORATED_FUNCTION,
+            FUNCTION_WITH_LEADING_TRIVIA,
+        ],
+    )
+    def test_node_hash_matches_source_hash(self, source):
+        """Test that node hashes equal hashes of the re-rendered function source."""
+        for node in _function_nodes(source):
+            function_source = cst.Module(body=[node]).code
+
+            assert normalize_function_node(node) == normalize_function_code(function_source)
+            assert compute_hash_for_node(node) == compute_semantic_hash(function_source)
+
+    def test_string_input_still_supported(self):
+        """Test that compute_hash_for_node accepts plain source strings."""
+        code = "def f(): pass"
+
+        assert compute_hash_for_node(code) == compute_semantic_hash(code)
+
+
+def _three_pass_normalize(module: cst.Module) -> str:
+    """Reference pipeline: the three transformers applied in sequence."""
+    module = module.visit(DocstringRemover())
+    module = module.visit(CommentRemover())
+    module = module.visit(WhitespaceNormalizer())
+    return module.code
+
+
+def _differential_corpus() -> list[str]:
+    """All fixture snippets plus the sample project sources."""
+    from pathlib import Path
+
+    corpus = [
+        value
+        for name, value in vars(fixtures).items()
+        if name.isupper() and isinstance(value, str)
+    ]
+    sample_dir = Path(__file__).parent / "fixtures" / "sample_project"
+    corpus.extend(path.read_text(encoding="utf-8") for path in sorted(sample_dir.glob("*.py")))
+    return corpus
+
+
+class TestFusedNormalizer:
+    """Differential tests: the fused normalizer against the three-pass pipeline."""
+
+    @pytest.mark.parametrize("source", _differential_corpus())
+    def test_module_output_identical(self, source):
+        """Test byte-identical output when normalizing whole modules."""
+        module = cst.parse_module(source)
+
+        assert module.visit(SemanticNormalizer()).code == _three_pass_normalize(module)
+
+    @pytest.mark.parametrize("source", _differential_corpus())
+    def test_function_output_identical(self, source):
+        """Test byte-identical output for every function in the corpus."""
+        for node in _function_nodes(source):
+            function_module = cst.parse_module(cst.Module(body=[node]).code)
+
+            assert normalize_function_node(node) == _three_pass_normalize(function_module)
+
+    def test_normalize_function_code_uses_fused_pass(self, monkeypatch):
+        """Test that normalization traverses the tree only once."""
+        visits = []
+        original_visit = cst.Module.visit
+
+        def counting_visit(self, visitor):
+            visits.append(type(visitor).__name__)
+            return original_visit(self, visitor)
+
+        monkeypatch.setattr(cst.Module, "visit", counting_visit)
+
+        normalize_function_code(SEMANTICALLY_EQUIVALENT_1)
+
+        assert visits == ["SemanticNormalizer"]
+
+
+class TestStreamingHash:
+    """Tests for hashing normalized code without rendering it."""
+
+    @pytest.mark.parametrize(
+        "source", _differential_corpus() + ["", "def f():\n    return 'ünï'\n"]
+    )
+    def test_hashes_match_rendered_code(self, source):
+        """Test that streamed hashes equal hashes of the rendered code."""
+        import hashlib
+
+        digest = Digest.from_name("blake2b-16")
+
+        assert compute_semantic_hash(source) == hashlib.sha256(
+            normalize_function_code(source).encode("utf-8")
+        ).hexdigest()
+        assert compute_semantic_hash(source, digest) == digest.hexdigest(
+            normalize_function_code(source).encode("utf-8")
+        )
+        for node in _function_nodes(source):
+            assert compute_hash_for_node(node) == hashlib.sha256(
+                normalize_function_node(node).encode("utf-8")
+            ).hexdigest()
+
+    def test_state_buffers_one_token(self):
+        """Test that code generation never holds more than one token."""
+        import hashlib
+
+        sizes = []
+
+        class RecordingState(HashingCodegenState):
+            def add_token(self, value):
+                super().add_token(value)
+                sizes.append(len(self.tokens))
+
+        module = cst.parse_module(SEMANTICALLY_EQUIVALENT_1)
+        state = RecordingState(hashlib.sha256(), module.default_indent, module.default_newline)
+        module._codegen(state)
+        state.flush()
+
+        assert sizes and max(sizes) == 1
+        assert state.tokens == []
+
+    def test_rendering_fallback_gives_same_hashes(self, monkeypatch):
+        """Test that hashing rendered code, used if streaming breaks, changes nothing."""
+        sources = _differential_corpus()
+        streamed = [compute_semantic_hash(source) for source in sources]
+
+        monkeypatch.setattr(semantic_hash, "STREAMING", False)
+
+        assert [compute_semantic_hash(source) for source in sources] == streamed
+
+    def test_missing_private_api_disables_streaming(self, monkeypatch):
+        """Test that the streaming check fails when LibCST internals change."""
+        assert semantic_hash._streaming_supported()
+
+        def removed(self, state):
+            raise AttributeError("_codegen")
+
+        monkeypatch.setattr(cst.Module, "_codegen", removed)
+
+        assert not semantic_hash._streaming_supported()
+
+    def test_streaming_checked_on_first_use(self, monkeypatch):
+        """Test that the streaming check runs lazily, once, and without warnings."""
+        code = "import engine.hash.semantic_hash as s; print(s.STREAMING)"
+        result = subprocess.run(
+            [sys.executable, "-W", "error::RuntimeWarning", "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.strip() == "None"
+
+        calls = []
+        monkeypatch.setattr(semantic_hash, "STREAMING", None)
+        monkeypatch.setattr(
+            semantic_hash,
+            "_streaming_supported",
+            lambda: calls.append(1) or True,
+        )
+        compute_semantic_hash(SEMANTICALLY_EQUIVALENT_1)
+        compute_semantic_hash(SEMANTICALLY_EQUIVALENT_2)
+
+        assert calls == [1]
+        assert semantic_hash.STREAMING is True
+
+
 class TestDocHash:
     """Tests for docstring hashing."""
 
@@ -201,3 +418,379 @@ def outer():
         hash2 = compute_semantic_hash(code2)
 
         assert hash1 != hash2
+
+
+class TestAstHashScheme:
+    """Tests for the ast-v1 hash scheme."""
+
+    def test_ast_hash_ignores_formatting_comments_and_docstrings(self):
+        """Test that ast-v1 has the same invariances as cst-v1."""
+        reformatted = "def compute(x,y):\n    # comment\n    return (x+y)\n"
+
+        assert compute_ast_hash(SEMANTICALLY_EQUIVALENT_1) == compute_ast_hash(
+            SEMANTICALLY_EQUIVALENT_2
+        )
+        assert compute_ast_hash(SEMANTICALLY_EQUIVALENT_1) == compute_ast_hash(reformatted)
+        assert compute_ast_hash(SEMANTICALLY_EQUIVALENT_1) != compute_ast_hash(
+            SEMANTICALLY_DIFFERENT
+        )
+
+    def test_nested_docstrings_removed(self):
+        """Test that docstrings of nested functions and classes are ignored."""
+        code1 = '''
+def outer():
+    class Inner:
+        """Class docs."""
+        def method(self):
+            """Method docs."""
+            return 1
+    return Inner
+'''
+        code2 = '''
+def outer():
+    class Inner:
+        def method(self):
+            return 1
+    return Inner
+'''
+        assert compute_ast_hash(code1) == compute_ast_hash(code2)
+
+    def test_docstring_only_body_hashes_as_pass(self):
+        """Test that removing the only statement leaves an empty-body function."""
+        assert compute_ast_hash('def f():\n    """Docs."""\n') == compute_ast_hash(
+            "def f():\n    pass\n"
+        )
+
+    def test_constants_keep_their_type(self):
+        """Test that equal-valued constants of different types hash differently."""
+        values = ("1", "1.0", "True", "'1'")
+        hashes = {compute_ast_hash(f"def f():\n    return {value}\n") for value in values}
+        assert len(hashes) == 4
+
+    def test_node_hash_matches_source_hash(self):
+        """Test that hashing a parsed function equals hashing its source."""
+        source = '@cache\ndef f(x):\n    """Docs."""\n    return x\n'
+        node = ast.parse(source).body[0]
+        assert compute_ast_hash_for_node(node) == compute_ast_hash(source)
+
+    def test_dump_omits_positions_and_empty_fields(self):
+        """Test the canonical dump format."""
+        node = ast.parse("def f(): return x").body[0]
+        assert canonical_ast_dump(node) == (
+            "FunctionDef(name='f',args=arguments(),"
+            "body=[Return(value=Name(id='x',ctx=Load(),),),],)"
+        )
+
+    def test_compute_hash_with_scheme(self):
+        """Test dispatch on the scheme identifier."""
+        source = SEMANTICALLY_EQUIVALENT_1
+        assert compute_hash_with_scheme(source, CST_HASH_SCHEME) == compute_semantic_hash(source)
+        assert compute_hash_with_scheme(source, AST_HASH_SCHEME) == compute_ast_hash(source)
+        assert compute_hash_with_scheme(source, AST_HASH_SCHEME) != compute_hash_with_scheme(
+            source, CST_HASH_SCHEME
+        )
+
+        with pytest.raises(ValueError, match="Unknown hash scheme"):
+            compute_hash_with_scheme(source, "cst-v0")
+
+    def test_models_import_without_hash_package(self):
+        """Test that the data models do not load LibCST or the hash package."""
+        code = (
+            "import sys, engine.models; "
+            "print('libcst' in sys.modules, 'engine.hash' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.split() == ["False", "False"]
+
+
+def _node(file_path: str, name: str, semantic_hash: str = "h", class_name=None, line=1):
+    """A CodeNode for rollup tests."""
+    qualified = f"{class_name}.{name}" if class_name else name
+    return CodeNode(
+        id=f"{file_path}:{qualified}",
+        name=name,
+        file_path=file_path,
+        start_line=line,
+        end_line=line,
+        semantic_hash=semantic_hash,
+        is_method=class_name is not None,
+        class_name=class_name,
+    )
+
+
+class TestRollupHashes:
+    """Tests for Merkle-style rollup hashes."""
+
+    NODES = [
+        _node("/p/pkg/a.py", "f"),
+        _node("/p/pkg/a.py", "m", class_name="C"),
+        _node("/p/pkg/sub/b.py", "g"),
+        _node("/p/c.py", "h"),
+    ]
+
+    def test_hierarchy_levels(self):
+        """Test that methods roll up into classes, files, directories and the root."""
+        rollups = compute_rollups(self.NODES, "/p")
+
+        assert {path: entry.kind for path, entry in rollups.items()} == {
+            "": "project",
+            "pkg": "directory",
+            "pkg/sub": "directory",
+            "pkg/a.py": "file",
+            "pkg/a.py::C": "class",
+            "pkg/sub/b.py": "file",
+            "c.py": "file",
+        }
+        assert rollups["pkg/a.py::C"].parent == "pkg/a.py"
+        assert rollups["pkg/sub"].parent == "pkg"
+        assert rollups[""].parent is None
+
+    def test_rollups_ignore_order_and_positions(self):
+        """Test that scan order and line moves do not change any rollup."""
+        moved = [_node(n.file_path, n.name, class_name=n.class_name, line=9) for n in self.NODES]
+
+        assert compute_rollups(reversed(moved), "/p") == compute_rollups(self.NODES, "/p")
+
+    def test_change_propagates_to_ancestors_only(self):
+        """Test that a method change alters exactly its class and ancestors."""
+        edited = list(self.NODES)
+        edited[1] = _node("/p/pkg/a.py", "m", "changed", class_name="C")
+        before = compute_rollups(self.NODES, "/p")
+        after = compute_rollups(edited, "/p")
+
+        differing = {path for path in before if before[path] != after[path]}
+        assert differing == {"", "pkg", "pkg/a.py", "pkg/a.py::C"}
+
+    def test_changed_files(self):
+        """Test the descent into subtrees whose rollups differ."""
+        stored = compute_rollups(self.NODES, "/p")
+        edited = list(self.NODES)
+        edited[2] = _node("/p/pkg/sub/b.py", "g", "changed")
+        edited.append(_node("/p/new.py", "n"))
+
+        assert changed_files(stored, stored) == set()
+        assert changed_files(stored, compute_rollups(edited, "/p")) == {
+            "/p/pkg/sub/b.py",
+            "/p/new.py",
+        }
+        assert changed_files({}, stored) == {"/p/pkg/a.py", "/p/pkg/sub/b.py", "/p/c.py"}
+
+
+class TestBatchHashing:
+    """Tests for compute_semantic_hashes."""
+
+    SOURCES = [
+        SEMANTICALLY_EQUIVALENT_1,
+        SEMANTICALLY_DIFFERENT,
+        SEMANTICALLY_EQUIVALENT_1,
+        *(f"def f{i}(x):\n    return x + {i}\n" for i in range(70)),
+    ]
+
+    def test_serial_matches_single_hashes(self):
+        """Test that results equal per-source hashes, in input order."""
+        expected = [compute_semantic_hash(source) for source in self.SOURCES]
+
+        assert compute_semantic_hashes(self.SOURCES, jobs=1) == expected
+
+    def test_parallel_matches_serial(self):
+        """Test that the process pool returns the same hashes in the same order."""
+        expected = compute_semantic_hashes(self.SOURCES, jobs=1)
+
+        assert compute_semantic_hashes(self.SOURCES, jobs=2) == expected
+
+    def test_duplicates_hashed_once(self, monkeypatch):
+        """Test that identical sources are only normalized once."""
+        from engine.hash import schemes
+
+        calls = []
+        monkeypatch.setitem(
+            schemes.HASH_SCHEMES,
+            CST_HASH_SCHEME,
+            lambda source, digest: calls.append(source) or "h",
+        )
+
+        assert compute_semantic_hashes(["a", "b", "a", "a"], jobs=1) == ["h"] * 4
+        assert calls == ["a", "b"]
+
+    def test_scheme_and_errors(self):
+        """Test scheme selection and that errors propagate."""
+        assert compute_semantic_hashes([SEMANTICALLY_EQUIVALENT_1], scheme=AST_HASH_SCHEME) == [
+            compute_ast_hash(SEMANTICALLY_EQUIVALENT_1)
+        ]
+        assert compute_semantic_hashes([]) == []
+
+        with pytest.raises(ValueError):
+            compute_semantic_hashes([], scheme="nope")
+        with pytest.raises(cst.ParserSyntaxError):
+            compute_semantic_hashes(["def broken("], jobs=1)
+
+
+class TestDigests:
+    """Tests for the configurable digest algorithm."""
+
+    def test_names_round_trip(self):
+        """Test parsing digest names and their canonical form."""
+        assert Digest.from_name("sha256") == DEFAULT_DIGEST
+        assert Digest.from_name("BLAKE2b") == Digest("blake2b", 32)
+        assert Digest.from_name("blake2b-16").name == "blake2b-16"
+        assert Digest.from_name("blake2b-32").name == "blake2b"
+
+    @pytest.mark.parametrize("name", ["md5", "blake2b-4", "blake2b-65", "blake2b-x", "sha256-16"])
+    def test_invalid_names_rejected(self, name):
+        """Test that unsupported algorithms and sizes raise ValueError."""
+        with pytest.raises(ValueError):
+            Digest.from_name(name)
+
+    def test_default_digest_is_sha256(self):
+        """Test that the default digest keeps hashes of earlier versions."""
+        import hashlib
+
+        assert compute_raw_hash("x") == hashlib.sha256(b"x").hexdigest()
+        assert qualified_scheme(CST_HASH_SCHEME) == CST_HASH_SCHEME
+
+    def test_blake2b_digest_size(self):
+        """Test that every hash function honours the digest size."""
+        digest = Digest.from_name("blake2b-16")
+        code = "def f(x):\n    return x"
+
+        hashes = [
+            compute_semantic_hash(code, digest),
+            compute_ast_hash(code, digest),
+            compute_doc_hash("Docs.", digest),
+            compute_raw_hash(code, digest),
+            compute_semantic_hashes([code], jobs=1, digest=digest)[0],
+        ]
+
+        assert all(len(value) == 32 for value in hashes)
+        assert hashes[0] != compute_semantic_hash(code)[:32]
+        assert qualified_scheme(CST_HASH_SCHEME, digest) == "cst-v1+blake2b-16"
+
+
+_ORIGINAL = """
+def load_config(path, defaults=None):
+    \"\"\"Load settings from a file.\"\"\"
+    settings = dict(defaults or {})
+    with open(path) as handle:
+        for line in handle:
+            key, _, value = line.partition("=")
+            settings[key.strip()] = value.strip()
+    return settings
+"""
+
+
+class TestSimilarity:
+    """Tests for MinHash signatures and the LSH similarity index."""
+
+    def test_rename_and_reformat_keep_signature(self):
+        """Test that names, comments, layout and strings do not matter."""
+        renamed = _ORIGINAL.replace("load_config", "read_settings").replace(
+            "Load settings from a file.", "Read the settings file."
+        ).replace('"=")', "'=')  # separator")
+
+        assert compute_minhash(renamed) == compute_minhash(_ORIGINAL)
+
+    def test_small_edit_stays_similar(self):
+        """Test that a one-line change keeps most signature values."""
+        edited = _ORIGINAL.replace("value.strip()", "value.strip().lower()")
+        unrelated = "def area(width, height):\n    return width * height\n"
+
+        assert 0.5 < estimate_similarity(compute_minhash(edited), compute_minhash(_ORIGINAL)) < 1
+        assert estimate_similarity(compute_minhash(unrelated), compute_minhash(_ORIGINAL)) < 0.3
+        assert compute_minhash("") is None
+
+    def test_index_finds_similar_functions(self):
+        """Test that queries return likely matches, most similar first."""
+        index = SimilarityIndex()
+        index.add("old.py:load_config", compute_minhash(_ORIGINAL))
+        index.add("old.py:area", compute_minhash("def area(w, h):\n    return w * h\n"))
+
+        matches = index.query(compute_minhash(_ORIGINAL.replace("load_config", "load")), 0.7)
+
+        assert matches == [("old.py:load_config", 1.0)]
+        assert len(index) == 2 and "old.py:area" in index
+
+
+_SECTIONED = """
+@cache
+def handler(request, retries=3) -> Response:
+    \"\"\"Handle a request.\"\"\"
+    return Response(request)
+"""
+
+
+class TestSectionHashes:
+    """Tests for signature, body and decorator hashes."""
+
+    @staticmethod
+    def _cst_hashes(source: str):
+        return compute_function_hashes(_function_nodes(source)[0])
+
+    @staticmethod
+    def _ast_hashes(source: str):
+        return compute_ast_function_hashes(ast.parse(source).body[0])
+
+    @pytest.mark.parametrize("scheme", ["cst", "ast"])
+    @pytest.mark.parametrize("edit,section", [
+        (("retries=3", "retries=5"), "signature"),
+        (("-> Response", "-> Reply"), "signature"),
+        (("def handler", "async def handler"), "signature"),
+        (("Response(request)", "Response(request, retries)"), "body"),
+        (("@cache", "@lru_cache"), "decorators"),
+    ])
+    def test_edit_changes_only_its_section(self, scheme, edit, section):
+        """Test that an edit changes the hash of its own section only."""
+        hashes = self._cst_hashes if scheme == "cst" else self._ast_hashes
+        before = hashes(_SECTIONED)
+        after = hashes(_SECTIONED.replace(*edit))
+
+        changed = {
+            name for name in ("signature", "body", "decorators")
+            if getattr(before, name) != getattr(after, name)
+        }
+        assert changed == {section}
+        assert before.semantic != after.semantic
+
+    def test_docstring_and_comments_change_nothing(self):
+        """Test that documentation edits leave every section unchanged."""
+        edited = _SECTIONED.replace("Handle a request.", "Handle it.").replace(
+            "    return", "    # reply\n    return"
+        )
+
+        assert self._cst_hashes(edited) == self._cst_hashes(_SECTIONED)
+        assert self._ast_hashes(edited) == self._ast_hashes(_SECTIONED)
+
+    def test_semantic_hash_matches_single_hash(self):
+        """Test that the semantic hash equals the one computed on its own."""
+        node = _function_nodes(_SECTIONED)[0]
+        tree = ast.parse(_SECTIONED).body[0]
+
+        assert compute_function_hashes(node).semantic == compute_hash_for_node(node)
+        assert compute_ast_function_hashes(tree).semantic == compute_ast_hash_for_node(tree)
+
+    @pytest.mark.parametrize("source", [_SECTIONED] + _differential_corpus())
+    def test_sections_match_rendered_slices(self, source, monkeypatch):
+        """Test that streamed section hashes hash the code_for_node slices of each section."""
+        import hashlib
+
+        for node in _function_nodes(source):
+            module = cst.Module(
+                header=node.leading_lines, body=[node.with_changes(leading_lines=())]
+            ).visit(semantic_hash.SemanticNormalizer())
+            function = module.body[0]
+            code = module.code_for_node(function)
+            decorators = "".join(module.code_for_node(d) for d in function.decorators)
+            body = module.code_for_node(function.body)
+            assert code.startswith(decorators) and code.endswith(body)
+
+            hashes = compute_function_hashes(node)
+            assert hashes.signature == hashlib.sha256(
+                code[len(decorators):len(code) - len(body)].encode("utf-8")
+            ).hexdigest()
+            assert hashes.body == hashlib.sha256(body.encode("utf-8")).hexdigest()
+            assert hashes.decorators == hashlib.sha256(decorators.encode("utf-8")).hexdigest()
+
+            monkeypatch.setattr(semantic_hash, "STREAMING", False)
+            assert compute_function_hashes(node) == hashes
+            monkeypatch.setattr(semantic_hash, "STREAMING", True)
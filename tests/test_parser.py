@@ -4,18 +4,27 @@ Tests for the parser module.
 Tests the LibCST-based function extraction and call detection.
 """
 
+from pathlib import Path
+
+import libcst as cst
 import pytest
+
 from engine.parser import (
-    extract_functions_from_source,
-    extract_calls_from_source,
     FunctionCollector,
+    backends,
+    extract_calls_from_source,
+    extract_functions_and_calls_from_source,
+    extract_functions_from_source,
 )
+from engine.parser.ast_extractor import extract_functions_and_calls_with_ast
+from engine.parser.backends import extract_with_backend
+from tests import fixtures
 from tests.fixtures import (
-    SIMPLE_FUNCTION,
-    FUNCTION_NO_DOCSTRING,
     CLASS_WITH_METHODS,
-    NESTED_FUNCTIONS,
+    FUNCTION_NO_DOCSTRING,
     FUNCTION_WITH_CALLS,
+    NESTED_FUNCTIONS,
+    SIMPLE_FUNCTION,
 )
 
 
@@ -94,6 +103,26 @@ class TestFunctionExtraction:
         assert functions[0].qualified_name == "mymodule.greet"
 
 
+    def test_semantic_hash_computed_during_extraction(self):
+        """Test that hashes from extraction match hashing the function source."""
+        from engine.hash import compute_semantic_hash
+
+        functions = extract_functions_from_source(CLASS_WITH_METHODS)
+
+        for func in functions:
+            assert func.semantic_hash == compute_semantic_hash(func.source_code)
+
+    def test_semantic_hash_can_be_disabled(self):
+        """Test that collectors can skip hashing entirely."""
+        import libcst as cst
+        from libcst.metadata import MetadataWrapper
+
+        collector = FunctionCollector(compute_hashes=False)
+        MetadataWrapper(cst.parse_module(SIMPLE_FUNCTION)).visit(collector)
+
+        assert collector.functions[0].semantic_hash == ""
+
+
 class TestCallExtraction:
     """Tests for function call extraction."""
 
@@ -131,6 +160,189 @@ def func():
         assert "func" in calls[0].caller_qualified_name
 
 
+class TestCombinedExtraction:
+    """Tests for single-parse extraction of functions and calls."""
+
+    def test_matches_separate_extractors(self):
+        """Test that combined extraction agrees with the individual extractors."""
+        for source in (CLASS_WITH_METHODS, NESTED_FUNCTIONS, FUNCTION_WITH_CALLS):
+            functions, calls = extract_functions_and_calls_from_source(
+                source, module_name="mod"
+            )
+
+            assert functions == extract_functions_from_source(source, module_name="mod")
+            assert calls == extract_calls_from_source(source, module_name="mod")
+
+    def test_parses_source_once(self, monkeypatch):
+        """Test that the source is parsed only once for both results."""
+        import libcst as cst
+
+        from engine.parser import extractor
+
+        parse_calls = []
+        original_parse = cst.parse_module
+
+        def counting_parse(source, *args, **kwargs):
+            parse_calls.append(source)
+            return original_parse(source, *args, **kwargs)
+
+        monkeypatch.setattr(extractor.cst, "parse_module", counting_parse)
+
+        functions, calls = extract_functions_and_calls_from_source(FUNCTION_WITH_CALLS)
+
+        assert len(parse_calls) == 1
+        assert len(functions) == 4
+        assert {c.callee_name for c in calls} >= {"fetch_data", "clean_data", "transform"}
+
+
+def _backend_corpus() -> list[str]:
+    """All fixture snippets plus the sample project sources."""
+    corpus = [
+        value
+        for name, value in vars(fixtures).items()
+        if name.isupper() and isinstance(value, str)
+    ]
+    sample_dir = Path(__file__).parent / "fixtures" / "sample_project"
+    corpus.extend(path.read_text(encoding="utf-8") for path in sorted(sample_dir.glob("*.py")))
+    return corpus
+
+
+def _function_fields(function):
+    """Everything the backends must agree on; hashes use different bases."""
+    return (
+        function.name,
+        function.qualified_name,
+        function.start_line,
+        function.end_line,
+        function.is_method,
+        function.class_name,
+        function.docstring,
+    )
+
+
+class TestParserBackends:
+    """Compatibility tests: the ast backend against the LibCST reference."""
+
+    @pytest.mark.parametrize("source", _backend_corpus())
+    def test_same_functions(self, source):
+        """Test that both backends report identical functions in the same order."""
+        libcst_functions, _ = extract_with_backend(source, "mod", backend="libcst")
+        ast_functions, _ = extract_with_backend(source, "mod", backend="ast")
+
+        assert [_function_fields(f) for f in ast_functions] == [
+            _function_fields(f) for f in libcst_functions
+        ]
+
+    @pytest.mark.parametrize("source", _backend_corpus())
+    def test_same_calls(self, source):
+        """Test that both backends report the same call sites."""
+        _, libcst_calls = extract_with_backend(source, "mod", backend="libcst")
+        _, ast_calls = extract_with_backend(source, "mod", backend="ast")
+
+        def key(call):
+            return call.call_line, call.caller_qualified_name, call.callee_name
+
+        assert sorted(ast_calls, key=key) == sorted(libcst_calls, key=key)
+
+    @pytest.mark.parametrize("backend", ["libcst", "ast"])
+    def test_fstring_docstrings(self, backend):
+        """Test that f-strings are no docstrings and add nothing to concatenated ones."""
+        from tests.fixtures import DOCSTRING_AND_CALL_VARIANTS
+
+        functions, _ = extract_with_backend(DOCSTRING_AND_CALL_VARIANTS, "mod", backend=backend)
+        docstrings = {f.name: f.docstring for f in functions}
+
+        assert docstrings["fstring_doc"] is None
+        assert docstrings["fstring_nested_doc"] is None
+        assert docstrings["fstring_concatenated_doc"] == "Plain part,  and tail."
+
+    def test_ast_hash_ignores_comments_and_docstrings(self):
+        """Test that the ast backend's hash has the semantic hash's invariances."""
+        from tests.fixtures import (
+            SEMANTICALLY_DIFFERENT,
+            SEMANTICALLY_EQUIVALENT_1,
+            SEMANTICALLY_EQUIVALENT_2,
+        )
+
+        def hash_of(source):
+            functions, _ = extract_functions_and_calls_with_ast(source)
+            return functions[0].semantic_hash
+
+        reformatted = "def compute(x,y):\n    # comment\n    return (x+y)\n"
+
+        assert hash_of(SEMANTICALLY_EQUIVALENT_1) == hash_of(SEMANTICALLY_EQUIVALENT_2)
+        assert hash_of(SEMANTICALLY_EQUIVALENT_1) == hash_of(reformatted)
+        assert hash_of(SEMANTICALLY_EQUIVALENT_1) != hash_of(SEMANTICALLY_DIFFERENT)
+
+    def test_known_hashes_are_reused(self):
+        """Test that a function with a known raw hash is not normalized again."""
+        from engine.hash import FunctionHashes, compute_raw_hash
+
+        source = "def f():\n    return 1\n"
+        functions, _ = extract_with_backend(source, backend="libcst")
+        raw_hash = functions[0].raw_hash
+
+        assert raw_hash == compute_raw_hash(functions[0].source_code)
+
+        stored = FunctionHashes("stored", "signature", "body", "decorators")
+        reused, _ = extract_with_backend(
+            source, backend="libcst", known_hashes={raw_hash: stored}
+        )
+        assert reused[0].semantic_hash == "stored"
+        assert (reused[0].signature_hash, reused[0].body_hash) == ("signature", "body")
+
+    @pytest.mark.parametrize("backend", ["libcst", "ast"])
+    def test_known_hashes_reuse_the_similarity_signature(self, backend, monkeypatch):
+        """Test that a raw-hash hit reuses the stored MinHash instead of shingling."""
+        from engine.hash import FunctionHashes
+        from engine.parser import ast_extractor, extractor
+
+        source = "def f():\n    return 1\n"
+        raw_hash = extract_with_backend(source, backend=backend)[0][0].raw_hash
+
+        def fail(source_code):
+            raise AssertionError("signature recomputed")
+
+        monkeypatch.setattr(extractor, "compute_minhash", fail)
+        monkeypatch.setattr(ast_extractor, "compute_minhash", fail)
+        stored = FunctionHashes("stored", "signature", "body", "decorators", minhash="ab" * 8)
+        reused, _ = extract_with_backend(
+            source, backend=backend, known_hashes={raw_hash: stored}
+        )
+
+        assert (reused[0].semantic_hash, reused[0].minhash) == ("stored", "ab" * 8)
+
+    def test_backends_record_their_hash_scheme(self):
+        """Test that each backend labels its hashes with its scheme."""
+        source = "def f():\n    return 1\n"
+
+        assert extract_with_backend(source, backend="libcst")[0][0].hash_scheme == "cst-v1"
+        assert extract_with_backend(source, backend="ast")[0][0].hash_scheme == "ast-v1"
+
+    def test_auto_falls_back_to_ast(self, monkeypatch):
+        """Test that auto uses ast when LibCST rejects a file."""
+        with pytest.raises(cst.ParserSyntaxError) as excinfo:
+            cst.parse_module("def (")
+
+        def reject(source, module_name="", known_hashes=None, digest=None):
+            raise excinfo.value
+
+        monkeypatch.setattr(backends, "extract_functions_and_calls_from_source", reject)
+        functions, _ = extract_with_backend(SIMPLE_FUNCTION, backend="auto")
+
+        assert [f.name for f in functions] == ["greet"]
+
+    def test_auto_reports_libcst_error_when_both_fail(self):
+        """Test that unparsable files still raise LibCST's syntax error."""
+        with pytest.raises(cst.ParserSyntaxError):
+            extract_with_backend("def broken(", backend="auto")
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            extract_with_backend(SIMPLE_FUNCTION, backend="tree-sitter")
+
+
 class TestEdgeCases:
     """Tests for edge cases and error handling."""
 
@@ -4,13 +4,16 @@ Tests for the storage module.
 Tests SQLite persistence operations.
 """
 
+import json
 import pytest
+import sqlite3
 import tempfile
 from pathlib import Path
 from datetime import datetime
 
-from engine.storage import Database, init_database
-from engine.models import CodeNode, CallEdge, NodeSnapshot, DriftStatus
+from engine.storage import Database, ManifestEntry, init_database
+from engine.models import CodeNode, CallEdge, FileScanResult, NodeSnapshot, DriftStatus
+from engine.parser.extractor import CallInfo, FunctionInfo
 
 
 @pytest.fixture
@@ -52,6 +55,103 @@ class TestDatabaseBasics:
         assert snapshot.semantic_hash == "abc123"
         assert snapshot.doc_hash == "doc456"
 
+    def test_hash_scheme_round_trips(self, temp_db):
+        """Test that the hash scheme identifier is stored with the hashes."""
+        node = CodeNode(
+            id="mod:func",
+            name="func",
+            file_path="mod.py",
+            start_line=1,
+            end_line=5,
+            semantic_hash="abc123",
+            hash_scheme="ast-v1",
+        )
+
+        assert temp_db.load_hash_schemes() == set()
+
+        temp_db.save_nodes([node])
+
+        assert temp_db.load_snapshots()["mod:func"].hash_scheme == "ast-v1"
+        assert temp_db.load_snapshot("mod:func").hash_scheme == "ast-v1"
+        assert temp_db.load_hash_schemes() == {"ast-v1"}
+
+    def test_old_database_migrated_to_cst_scheme(self, tmp_path):
+        """Test that nodes stored before hash schemes existed read as cst-v1."""
+        db_path = tmp_path / "old.db"
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE nodes (
+                    node_id TEXT PRIMARY KEY, file_path TEXT NOT NULL,
+                    start_line INTEGER NOT NULL, end_line INTEGER NOT NULL,
+                    semantic_hash TEXT NOT NULL, doc_hash TEXT,
+                    last_scanned TIMESTAMP NOT NULL, scan_id TEXT
+                )
+                """
+            )
+            conn.execute(
+                "INSERT INTO nodes VALUES ('mod:f', 'mod.py', 1, 2, 'abc', NULL, "
+                "'2024-01-01T00:00:00', NULL)"
+            )
+        conn.close()
+
+        snapshot = Database(db_path).load_snapshot("mod:f")
+
+        assert snapshot.hash_scheme == "cst-v1"
+        assert snapshot.semantic_hash == "abc"
+
+    def test_load_known_hashes(self, temp_db):
+        """Test the raw-to-semantic hash lookup used to skip normalization."""
+        from engine.hash import FunctionHashes
+
+        def node(name, file_path, scheme, raw_hash, sections=True):
+            return CodeNode(
+                id=f"{file_path}:{name}",
+                name=name,
+                file_path=file_path,
+                start_line=1,
+                end_line=2,
+                semantic_hash=f"sem-{name}",
+                hash_scheme=scheme,
+                raw_hash=raw_hash,
+                signature_hash=f"sig-{name}" if sections else None,
+                body_hash=f"body-{name}" if sections else None,
+                decorator_hash=f"dec-{name}" if sections else None,
+            )
+
+        temp_db.save_nodes([
+            node("f", "a.py", "cst-v1", "raw-f"),
+            node("g", "a.py", "ast-v1", "raw-g"),
+            node("h", "a.py", "cst-v1", None),
+            node("i", "b.py", "cst-v1", "raw-i"),
+            node("j", "a.py", "cst-v1", "raw-j", sections=False),
+        ])
+
+        assert temp_db.load_known_hashes(["a.py", "c.py"], "cst-v1") == {
+            "a.py": {"raw-f": FunctionHashes("sem-f", "sig-f", "body-f", "dec-f")}
+        }
+
+    def test_load_known_hashes_includes_minhash(self, temp_db):
+        """Test that known hashes carry the stored similarity signature."""
+        temp_db.save_nodes([
+            CodeNode(
+                id="a.py:f",
+                name="f",
+                file_path="a.py",
+                start_line=1,
+                end_line=2,
+                semantic_hash="sem-f",
+                hash_scheme="cst-v1",
+                raw_hash="raw-f",
+                minhash="00ff" * 8,
+                signature_hash="sig-f",
+                body_hash="body-f",
+                decorator_hash="dec-f",
+            )
+        ])
+
+        assert temp_db.load_known_hashes(["a.py"], "cst-v1")["a.py"]["raw-f"].minhash == "00ff" * 8
+
     def test_save_multiple_nodes(self, temp_db):
         """Test saving multiple nodes."""
         nodes = [
@@ -134,6 +234,356 @@ class TestEdgePersistence:
         assert temp_db.get_edge_count() == 3
 
 
+class TestFileCache:
+    """Tests for the per-file parse cache."""
+
+    def test_save_and_load_entries(self, temp_db):
+        """Test that cached functions and calls round-trip without source code."""
+        functions = [
+            FunctionInfo(
+                name="func",
+                qualified_name="mod.func",
+                start_line=1,
+                end_line=3,
+                docstring="Doc.",
+                source_code="def func(): ...",
+                semantic_hash="abc123",
+            )
+        ]
+        calls = [CallInfo(caller_qualified_name="mod.func", callee_name="g", call_line=2)]
+
+        temp_db.save_file_cache({"key1": (functions, calls)})
+        entries = temp_db.load_file_cache(["key1", "missing"])
+
+        assert list(entries) == ["key1"]
+        cached_functions, cached_calls = entries["key1"]
+        assert cached_functions[0].semantic_hash == "abc123"
+        assert cached_functions[0].docstring == "Doc."
+        assert cached_functions[0].source_code == ""
+        assert cached_calls == calls
+
+    def test_mismatched_entries_are_misses(self, temp_db):
+        """Test that entries not matching the current fields are skipped."""
+        temp_db.save_file_cache({"good": ([], []), "old": ([], []), "broken": ([], [])})
+        with sqlite3.connect(temp_db._db_path) as conn:
+            conn.execute(
+                "UPDATE file_cache SET payload = ? WHERE cache_key = 'old'",
+                (json.dumps({"functions": [{"name": "f", "removed_field": 1}], "calls": []}),),
+            )
+            conn.execute("UPDATE file_cache SET payload = '{}' WHERE cache_key = 'broken'")
+
+        assert list(temp_db.load_file_cache(["good", "old", "broken"])) == ["good"]
+
+    def test_prune_keeps_live_entries(self, temp_db):
+        """Test that pruning removes only entries not in use."""
+        temp_db.save_file_cache({"live": ([], []), "dead": ([], [])})
+
+        deleted = temp_db.prune_file_cache({"live"})
+
+        assert deleted == 1
+        assert list(temp_db.load_file_cache(["live", "dead"])) == ["live"]
+
+
+class TestFileManifest:
+    """Tests for the stat manifest of scanned files."""
+
+    def test_save_load_and_prune(self, temp_db):
+        """Test that manifest entries round-trip and prune by path."""
+        entries = [
+            ManifestEntry("a.py", size=10, mtime_ns=1, inode=2, content_digest="d1"),
+            ManifestEntry("b.py", size=20, mtime_ns=3, inode=4, content_digest="d2"),
+        ]
+        temp_db.save_manifest(entries)
+
+        assert temp_db.load_manifest() == {e.file_path: e for e in entries}
+
+        assert temp_db.prune_manifest({"a.py"}) == 1
+        assert list(temp_db.load_manifest()) == ["a.py"]
+
+
+class TestSaveScan:
+    """Tests for streaming scan results into the database."""
+
+    def test_save_scan_writes_nodes_edges_and_record(self, temp_db):
+        """Test that per-file results are persisted as one scan."""
+        node = CodeNode(
+            id="mod:f", name="f", file_path="mod.py", start_line=1, end_line=2,
+            semantic_hash="h1",
+        )
+        edge = CallEdge(caller_id="mod:f", callee_id="g")
+        results = [
+            FileScanResult(file_path="mod.py", nodes=[node], edges=[edge]),
+            FileScanResult(file_path="bad.py", error="Syntax Error"),
+        ]
+
+        record = temp_db.save_scan("/project", iter(results))
+
+        assert (record.files_scanned, record.nodes_found, record.errors) == (1, 1, 1)
+        assert temp_db.get_node_count() == 1
+        assert temp_db.get_edge_count() == 1
+        assert temp_db.load_snapshot("mod:f").semantic_hash == "h1"
+        assert temp_db.get_scan_history()[0].scan_id == record.scan_id
+
+    def test_save_scan_flushes_in_batches(self, temp_db, monkeypatch):
+        """Test that buffered rows are committed when the batch fills."""
+        from engine.storage import database
+
+        monkeypatch.setattr(database, "_WRITE_BATCH_ROWS", 2)
+        results = [
+            FileScanResult(
+                file_path=f"m{i}.py",
+                nodes=[
+                    CodeNode(
+                        id=f"m{i}:f", name="f", file_path=f"m{i}.py", start_line=1,
+                        end_line=2, semantic_hash="h",
+                    )
+                ],
+                edges=[CallEdge(caller_id=f"m{i}:f", callee_id="g")],
+            )
+            for i in range(5)
+        ]
+
+        def checked():
+            for i, file_result in enumerate(results):
+                # Earlier batches are visible to other connections mid-scan
+                assert temp_db.get_node_count() == i
+                yield file_result
+
+        temp_db.save_scan("/project", checked())
+
+        assert temp_db.get_node_count() == 5
+
+
+    def test_save_scan_stores_rollup_hierarchy(self, temp_db):
+        """Test that a saved scan records rollups matching its nodes."""
+        from engine.hash import compute_rollups
+
+        nodes = [
+            CodeNode(
+                id=f"/p/a.py:f{i}",
+                name=f"f{i}",
+                file_path="/p/a.py",
+                start_line=i + 1,
+                end_line=i + 1,
+                semantic_hash=f"h{i}",
+            )
+            for i in range(3)
+        ]
+        temp_db.save_scan("/p", [FileScanResult("/p/a.py", nodes=nodes)])
+
+        assert temp_db.load_hierarchy() == compute_rollups(nodes, "/p")
+        assert set(temp_db.load_snapshots(file_paths=["/p/a.py"])) == {n.id for n in nodes}
+        assert temp_db.load_snapshots(file_paths=["/p/b.py"]) == {}
+
+        # Nodes saved outside a scan invalidate the hierarchy
+        temp_db.save_nodes(nodes[:1])
+        assert temp_db.load_hierarchy() == {}
+
+    def test_save_scan_records_digest(self, temp_db):
+        """Test that the digest of a scan is kept in its record."""
+        from engine.hash import Digest
+
+        record = temp_db.save_scan("/p", [], digest=Digest.from_name("blake2b-16"))
+
+        assert record.digest == "blake2b-16"
+        assert temp_db.get_scan_history()[0].digest == "blake2b-16"
+
+
+class TestBinaryHashes:
+    """Tests for storing hashes as BLOBs."""
+
+    def test_hex_hashes_stored_as_blobs(self, temp_db):
+        """Test that hex hashes take their digest size and read back as hex."""
+        from engine.hash import Digest, compute_semantic_hash
+
+        semantic = compute_semantic_hash("def f(): pass", Digest.from_name("blake2b-16"))
+        node = CodeNode(
+            id="mod:f", name="f", file_path="mod.py", start_line=1, end_line=2,
+            semantic_hash=semantic, doc_hash="not-hex", raw_hash="ABCD",
+        )
+        temp_db.save_nodes([node])
+
+        with sqlite3.connect(temp_db._db_path) as conn:
+            row = conn.execute(
+                "SELECT typeof(semantic_hash), length(semantic_hash), typeof(doc_hash), "
+                "typeof(raw_hash) FROM nodes"
+            ).fetchone()
+        conn.close()
+        snapshot = temp_db.load_snapshot("mod:f")
+
+        # Anything that would not round-trip through bytes is kept as text
+        assert row == ("blob", 16, "text", "text")
+        assert (snapshot.semantic_hash, snapshot.doc_hash, snapshot.raw_hash) == (
+            semantic, "not-hex", "ABCD"
+        )
+
+    def test_text_hashes_migrated_to_blobs(self, tmp_path):
+        """Test that a database with hex text hashes is converted in place."""
+        db_path = tmp_path / "old.db"
+        semantic, raw = "ab" * 32, "cd" * 32
+        Database(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                "INSERT INTO nodes (node_id, file_path, start_line, end_line, semantic_hash, "
+                "doc_hash, last_scanned, raw_hash) VALUES ('mod:f', 'mod.py', 1, 2, ?, NULL, "
+                "'2024-01-01T00:00:00', ?)",
+                (semantic, raw),
+            )
+            conn.execute(
+                "INSERT INTO hierarchy VALUES ('', NULL, 'project', ?, NULL)", ("ef" * 32,)
+            )
+            conn.execute("PRAGMA user_version = 1")
+        conn.close()
+
+        db = Database(db_path)
+
+        with sqlite3.connect(db_path) as conn:
+            types = conn.execute(
+                "SELECT typeof(semantic_hash), typeof(raw_hash) FROM nodes"
+            ).fetchone()
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.close()
+        assert types == ("blob", "blob")
+        assert version == 5
+        assert db.load_snapshot("mod:f").semantic_hash == semantic
+        assert db.load_snapshot("mod:f").raw_hash == raw
+        # Rows from before section hashes existed are hashed again once
+        assert db.load_known_hashes(["mod.py"], "cst-v1") == {}
+        assert db.load_hierarchy()[""].rollup_hash == "ef" * 32
+
+class TestSimilaritySignatures:
+    """Tests for the persisted similarity signatures."""
+
+    def test_signatures_outlive_their_nodes(self, temp_db):
+        """Test that signatures load into an index and are deleted with files."""
+        from engine.hash import compute_minhash
+
+        minhash = compute_minhash("def f(a):\n    return a + 1\n")
+        node = CodeNode(
+            id="mod:f", name="f", file_path="mod.py", start_line=1, end_line=2,
+            semantic_hash="ab" * 32, minhash=minhash,
+        )
+        temp_db.save_scan("/p", [FileScanResult(file_path="mod.py", nodes=[node])])
+
+        index = temp_db.load_similarity_index(["mod:f", "mod:missing"])
+
+        assert len(index) == 1
+        assert index.query(minhash) == [("mod:f", 1.0)]
+
+        temp_db.delete_file_nodes("mod.py")
+        assert len(temp_db.load_similarity_index(["mod:f"])) == 0
+
+    def test_similar_signatures_found_through_buckets(self, temp_db):
+        """Test that candidates are looked up by their stored bucket keys."""
+        from engine.hash import compute_minhash
+
+        source = "def f(a, b):\n    total = a + b\n    return total * 2\n"
+        minhashes = {
+            "mod:f": compute_minhash(source),
+            "mod:g": compute_minhash("def g():\n    print('unrelated', 42)\n"),
+        }
+        nodes = [
+            CodeNode(
+                id=node_id, name=node_id[4:], file_path="mod.py", start_line=1,
+                end_line=3, semantic_hash="ab" * 32, minhash=minhash,
+            )
+            for node_id, minhash in minhashes.items()
+        ]
+        temp_db.save_scan("/p", [FileScanResult(file_path="mod.py", nodes=nodes)])
+
+        moved = compute_minhash(source.replace("def f", "def moved"))
+        index = temp_db.load_similar_signatures([moved])
+
+        assert "mod:f" in index and "mod:g" not in index
+        assert index.query(moved) == [("mod:f", 1.0)]
+        assert len(temp_db.load_similar_signatures([moved], node_ids=["mod:g"])) == 0
+
+        temp_db.delete_file_nodes("mod.py")
+        assert len(temp_db.load_similar_signatures([moved])) == 0
+
+    def test_bucket_keys_backfilled_on_migration(self, tmp_path):
+        """Test that signatures stored before buckets were indexed can be found."""
+        from engine.hash import compute_minhash
+
+        db_path = tmp_path / "old.db"
+        minhash = compute_minhash("def f(a):\n    return a + 1\n")
+        Database(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                "INSERT INTO similarity VALUES ('mod:f', ?)", (bytes.fromhex(minhash),)
+            )
+            conn.execute("PRAGMA user_version = 4")
+        conn.close()
+
+        index = Database(db_path).load_similar_signatures([minhash])
+
+        assert index.query(minhash) == [("mod:f", 1.0)]
+
+
+class TestSectionHashes:
+    """Tests for the persisted signature, body and decorator hashes."""
+
+    def test_round_trip(self, temp_db):
+        """Test that section hashes are saved and loaded with snapshots."""
+        node = CodeNode(
+            id="mod:f", name="f", file_path="mod.py", start_line=1, end_line=2,
+            semantic_hash="ab" * 32, signature_hash="01" * 32, body_hash="02" * 32,
+            decorator_hash="03" * 32,
+        )
+        temp_db.save_scan("/p", [FileScanResult(file_path="mod.py", nodes=[node])])
+
+        snapshot = temp_db.load_snapshot("mod:f")
+
+        assert snapshot.signature_hash == "01" * 32
+        assert snapshot.body_hash == "02" * 32
+        assert snapshot.decorator_hash == "03" * 32
+
+
+class TestDuplicates:
+    """Tests for finding semantically identical functions."""
+
+    def _node(self, node_id: str, semantic_hash: str, lines: int = 3, doc=None) -> CodeNode:
+        file_path, _, name = node_id.partition(":")
+        return CodeNode(
+            id=node_id, name=name, file_path=file_path, start_line=1, end_line=lines,
+            semantic_hash=semantic_hash, doc_hash=doc,
+        )
+
+    def test_clusters_from_last_scan(self, temp_db):
+        """Test grouping by semantic hash, ignoring nodes of earlier scans."""
+        shared, other = "ab" * 32, "cd" * 32
+        temp_db.save_scan("/p", [FileScanResult(
+            file_path="old.py", nodes=[self._node("old.py:f", shared)]
+        )])
+        temp_db.save_scan("/p", [
+            FileScanResult(file_path="a.py", nodes=[
+                self._node("a.py:f", shared, doc="12" * 32),
+                self._node("a.py:g", other, lines=1),
+            ]),
+            FileScanResult(file_path="b.py", nodes=[
+                self._node("b.py:f", shared),
+                self._node("b.py:g", other, lines=1),
+                self._node("b.py:h", "ef" * 32),
+            ]),
+        ])
+
+        clusters = temp_db.find_duplicates()
+
+        assert [cluster.semantic_hash for cluster in clusters] == [shared, other]
+        assert [member.node_id for member in clusters[0].members] == ["a.py:f", "b.py:f"]
+        assert [member.documented for member in clusters[0].members] == [True, False]
+        assert clusters[0].documented_count == 1
+        assert [c.semantic_hash for c in temp_db.find_duplicates(min_lines=2)] == [shared]
+
+    def test_hash_index_created(self, temp_db):
+        """Test that the semantic hash index exists after initialization."""
+        with sqlite3.connect(temp_db._db_path) as conn:
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(nodes)")}
+        conn.close()
+
+        assert "idx_nodes_semantic" in indexes
+
+
 class TestScanHistory:
     """Tests for scan history tracking."""
 